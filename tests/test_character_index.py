@@ -0,0 +1,74 @@
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from unmute.tts.character_loader import CharacterManager, get_character_registry
+from unmute.tts.voices import FileVoiceSource, VoiceSample
+
+N_CHARACTERS = 5000
+
+
+@pytest.fixture(scope="module")
+def manager() -> CharacterManager:
+    characters = {}
+    for i in range(N_CHARACTERS):
+        character = VoiceSample(
+            name=f"Character {i}",
+            source=FileVoiceSource(path_on_server=f"voices/character-{i}.wav"),
+        )
+        character._source_file = f"character_{i}.py"  # type: ignore
+        characters[character.name] = character
+
+    manager = CharacterManager(session_id="test")
+    manager.characters = characters
+    return manager
+
+
+def test_get_character(manager: CharacterManager):
+    by_name = manager.get_character("Character 42")
+    by_voice_path = manager.get_character("voices/character-42.wav")
+    by_source_file = manager.get_character_by_source_file("character_42.py")
+    assert by_name is not None and by_name.name == "Character 42"
+    assert by_voice_path is not None and by_voice_path.name == "Character 42"
+    assert by_source_file is not None and by_source_file.name == "Character 42"
+    assert manager.get_character("voices/unknown.wav") is None
+
+
+def test_get_character_by_voice_path_benchmark(
+    manager: CharacterManager, monkeypatch: pytest.MonkeyPatch
+):
+    def model_dump(*args: Any, **kwargs: Any) -> dict[str, Any]:
+        raise AssertionError("Looking up a character should not serialize it")
+
+    monkeypatch.setattr(VoiceSample, "model_dump", model_dump)
+
+    voice_paths = [f"voices/character-{i}.wav" for i in range(N_CHARACTERS)]
+    start = time.perf_counter()
+    for voice_path in voice_paths:
+        assert manager.get_character(voice_path) is not None
+    elapsed = time.perf_counter() - start
+
+    # A linear scan makes this quadratic: tens of seconds for a few thousand characters.
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_lazy_index_survives_unevaluable_literals(tmp_path: Path):
+    characters_dir = Path(__file__).parents[1] / "characters"
+    shutil.copy(characters_dir / "charles.py", tmp_path / "charles.py")
+    voice_source = "{'source_type': 'file', 'path_on_server': 'voices/broken.wav'}"
+    # ast.literal_eval() raises TypeError for these, not ValueError.
+    for name, metadata in [("unhashable_key", '{["a"]: 1}'), ("set", "{[1]}")]:
+        (tmp_path / f"{name}.py").write_text(
+            f"CHARACTER_NAME = {name!r}\n"
+            f"VOICE_SOURCE = {voice_source}\n"
+            f"METADATA = {metadata}\n"
+        )
+
+    registry = await get_character_registry(tmp_path, lazy=True)
+
+    assert list(registry.characters) == ["Charles"]
+    assert registry.load_result.error_count == 2
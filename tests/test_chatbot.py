@@ -0,0 +1,133 @@
+import random
+from typing import Any, Literal
+
+import pytest
+
+from unmute.llm.chatbot import Chatbot, ConversationState
+from unmute.llm.llm_utils import (
+    INTERRUPTION_CHAR,
+    USER_SILENCE_MARKER,
+    preprocess_messages_for_llm,
+)
+
+
+class FixedPromptGenerator:
+    def __init__(self, system_prompt: str):
+        self.system_prompt = system_prompt
+
+    def make_system_prompt(self) -> str:
+        return self.system_prompt
+
+
+class ReferenceChatbot:
+    """The chat history as a plain list, with everything derived from it on demand."""
+
+    def __init__(self, chat_history: list[dict[Any, Any]]):
+        self.chat_history = chat_history
+
+    def conversation_state(self) -> ConversationState:
+        last_message = self.chat_history[-1]
+        if last_message["role"] == "assistant":
+            return "bot_speaking"
+        elif last_message["role"] == "user" and last_message["content"].strip():
+            return "user_speaking"
+        return "waiting_for_user"
+
+    def add_chat_message_delta(
+        self,
+        delta: str,
+        role: Literal["user", "assistant"],
+        generating_message_i: int | None,
+    ) -> bool:
+        if (
+            generating_message_i is not None
+            and len(self.chat_history) > generating_message_i
+        ):
+            return False
+
+        if self.chat_history[-1]["role"] != role:
+            self.chat_history.append({"role": role, "content": delta})
+            return True
+
+        last_message: str = self.chat_history[-1]["content"]
+        needs_space_left = last_message != "" and not last_message[-1].isspace()
+        needs_space_right = delta != "" and not delta[0].isspace()
+        if needs_space_left and needs_space_right:
+            delta = " " + delta
+        self.chat_history[-1]["content"] += delta
+        return last_message == ""
+
+    def preprocessed_messages(self) -> list[dict[str, Any]]:
+        if len(self.chat_history) > 2:
+            return preprocess_messages_for_llm(self.chat_history)
+        return preprocess_messages_for_llm(
+            [self.chat_history[0], {"role": "user", "content": "Hello!"}]
+        )
+
+    def last_message(self, role: str) -> str | None:
+        valid_messages = [
+            message
+            for message in self.chat_history
+            if message["role"] == role and message["content"].strip() != ""
+        ]
+        return valid_messages[-1]["content"] if valid_messages else None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seed", range(200))
+async def test_chatbot_matches_reference(seed: int):
+    """Random deltas, direct edits of the history and preprocessing, both ways."""
+    rng = random.Random(seed)
+    deltas = [
+        "",
+        " ",
+        "hi",
+        " there",
+        "ok ",
+        "\n",
+        USER_SILENCE_MARKER,
+        INTERRUPTION_CHAR,
+    ]
+    roles: list[Literal["user", "assistant"]] = ["user", "assistant"]
+    chatbot = Chatbot()
+    chatbot.context_window.max_tokens = 0
+    reference = ReferenceChatbot([dict(chatbot.chat_history[0])])
+
+    for _ in range(rng.randint(1, 60)):
+        step = rng.random()
+        if step < 0.75:
+            delta = rng.choice(deltas)
+            role = rng.choice(roles)
+            n_messages = len(reference.chat_history)
+            generating_message_i = rng.choice([None, None, n_messages, n_messages + 1])
+            expected = reference.add_chat_message_delta(
+                delta, role, generating_message_i
+            )
+            actual = await chatbot.add_chat_message_delta(
+                delta, role, generating_message_i
+            )
+            assert actual == expected
+        elif step < 0.85:
+            # Like the handler does on interruptions
+            message = {"role": rng.choice(["user", "assistant"]), "content": "x"}
+            reference.chat_history.append(dict(message))
+            chatbot.chat_history.append(dict(message))
+        elif step < 0.9 and len(reference.chat_history) > 1:
+            reference.chat_history[-1]["content"] += "zz"
+            chatbot.chat_history[-1]["content"] += "zz"
+        elif step < 0.95:
+            prompt_generator = FixedPromptGenerator(f"Be nice {rng.random()}")
+            reference.chat_history[0] = {
+                "role": "system",
+                "content": prompt_generator.make_system_prompt(),
+            }
+            chatbot.set_prompt_generator(prompt_generator)
+        else:
+            assert chatbot.preprocessed_messages() == reference.preprocessed_messages()
+
+        assert chatbot.n_messages == len(reference.chat_history)
+        assert chatbot.conversation_state() == reference.conversation_state()
+        for role in ["user", "assistant", "system"]:
+            assert chatbot.last_message(role) == reference.last_message(role)
+
+    assert chatbot.chat_history == reference.chat_history
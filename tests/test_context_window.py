@@ -0,0 +1,25 @@
+from unmute.llm.context_window import ContextWindow, estimate_tokens
+
+
+def test_trim_keeps_budget_and_prefix():
+    window = ContextWindow(max_tokens=500)
+    chat_history = [{"role": "system", "content": "You are a helpful assistant."}]
+    previous = None
+    n_prefix_changes = 0
+
+    for turn in range(100):
+        chat_history.append({"role": "user", "content": f"Question {turn}. " * 10})
+        chat_history.append({"role": "assistant", "content": f"Answer {turn}. " * 20})
+        messages = window.trim(chat_history)
+
+        assert messages[0] is chat_history[0]
+        assert messages[1]["role"] == "user"
+        assert messages[-1] is chat_history[-1]
+        assert sum(estimate_tokens(m) for m in messages) <= 500
+
+        if previous is not None and messages[: len(previous)] != previous:
+            n_prefix_changes += 1
+        previous = messages
+
+    # The cut only moves once in a while, not at every turn.
+    assert 0 < n_prefix_changes < 25
@@ -0,0 +1,62 @@
+import asyncio
+import socket
+
+import pytest
+
+from unmute.dns_resolver import DNSResolver
+
+
+class StubResolver:
+    def __init__(self, ips: list[str]):
+        self.ips = ips
+        self.delay_sec = 0.0
+        self.n_calls = 0
+
+    async def __call__(self, hostname: str) -> list[str]:
+        self.n_calls += 1
+        await asyncio.sleep(self.delay_sec)
+        if not self.ips:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return self.ips
+
+
+@pytest.mark.asyncio
+async def test_serves_last_known_ips_and_reports_changes():
+    stub = StubResolver(["10.0.0.2", "10.0.0.1"])
+    resolver = DNSResolver(stub, refresh_interval_sec=0.01)
+    changes = []
+    resolver.add_listener(lambda *change: changes.append(change))
+
+    try:
+        assert await resolver.get("tts") == ["10.0.0.1", "10.0.0.2"]
+
+        # A slow resolver doesn't make lookups wait.
+        stub.delay_sec = 0.1
+        await asyncio.sleep(0.02)
+        assert await asyncio.wait_for(resolver.get("tts"), 0.01) == [
+            "10.0.0.1",
+            "10.0.0.2",
+        ]
+
+        # Failures keep the previous IPs.
+        stub.delay_sec = 0.0
+        stub.ips = []
+        await asyncio.sleep(0.15)
+        assert await resolver.get("tts") == ["10.0.0.1", "10.0.0.2"]
+
+        stub.ips = ["10.0.0.2", "10.0.0.3"]
+        await asyncio.sleep(0.05)
+        assert await resolver.get("tts") == ["10.0.0.2", "10.0.0.3"]
+        assert changes == [("tts", ["10.0.0.3"], ["10.0.0.1"])]
+    finally:
+        resolver.stop()
+
+
+@pytest.mark.asyncio
+async def test_raises_if_never_resolved():
+    resolver = DNSResolver(StubResolver([]), refresh_interval_sec=0.01)
+    try:
+        with pytest.raises(socket.gaierror):
+            await resolver.get("llm")
+    finally:
+        resolver.stop()
@@ -0,0 +1,58 @@
+import httpx
+import pytest
+
+from unmute.llm.llm_balancer import EJECT_AFTER_FAILURES, LLMBalancer
+
+URLS = ["http://10.0.0.1:8000", "http://10.0.0.2:8000"]
+
+
+def make_balancer() -> LLMBalancer:
+    async def get_urls() -> list[str]:
+        return URLS
+
+    return LLMBalancer(lambda url: url, get_urls)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_prefers_faster_and_less_loaded_backends():
+    balancer = make_balancer()
+    await balancer.refresh()
+    slow, fast = balancer.backends[URLS[0]], balancer.backends[URLS[1]]
+    slow.ttft, fast.ttft = 1.0, 0.1
+
+    for _ in range(9):
+        async with balancer.request() as request:
+            assert request.backend is fast
+
+    # 10 requests in flight on the fast one make it worse than the idle slow one.
+    fast.in_flight = 10
+    async with balancer.request() as request:
+        assert request.backend is slow
+    assert slow.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_ejects_failing_backends():
+    balancer = make_balancer()
+    await balancer.refresh()
+    broken, healthy = balancer.backends[URLS[0]], balancer.backends[URLS[1]]
+    healthy.in_flight = 100
+
+    for _ in range(EJECT_AFTER_FAILURES):
+        with pytest.raises(httpx.ConnectError):
+            async with balancer.request(prefer=broken) as request:
+                assert request.backend is broken
+                raise httpx.ConnectError("Connection refused")
+
+    # The preference is ignored while the backend is ejected.
+    async with balancer.request(prefer=broken) as request:
+        assert request.backend is healthy
+
+    # Errors that don't come from the backend don't count.
+    async with balancer.request(prefer=healthy) as request:
+        pass
+    for _ in range(EJECT_AFTER_FAILURES):
+        with pytest.raises(ValueError):
+            async with balancer.request(prefer=healthy) as request:
+                raise ValueError("Invalid tool arguments")
+    assert healthy.consecutive_failures == 0
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from openai import AsyncOpenAI
+
+from unmute.llm.llm_http_client import make_llm_http_client
+
+
+class ChunkedSSEServer:
+    """An HTTP/1.1 server that streams a completion like vLLM does, keeping the
+    connection alive between requests.
+
+    The end of the chunked body comes a little after `data: [DONE]`, so the OpenAI
+    client has already closed the stream when it arrives.
+    """
+
+    def __init__(self):
+        self.n_connections = 0
+        self.n_requests = 0
+        self.port = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.n_connections += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return
+                content_length = 0
+                for line in head.decode().split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.lower() == "content-length":
+                        content_length = int(value)
+                await reader.readexactly(content_length)
+                self.n_requests += 1
+
+                chunk = {
+                    "id": "0",
+                    "object": "chat.completion.chunk",
+                    "created": 0,
+                    "model": "fake-model",
+                    "choices": [{"index": 0, "delta": {"content": "Hi"}}],
+                }
+                body = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"content-type: text/event-stream\r\n"
+                    b"transfer-encoding: chunked\r\n\r\n"
+                    + f"{len(body):x}\r\n".encode()
+                    + body
+                    + b"\r\n"
+                )
+                await writer.drain()
+                await asyncio.sleep(0.01)
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_is_reused_after_done():
+    server = ChunkedSSEServer()
+    await server.start()
+    http_client = make_llm_http_client()
+    client = AsyncOpenAI(
+        api_key="EMPTY",
+        base_url=f"http://127.0.0.1:{server.port}/v1",
+        http_client=http_client,
+    )
+    try:
+        for _ in range(5):
+            stream = await client.chat.completions.create(
+                model="fake-model",
+                messages=[{"role": "user", "content": "Hello"}],
+                stream=True,
+            )
+            async with stream:
+                contents = [chunk.choices[0].delta.content async for chunk in stream]
+            assert contents == ["Hi"]
+    finally:
+        await http_client.aclose()
+        await server.stop()
+
+    assert server.n_requests == 5
+    assert server.n_connections == 1
@@ -1,6 +1,22 @@
+import asyncio
+import copy
+import json
+import random
+import time
+from typing import Any
+
+import httpx
 import pytest
+from openai import AsyncOpenAI
 
-from unmute.llm.llm_utils import rechunk_to_words
+from unmute.llm import llm_utils
+from unmute.llm.llm_utils import (
+    INTERRUPTION_CHAR,
+    USER_SILENCE_MARKER,
+    IncrementalPreprocessor,
+    preprocess_messages_for_llm,
+    rechunk_to_words,
+)
 
 
 async def make_iterator(s: str):
@@ -36,3 +52,180 @@ async def test_rechunk_to_words():
     assert await f(" they are ok") == [" they", " are", " ok"]
     assert await f("  foo bar") == [" foo", " bar"]
     assert await f(" \t foo  bar") == [" foo", " bar"]
+
+
+def _fake_openai_transport(n_chunks: int, chunk_delay_sec: float):
+    """A fake OpenAI-compatible server that streams `n_chunks` words, slowly."""
+
+    async def stream_chunks():
+        for i in range(n_chunks):
+            await asyncio.sleep(chunk_delay_sec)
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "fake-model",
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": f"word{i} "},
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=stream_chunks(),
+        )
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_vllm_stream_streams_with_tools(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        llm_utils, "autoselect_model", lambda preferred=None: "fake-model"
+    )
+    n_chunks, chunk_delay_sec = 10, 0.02
+    tools = [{"type": "function", "function": {"name": "f", "parameters": {}}}]
+
+    async def time_to_first_token(with_tools: bool) -> tuple[float, list[str]]:
+        client = AsyncOpenAI(
+            api_key="EMPTY",
+            base_url="http://fake-llm/v1",
+            http_client=httpx.AsyncClient(
+                transport=_fake_openai_transport(n_chunks, chunk_delay_sec)
+            ),
+        )
+        llm = llm_utils.VLLMStream(
+            client,
+            tools=tools if with_tools else None,
+            prompt_generator=object() if with_tools else None,
+        )
+        start = time.perf_counter()
+        ttft = None
+        chunks = []
+        async for chunk in llm.chat_completion([{"role": "user", "content": "Hi"}]):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            chunks.append(chunk)
+        assert ttft is not None
+        return ttft, chunks
+
+    ttft_without_tools, chunks_without_tools = await time_to_first_token(False)
+    ttft_with_tools, chunks_with_tools = await time_to_first_token(True)
+
+    assert chunks_with_tools == chunks_without_tools
+    assert len(chunks_with_tools) == n_chunks
+    # Buffering the whole completion would take n_chunks * chunk_delay_sec.
+    assert ttft_with_tools < ttft_without_tools + n_chunks * chunk_delay_sec / 2
+
+
+def _scripted_openai_transport(completions: list[list[dict[str, Any]]]):
+    """A fake OpenAI-compatible server that streams the i-th list of deltas for the
+    i-th request."""
+    requests: list[httpx.Request] = []
+
+    async def stream_chunks(deltas: list[dict[str, Any]]):
+        for delta in deltas:
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "fake-model",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        deltas = completions[len(requests)]
+        requests.append(request)
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=stream_chunks(deltas),
+        )
+
+    return httpx.MockTransport(handler), requests
+
+
+@pytest.mark.asyncio
+async def test_vllm_stream_separates_content_and_tool_follow_up(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        llm_utils, "autoselect_model", lambda preferred=None: "fake-model"
+    )
+    tool_call = {
+        "index": 0,
+        "id": "call_0",
+        "type": "function",
+        "function": {"name": "f", "arguments": "{}"},
+    }
+    transport, requests = _scripted_openai_transport(
+        [
+            [
+                {"content": "Let me"},
+                {"content": " check."},
+                {"tool_calls": [tool_call]},
+            ],
+            [{"content": "It is"}, {"content": " sunny."}],
+        ]
+    )
+    client = AsyncOpenAI(
+        api_key="EMPTY",
+        base_url="http://fake-llm/v1",
+        http_client=httpx.AsyncClient(transport=transport),
+    )
+    llm = llm_utils.VLLMStream(
+        client,
+        tools=[{"type": "function", "function": {"name": "f", "parameters": {}}}],
+        prompt_generator=object(),
+    )
+
+    words = [
+        word
+        async for word in rechunk_to_words(
+            llm.chat_completion([{"role": "user", "content": "Weather?"}])
+        )
+    ]
+
+    assert words == ["Let", " me", " check.", " It", " is", " sunny."]
+    assert len(requests) == 2
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_incremental_preprocessor_matches_preprocess_messages(seed: int):
+    """Random conversations, preprocessed after each step both ways."""
+    rng = random.Random(seed)
+    deltas = ["", " ", "hi", " there", "ok.", USER_SILENCE_MARKER, INTERRUPTION_CHAR]
+    chat_history = [{"role": "system", "content": "Be nice."}]
+    preprocessor = IncrementalPreprocessor()
+    n_dropped = 0
+
+    for _ in range(rng.randint(1, 60)):
+        step = rng.random()
+        if step < 0.05:
+            chat_history[0] = {"role": "system", "content": f"Be nice {rng.random()}"}
+        elif step < 0.1:
+            n_dropped = rng.randint(0, len(chat_history) - 1)
+        elif step < 0.5 and chat_history[-1]["role"] != "system":
+            chat_history[-1]["content"] += rng.choice(deltas)
+        else:
+            role = rng.choice(["user", "assistant"])
+            content = "".join(rng.choices(deltas, k=rng.randint(0, 3)))
+            chat_history.append({"role": role, "content": content})
+
+        # Like the context window, which drops old turns.
+        messages = [chat_history[0], *chat_history[1 + n_dropped :]]
+        expected_messages = copy.deepcopy(messages)
+        expected = preprocess_messages_for_llm(expected_messages)
+        assert preprocessor.preprocess(messages) == expected
+        # Including the removal of the silence marker from the history
+        assert messages == expected_messages
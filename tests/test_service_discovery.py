@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from unmute import service_discovery
+from unmute.exceptions import MissingServiceAtCapacity, MissingServiceTimeout
+from unmute.instance_scoreboard import InstanceScoreboard
+
+
+class FakeClient:
+    def __init__(self, instance: str, delay_sec: float, accept: bool):
+        self.instance = instance
+        self.delay_sec = delay_sec
+        self.accept = accept
+        self.cancelled = False
+        self.closed = False
+
+    async def start_up(self) -> None:
+        try:
+            await asyncio.sleep(self.delay_sec)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if not self.accept:
+            raise MissingServiceAtCapacity("tts")
+
+    async def close_unused(self) -> None:
+        self.closed = True
+
+
+async def find(
+    monkeypatch: pytest.MonkeyPatch,
+    behaviors: dict[str, tuple[float, bool]],
+    **kwargs: Any,
+) -> tuple[FakeClient, dict[str, FakeClient], float]:
+    async def get_instances(service_name: str) -> list[str]:
+        return list(behaviors)
+
+    monkeypatch.setattr(service_discovery, "get_instances", get_instances)
+    # Try the instances in the given order.
+    monkeypatch.setattr(
+        service_discovery.scoreboard, "order", lambda service_name, instances: instances
+    )
+    clients = {}
+
+    def client_factory(instance: str) -> FakeClient:
+        clients[instance] = FakeClient(instance, *behaviors[instance])
+        return clients[instance]
+
+    start = time.perf_counter()
+    client = await service_discovery.find_instance("tts", client_factory, **kwargs)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.01)  # Let the losers be cleaned up
+    return client, clients, elapsed
+
+
+@pytest.mark.asyncio
+async def test_slow_instance_does_not_delay_startup(monkeypatch: pytest.MonkeyPatch):
+    client, clients, elapsed = await find(
+        monkeypatch,
+        {"slow": (0.4, True), "fast": (0.01, True)},
+        stagger_sec=0.05,
+    )
+    assert client.instance == "fast"
+    assert elapsed < 0.2
+    assert clients["slow"].cancelled
+
+
+@pytest.mark.asyncio
+async def test_rejection_starts_next_attempt_right_away(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    client, _, elapsed = await find(
+        monkeypatch,
+        {"full": (0.0, False), "ok": (0.0, True)},
+        stagger_sec=10.0,
+    )
+    assert client.instance == "ok"
+    assert elapsed < 0.1
+
+
+@pytest.mark.asyncio
+async def test_raises_when_no_instance_accepts(monkeypatch: pytest.MonkeyPatch):
+    with pytest.raises(MissingServiceAtCapacity):
+        await find(monkeypatch, {"a": (0.01, False), "b": (0.0, False)})
+    with pytest.raises(MissingServiceTimeout):
+        await find(monkeypatch, {"a": (1.0, True)}, timeout_sec=0.05)
+
+
+def test_scoreboard_avoids_full_and_broken_instances():
+    scoreboard = InstanceScoreboard()
+    for _ in range(5):
+        scoreboard.record("tts", "full", "reject", 0.005)
+        scoreboard.record("tts", "ok", "accept", 0.005)
+    for _ in range(3):
+        scoreboard.record("tts", "down", "hard_miss")
+
+    orders = [scoreboard.order("tts", ["down", "full", "ok"]) for _ in range(1000)]
+    assert all(order[-1] == "down" for order in orders)
+    n_full_first = sum(order[0] == "full" for order in orders)
+    assert 0 < n_full_first < 300
+
+    # An instance that went away and comes back with the same IP starts over.
+    scoreboard.order("tts", ["full", "ok"])
+    orders = [scoreboard.order("tts", ["down", "full", "ok"]) for _ in range(1000)]
+    assert any(order[-1] != "down" for order in orders)
@@ -0,0 +1,151 @@
+"""Resolve the hostnames of the services in the background.
+
+Under Docker Swarm, the IPs that a service name resolves to are its instances, and they
+change when the service is scaled or a container restarts. Resolving the name when a
+session starts means waiting for the resolver every time the cached result has expired,
+so a slow resolver delays sessions.
+
+Instead, each hostname is resolved again on an interval by a background task, and
+lookups return the last list of IPs that was resolved successfully without waiting.
+Only the very first lookup of a hostname waits for it to be resolved. If resolving
+fails, the previous list is kept. Listeners are told when the list changes.
+"""
+
+import asyncio
+import logging
+import socket
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from unmute import metrics as mt
+from unmute.kyutai_constants import DNS_REFRESH_INTERVAL_SEC
+from unmute.timer import Stopwatch
+
+logger = logging.getLogger(__name__)
+
+ResolveFn = Callable[[str], Awaitable[list[str]]]
+# Called with the hostname, the IPs that were added and the ones that were removed
+MembershipListener = Callable[[str, list[str], list[str]], None]
+
+
+async def resolve_with_getaddrinfo(hostname: str) -> list[str]:
+    """The IPv4 addresses of `hostname`, from the system resolver."""
+    loop = asyncio.get_running_loop()
+    addrinfos = await loop.getaddrinfo(
+        hostname, None, family=socket.AF_INET, type=socket.SOCK_STREAM
+    )
+    return [str(sockaddr[0]) for *_, sockaddr in addrinfos]
+
+
+@dataclass(eq=False)
+class _Host:
+    hostname: str
+    loop: asyncio.AbstractEventLoop
+    # None until the first successful resolution
+    ips: list[str] | None = None
+    error: Exception | None = None
+    # Set once the first resolution is done, whether it succeeded or not
+    resolved: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+
+
+class DNSResolver:
+    def __init__(
+        self,
+        resolve: ResolveFn = resolve_with_getaddrinfo,
+        refresh_interval_sec: float = DNS_REFRESH_INTERVAL_SEC,
+    ):
+        """
+        Args:
+            resolve: Gets the IPs of a hostname. Raises if it can't be resolved.
+            refresh_interval_sec: How often to resolve each hostname again.
+        """
+        self._resolve = resolve
+        self.refresh_interval_sec = refresh_interval_sec
+        self._hosts: dict[str, _Host] = {}
+        self._listeners: list[MembershipListener] = []
+
+    def add_listener(self, listener: MembershipListener) -> None:
+        """Call `listener` whenever the IPs of a hostname change.
+
+        It's not called for the first resolution of a hostname.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: MembershipListener) -> None:
+        self._listeners.remove(listener)
+
+    async def get(self, hostname: str) -> list[str]:
+        """The last known IPs of `hostname`.
+
+        Only waits if the hostname has never been resolved. Raises the resolution
+        error if it never could be.
+        """
+        host = self._get_host(hostname)
+        if host.ips is None:
+            await host.resolved.wait()
+            if host.ips is None:
+                assert host.error is not None
+                raise host.error
+        return list(host.ips)
+
+    def stop(self) -> None:
+        for host in self._hosts.values():
+            if host.task is not None:
+                host.task.cancel()
+        self._hosts.clear()
+
+    def _get_host(self, hostname: str) -> _Host:
+        loop = asyncio.get_running_loop()
+        host = self._hosts.get(hostname)
+        if host is None or host.loop is not loop:
+            # The tasks and events are bound to the loop, which only changes in tests.
+            previous = host
+            host = self._hosts[hostname] = _Host(hostname, loop)
+            if previous is not None and previous.ips is not None:
+                host.ips = previous.ips
+                host.resolved.set()
+        if host.task is None or host.task.done():
+            host.task = asyncio.create_task(self._run(host))
+        return host
+
+    async def _run(self, host: _Host) -> None:
+        while True:
+            await self._refresh(host)
+            await asyncio.sleep(self.refresh_interval_sec)
+
+    async def _refresh(self, host: _Host) -> None:
+        hostname = host.hostname
+        stopwatch = Stopwatch()
+        try:
+            ips = sorted(set(await self._resolve(hostname)))
+        except Exception as e:
+            mt.DNS_RESOLVE_ERRORS.labels(host=hostname).inc()
+            if host.ips is not None:
+                logger.warning(
+                    f"Failed to resolve {hostname}, keeping {len(host.ips)} known "
+                    f"IPs: {e!r}"
+                )
+            else:
+                logger.warning(f"Failed to resolve {hostname}: {e!r}")
+            host.error = e
+            host.resolved.set()
+            return
+        finally:
+            mt.DNS_RESOLVE_TIME.labels(host=hostname).observe(stopwatch.time())
+
+        previous, host.ips, host.error = host.ips, ips, None
+        host.resolved.set()
+        mt.DNS_MEMBERS.labels(host=hostname).set(len(ips))
+        if previous is None or previous == ips:
+            return
+
+        added = [ip for ip in ips if ip not in previous]
+        removed = [ip for ip in previous if ip not in ips]
+        mt.DNS_MEMBERSHIP_CHANGES.labels(host=hostname).inc()
+        logger.info(f"Instances of {hostname} changed: +{added} -{removed}")
+        for listener in list(self._listeners):
+            try:
+                listener(hostname, added, removed)
+            except Exception:
+                logger.exception(f"Membership listener failed for {hostname}")
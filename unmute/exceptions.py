@@ -17,6 +17,14 @@ class MissingServiceTimeout(Exception):
         super().__init__(f"{service} timed out.")
 
 
+class MissingServiceUnavailable(Exception):
+    """A service can't be used at the moment, e.g. because we couldn't reach it."""
+
+    def __init__(self, service: str, reason: str):
+        self.service = service
+        super().__init__(f"{service} is not available: {reason}")
+
+
 class WebSocketClosedError(Exception):
     """Remote web socket is closed, let's move on."""
 
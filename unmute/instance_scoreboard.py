@@ -0,0 +1,173 @@
+"""Remember how the instances of the STT and TTS treated us, to pick better ones.
+
+Trying instances in a random order means that when some are full, we keep asking
+them and get rejected, which makes startup slower and the misses more frequent. The
+scoreboard keeps, for each instance, how often it accepted or rejected us recently
+and how long it took to answer. Instances are then tried in a random order weighted
+by their chance of accepting us, so that full instances are avoided for a while but
+still get tried again once they've had time to free up. The counts decay with time.
+
+Instances that fail with hard errors (timeouts, connection errors) several times in a
+row are put on a cool-down and only tried if nothing else is left.
+
+Instances that the service no longer resolves to, e.g. after a redeploy, are forgotten.
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Literal
+
+from unmute import metrics as mt
+
+logger = logging.getLogger(__name__)
+
+Outcome = Literal["accept", "reject", "hard_miss"]
+
+# After this long, the counts are worth half as much
+HALF_LIFE_SEC = 20.0
+# Added to the ping time, so that the ping only matters when it's large
+PING_OFFSET_SEC = 0.05
+DEFAULT_PING_SEC = 0.01
+COOL_DOWN_AFTER_HARD_MISSES = 3
+COOL_DOWN_SEC = 10.0
+MAX_COOL_DOWN_SEC = 120.0
+
+
+class _DecayingCount:
+    def __init__(self):
+        self._value = 0.0
+        self._updated_at = time.monotonic()
+
+    def get(self, now: float) -> float:
+        return self._value * 0.5 ** ((now - self._updated_at) / HALF_LIFE_SEC)
+
+    def add(self, amount: float, now: float) -> None:
+        self._value = self.get(now) + amount
+        self._updated_at = now
+
+
+@dataclass
+class InstanceStats:
+    accepts: _DecayingCount = field(default_factory=_DecayingCount)
+    rejects: _DecayingCount = field(default_factory=_DecayingCount)
+    hard_misses: _DecayingCount = field(default_factory=_DecayingCount)
+    # For the mean ping time
+    ping_count: _DecayingCount = field(default_factory=_DecayingCount)
+    ping_sum: _DecayingCount = field(default_factory=_DecayingCount)
+    consecutive_hard_misses: int = 0
+    n_cool_downs: int = 0
+    cool_down_until: float = 0.0
+
+    def is_cooling_down(self, now: float) -> bool:
+        return now < self.cool_down_until
+
+    def weight(self, now: float) -> float:
+        accepts = self.accepts.get(now)
+        failures = self.rejects.get(now) + self.hard_misses.get(now)
+        # With no history, that's 1/2, like one accept and one rejection.
+        p_accept = (accepts + 1) / (accepts + failures + 2)
+
+        ping_count = self.ping_count.get(now)
+        if ping_count > 0:
+            ping = self.ping_sum.get(now) / ping_count
+        else:
+            ping = DEFAULT_PING_SEC
+        return p_accept / (ping + PING_OFFSET_SEC)
+
+
+class InstanceScoreboard:
+    def __init__(self):
+        # By service, then by instance
+        self._stats: dict[str, dict[str, InstanceStats]] = {}
+
+    def _get(self, service_name: str, instance: str) -> InstanceStats:
+        service_stats = self._stats.setdefault(service_name, {})
+        stats = service_stats.get(instance)
+        if stats is None:
+            stats = service_stats[instance] = InstanceStats()
+        return stats
+
+    def _forget_others(self, service_name: str, instances: list[str]) -> None:
+        service_stats = self._stats.get(service_name, {})
+        for instance in service_stats.keys() - set(instances):
+            del service_stats[instance]
+
+    def order(self, service_name: str, instances: list[str]) -> list[str]:
+        """Sort the instances in the order to try them.
+
+        The order is random, with the probability of an instance coming first
+        proportional to its weight. Instances on cool-down come last, the one that
+        comes back first first. `instances` should be all the current instances of the
+        service, the stats of the others are dropped.
+        """
+        self._forget_others(service_name, instances)
+        now = time.monotonic()
+        available = []
+        cooling_down = []
+        for instance in instances:
+            stats = self._get(service_name, instance)
+            if stats.is_cooling_down(now):
+                cooling_down.append((stats.cool_down_until, instance))
+            else:
+                # Weighted random sampling without replacement (Efraimidis-Spirakis)
+                key = random.random() ** (1 / stats.weight(now))
+                available.append((key, instance))
+
+        mt.SERVICE_INSTANCES_COOLING_DOWN.labels(service=service_name).set(
+            len(cooling_down)
+        )
+        available.sort(reverse=True)
+        cooling_down.sort()
+        return [instance for _, instance in available + cooling_down]
+
+    def record(
+        self,
+        service_name: str,
+        instance: str,
+        outcome: Outcome,
+        ping_sec: float | None = None,
+    ) -> None:
+        """Record how an attempt to connect to an instance went.
+
+        Args:
+            service_name: "stt" or "tts".
+            instance: The URL of the instance.
+            outcome: Whether it accepted us, rejected us because it's at capacity, or
+                failed to answer properly.
+            ping_sec: How long the instance took to answer, if it did.
+        """
+        now = time.monotonic()
+        stats = self._get(service_name, instance)
+        if ping_sec is not None:
+            stats.ping_count.add(1, now)
+            stats.ping_sum.add(ping_sec, now)
+
+        if outcome == "accept":
+            stats.accepts.add(1, now)
+        elif outcome == "reject":
+            stats.rejects.add(1, now)
+        else:
+            stats.hard_misses.add(1, now)
+
+        if outcome != "hard_miss":
+            # The instance is up, even if it's full.
+            stats.consecutive_hard_misses = 0
+            stats.n_cool_downs = 0
+            return
+
+        stats.consecutive_hard_misses += 1
+        if (
+            stats.consecutive_hard_misses < COOL_DOWN_AFTER_HARD_MISSES
+            or stats.is_cooling_down(now)
+        ):
+            return
+        duration = min(COOL_DOWN_SEC * 2**stats.n_cool_downs, MAX_COOL_DOWN_SEC)
+        stats.n_cool_downs += 1
+        stats.cool_down_until = now + duration
+        mt.SERVICE_COOL_DOWNS.labels(service=service_name).inc()
+        logger.warning(
+            f"[{service_name}] Not trying {instance} for {duration:.0f}s after "
+            f"{stats.consecutive_hard_misses} hard errors in a row."
+        )
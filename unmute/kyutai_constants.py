@@ -11,9 +11,61 @@ TTS_SERVER = http_to_ws(os.environ.get("KYUTAI_TTS_URL", "ws://localhost:8089"))
 LLM_SERVER = os.environ.get("KYUTAI_LLM_URL", "http://localhost:8091")
 KYUTAI_LLM_MODEL = os.environ.get("KYUTAI_LLM_MODEL")
 KYUTAI_LLM_API_KEY = os.environ.get("KYUTAI_LLM_API_KEY")
+# Connection pool of the LLM client that all sessions share, see llm_http_client.py.
+# Requests wait for a connection when max connections are in use.
+LLM_MAX_CONNECTIONS = int(os.environ.get("KYUTAI_LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("KYUTAI_LLM_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+LLM_KEEPALIVE_EXPIRY_SEC = float(
+    os.environ.get("KYUTAI_LLM_KEEPALIVE_EXPIRY_SEC", "60")
+)
+# HTTP/2 multiplexes requests over fewer connections, but needs the h2 package and a
+# server that supports it (vLLM only speaks HTTP/1.1, so only useful behind a proxy).
+LLM_HTTP2 = os.environ.get("KYUTAI_LLM_HTTP2", "0") == "1"
+# Estimated tokens of the system prompt and conversation sent to the LLM, older turns
+# are dropped beyond that, see context_window.py. Characters can override it with
+# LLM_MAX_CONTEXT_TOKENS. Leave room for the reply within the LLM's --max-model-len.
+# 0 means no limit.
+LLM_MAX_CONTEXT_TOKENS = int(os.environ.get("KYUTAI_LLM_MAX_CONTEXT_TOKENS", "6000"))
+# Spread LLM requests over all the IPs that the LLM URL resolves to, see llm_balancer.py.
+# Only for http:// URLs with an explicit port, since requests are sent to the IPs.
+LLM_LOAD_BALANCING = os.environ.get("KYUTAI_LLM_LOAD_BALANCING", "1") == "1"
 VOICE_CLONING_SERVER = os.environ.get(
     "KYUTAI_VOICE_CLONING_URL", "http://localhost:8092"
 )
+# When connecting to the STT or TTS, try the next instance if the current one hasn't
+# answered after this long, see find_instance(). Use 0.5 (the timeout) to try them one
+# after the other.
+SERVICE_RACE_STAGGER_SEC = float(
+    os.environ.get("KYUTAI_SERVICE_RACE_STAGGER_SEC", "0.1")
+)
+# How often to resolve the hostnames of the services again, see dns_resolver.py.
+# Sessions use the last resolved IPs, so this only affects how fast new instances of
+# a service are noticed.
+DNS_REFRESH_INTERVAL_SEC = float(
+    os.environ.get("KYUTAI_DNS_REFRESH_INTERVAL_SEC", "1.0")
+)
+# "list" sends STT audio as a msgpack array of floats, which is what moshi-server
+# expects. "bytes" sends the raw little-endian float32 buffer as a msgpack bin payload,
+# which avoids boxing every sample but requires a server that understands it.
+STT_AUDIO_FORMAT = os.environ.get("KYUTAI_STT_AUDIO_FORMAT", "list")
+# How many ready TTS connections to keep per voice, see unmute/tts/tts_pool.py.
+# Idle connections hold a slot on the TTS server, so set to 0 to disable the pool.
+TTS_POOL_SIZE = int(os.environ.get("KYUTAI_TTS_POOL_SIZE", "1"))
+# What to start as soon as a pause is detected, instead of waiting for the STT flush:
+# "off", "tts" to open the TTS connection, or "llm" to also run the LLM on the
+# transcript so far, which is thrown away if the last words change it.
+SPECULATIVE_RESPONSE = os.environ.get("KYUTAI_SPECULATIVE_RESPONSE", "tts")
+# If set, loading a characters directory only reads CHARACTER_NAME, VOICE_SOURCE and
+# METADATA statically, and a character's module is imported when a session selects it.
+# Errors in the rest of a character file then only show up at that point.
+CHARACTERS_LAZY_LOADING = os.environ.get("KYUTAI_CHARACTERS_LAZY_LOADING", "0") == "1"
+# If > 0, check the default characters directory for changes every this many seconds
+# and reload the characters that changed, for new sessions and /v1/voices.
+CHARACTERS_WATCH_INTERVAL_SEC = float(
+    os.environ.get("KYUTAI_CHARACTERS_WATCH_INTERVAL_SEC", "0")
+)
 # If None, a dict-based cache will be used instead of Redis
 REDIS_SERVER = os.environ.get("KYUTAI_REDIS_URL")
 
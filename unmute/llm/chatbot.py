@@ -1,7 +1,8 @@
 from logging import getLogger
 from typing import Any, Literal, Protocol
 
-from unmute.llm.llm_utils import preprocess_messages_for_llm
+from unmute.llm.context_window import ContextWindow
+from unmute.llm.llm_utils import IncrementalPreprocessor, preprocess_messages_for_llm
 from unmute.llm.system_prompt import (
     _SYSTEM_PROMPT_TEMPLATE,
     _SYSTEM_PROMPT_BASICS,
@@ -36,28 +37,95 @@ class Chatbot:
     def __init__(self):
         # It's actually a list of ChatCompletionStreamRequestMessagesTypedDict but then
         # it's really difficult to convince Python you're passing in the right type
-        self.chat_history: list[dict[Any, Any]] = [
+        self._messages: list[dict[Any, Any]] = [
             {"role": "system", "content": _default_system_prompt()}
         ]
+        # Deltas of the last message that aren't in its "content" yet. Adding them to
+        # the string one word at a time would copy the whole message every time, so
+        # they're only joined when someone reads the history.
+        self._pending_deltas: list[str] = []
         self._prompt_generator: PromptGenerator | None = None
+        # Which part of the history is sent to the LLM
+        self.context_window = ContextWindow()
+        self._preprocessor = IncrementalPreprocessor()
+
+        # Kept up to date as messages are added, so that the conversation state can be
+        # checked on every audio frame without looking at the messages.
+        self._last_char = ""  # Of the last message, "" if it's empty
+        self._last_has_text = False  # Whether the last message isn't just whitespace
+        self._last_with_text: dict[str, dict[Any, Any]] = {}  # By role
+        # What the history looked like after our last update. If it doesn't anymore,
+        # someone modified chat_history directly, and the above is computed again.
+        self._seen_length = 0
+        self._seen_last: dict[Any, Any] | None = None
+        self._seen_last_length = 0
+        self._update_derived_state()
+
+    @property
+    def chat_history(self) -> list[dict[Any, Any]]:
+        """The messages, as dicts with a "role" and a "content"."""
+        self._join_pending_deltas()
+        return self._messages
+
+    def _join_pending_deltas(self) -> None:
+        if self._pending_deltas:
+            last = self._messages[-1]
+            last["content"] += "".join(self._pending_deltas)
+            self._pending_deltas.clear()
+            self._seen_last_length = len(last["content"])
+
+    @property
+    def n_messages(self) -> int:
+        """Same as `len(chat_history)`, without joining the pending deltas."""
+        return len(self._messages)
+
+    def _is_derived_state_outdated(self) -> bool:
+        messages = self._messages
+        if len(messages) != self._seen_length:
+            return True
+        if not messages:
+            return False
+        return (
+            messages[-1] is not self._seen_last
+            or len(messages[-1]["content"]) != self._seen_last_length
+        )
+
+    def _update_derived_state(self) -> None:
+        messages = self.chat_history
+        self._last_with_text = {}
+        for message in messages:
+            if message["content"].strip() != "":
+                self._last_with_text[message["role"]] = message
+
+        last = messages[-1] if messages else None
+        self._last_char = last["content"][-1:] if last else ""
+        self._last_has_text = last is not None and last["content"].strip() != ""
+        self._seen_length = len(messages)
+        self._seen_last = last
+        self._seen_last_length = len(last["content"]) if last else 0
+
+    def _ensure_derived_state(self) -> None:
+        if self._is_derived_state_outdated():
+            self._update_derived_state()
 
     def conversation_state(self) -> ConversationState:
-        if not self.chat_history:
+        self._ensure_derived_state()
+        if not self._messages:
             return "waiting_for_user"
 
-        last_message = self.chat_history[-1]
-        if last_message["role"] == "assistant":
+        last_role = self._messages[-1]["role"]
+        if last_role == "assistant":
             return "bot_speaking"
-        elif last_message["role"] == "user":
-            if last_message["content"].strip() != "":
+        elif last_role == "user":
+            if self._last_has_text:
                 return "user_speaking"
             else:
                 # Or do we want "user_speaking" here?
                 return "waiting_for_user"
-        elif last_message["role"] == "system":
+        elif last_role == "system":
             return "waiting_for_user"
         else:
-            raise RuntimeError(f"Unknown role: {last_message['role']}")
+            raise RuntimeError(f"Unknown role: {last_role}")
 
     async def add_chat_message_delta(
         self,
@@ -73,7 +141,7 @@ class Chatbot:
         """
         if (
             generating_message_i is not None
-            and len(self.chat_history) > generating_message_i
+            and len(self._messages) > generating_message_i
         ):
             logger.warning(
                 f"Tried to add {delta=} {role=} "
@@ -81,38 +149,60 @@ class Chatbot:
             )
             return False
 
-        if not self.chat_history or self.chat_history[-1]["role"] != role:
-            self.chat_history.append({"role": role, "content": delta})
+        self._ensure_derived_state()
+        if not self._messages or self._messages[-1]["role"] != role:
+            message = {"role": role, "content": delta}
+            self.chat_history.append(message)  # Joins the previous message's deltas
+            self._seen_length = len(self._messages)
+            self._seen_last = message
+            self._seen_last_length = len(delta)
+            self._last_char = delta[-1:]
+            self._last_has_text = delta.strip() != ""
+            if self._last_has_text:
+                self._last_with_text[role] = message
             return True
         else:
-            last_message: str = self.chat_history[-1]["content"]
+            was_empty = self._last_char == ""
 
             # Add a space if necessary
-            needs_space_left = last_message != "" and not last_message[-1].isspace()
+            needs_space_left = not was_empty and not self._last_char.isspace()
             needs_space_right = delta != "" and not delta[0].isspace()
 
             if needs_space_left and needs_space_right:
                 delta = " " + delta
 
-            self.chat_history[-1]["content"] += delta
-            return last_message == ""  # new message if `last_message` was empty
+            if delta:
+                self._pending_deltas.append(delta)
+                self._last_char = delta[-1]
+                if not self._last_has_text and delta.strip() != "":
+                    self._last_has_text = True
+                    self._last_with_text[role] = self._messages[-1]
+            return was_empty  # new message if the last message was empty
+
+    def preprocessed_history(self) -> list[dict[str, Any]]:
+        """The chat history as sent to the LLM. Only the new messages are processed."""
+        n_markers_removed = self._preprocessor.n_markers_removed
+        messages = self._preprocessor.preprocess(
+            self.context_window.trim(self.chat_history)
+        )
+        if self._preprocessor.n_markers_removed != n_markers_removed:
+            self._update_derived_state()  # It modified the history
+        return messages
 
     def preprocessed_messages(self):
         if len(self.chat_history) > 2:
-            messages = self.chat_history
-        else:
-            assert len(self.chat_history) >= 1
-            assert self.chat_history[0]["role"] == "system"
+            return self.preprocessed_history()
 
-            messages = [
-                self.chat_history[0],
-                # Some models, like Gemma, don't like it when there is no user message
-                # so we add one.
-                {"role": "user", "content": "Hello!"},
-            ]
+        assert len(self.chat_history) >= 1
+        assert self.chat_history[0]["role"] == "system"
 
-        messages = preprocess_messages_for_llm(messages)
-        return messages
+        messages = [
+            self.chat_history[0],
+            # Some models, like Gemma, don't like it when there is no user message
+            # so we add one.
+            {"role": "user", "content": "Hello!"},
+        ]
+        return preprocess_messages_for_llm(messages)
 
     def set_prompt_generator(self, prompt_generator: PromptGenerator):
         """Set the prompt generator and update the system prompt.
@@ -126,6 +216,7 @@ class Chatbot:
 
     def _update_system_prompt(self, system_prompt: str):
         self.chat_history[0] = {"role": "system", "content": system_prompt}
+        self._update_derived_state()
 
     def get_system_prompt(self) -> str:
         assert len(self.chat_history) > 0
@@ -136,12 +227,9 @@ class Chatbot:
         return self._prompt_generator
 
     def last_message(self, role: str) -> str | None:
-        valid_messages = [
-            message
-            for message in self.chat_history
-            if message["role"] == role and message["content"].strip() != ""
-        ]
-        if valid_messages:
-            return valid_messages[-1]["content"]
-        else:
+        self._ensure_derived_state()
+        message = self._last_with_text.get(role)
+        if message is None:
             return None
+        self._join_pending_deltas()  # In case it's the last message
+        return message["content"]
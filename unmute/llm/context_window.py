@@ -0,0 +1,85 @@
+"""Keep the messages sent to the LLM under a token budget.
+
+Without a limit, each turn of a long session sends the whole conversation again, so the
+request and the prefill time keep growing. When the conversation goes over the budget,
+the oldest turns are dropped, keeping the system prompt and the most recent turns.
+
+Dropping the oldest turn one at a time would change the start of the conversation at
+every turn, and the LLM server would never reuse its cached prefix. Instead, enough
+turns are dropped to go down to a fraction of the budget, and the cut then stays where
+it is until the budget is exceeded again, so most turns extend the previous request.
+
+We don't know the LLM's tokenizer, so the number of tokens is estimated from the
+number of characters.
+"""
+
+from typing import Any
+
+from unmute import metrics as mt
+from unmute.kyutai_constants import LLM_MAX_CONTEXT_TOKENS
+
+CHARS_PER_TOKEN = 4
+# For the role and the special tokens around each message
+TOKENS_PER_MESSAGE = 4
+# Where to cut when the budget is exceeded, as a fraction of what's left for the
+# conversation once the system prompt is counted.
+TRIM_TARGET_FRACTION = 0.5
+
+
+def estimate_tokens(message: dict[str, Any]) -> int:
+    content = message["content"]
+    if not content:
+        return 0  # Empty messages are not sent, see preprocess_messages_for_llm()
+    return TOKENS_PER_MESSAGE + -(-len(content) // CHARS_PER_TOKEN)
+
+
+class ContextWindow:
+    def __init__(self, max_tokens: int | None = LLM_MAX_CONTEXT_TOKENS):
+        """
+        Args:
+            max_tokens: The budget for the system prompt and the conversation, or
+                None or 0 to send everything.
+        """
+        self.max_tokens = max_tokens
+        # Number of messages dropped after the system prompt. Only ever increases.
+        self.n_dropped = 0
+
+    def trim(self, chat_history: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Get the system prompt followed by the turns that fit in the budget.
+
+        The kept turns always start with a user message, and the last user message is
+        kept even if it doesn't fit by itself.
+        """
+        system, history = chat_history[0], chat_history[1:]
+        if self.n_dropped > len(history):
+            self.n_dropped = 0  # The history was replaced
+
+        kept = history[self.n_dropped :]
+        if not self.max_tokens:
+            return [system, *kept]
+
+        system_tokens = estimate_tokens(system)
+        kept_tokens = [estimate_tokens(message) for message in kept]
+        n_tokens = system_tokens + sum(kept_tokens)
+        if n_tokens <= self.max_tokens:
+            return [system, *kept]
+
+        # Take turns from the end while they fit, and cut before a user message.
+        target = (self.max_tokens - system_tokens) * TRIM_TARGET_FRACTION
+        cut = None
+        suffix_tokens = 0
+        for i in range(len(kept) - 1, -1, -1):
+            suffix_tokens += kept_tokens[i]
+            if kept[i]["role"] != "user":
+                continue
+            if cut is not None and suffix_tokens > target:
+                break
+            cut = i
+        if cut is None or cut == 0:
+            return [system, *kept]  # Nothing we can drop
+
+        dropped_tokens = sum(kept_tokens[:cut])
+        self.n_dropped += cut
+        mt.VLLM_HISTORY_TRIMS.inc()
+        mt.VLLM_HISTORY_DROPPED_TOKENS.inc(dropped_tokens)
+        return [system, *kept[cut:]]
@@ -0,0 +1,245 @@
+"""Spread the LLM requests over all the instances of the LLM server.
+
+Like the STT and TTS, the LLM URL can resolve to several instances. Each request goes
+to the better of two instances picked at random ("power of two choices"), where better
+means a lower recent time to first token, scaled by the requests already in flight.
+Comparing two random instances instead of always taking the best one avoids sending
+every new request to the same instance before its stats catch up. Instances that fail
+several requests in a row are ejected for a while, for longer each time.
+"""
+
+import asyncio
+import logging
+import random
+import statistics
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncGenerator, Awaitable, Callable
+from urllib.parse import urlsplit
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from unmute import metrics as mt
+from unmute.exceptions import MissingServiceUnavailable
+from unmute.kyutai_constants import LLM_LOAD_BALANCING, LLM_SERVER
+from unmute.service_discovery import get_instances, resolver
+
+logger = logging.getLogger(__name__)
+
+# The list is also refreshed as soon as the resolver sees the instances change.
+REFRESH_INTERVAL_SEC = 5.0
+# Weight of the latest time to first token in the moving average
+TTFT_SMOOTHING = 0.3
+# Assumed for instances that haven't answered yet
+DEFAULT_TTFT_SEC = 0.5
+EJECT_AFTER_FAILURES = 3
+EJECTION_SEC = 5.0
+MAX_EJECTION_SEC = 60.0
+
+
+async def get_llm_urls() -> list[str]:
+    """The URLs of the instances of the LLM server."""
+    url = urlsplit(LLM_SERVER)
+    # Requests are sent to the IPs directly, which doesn't work with TLS.
+    if not LLM_LOAD_BALANCING or url.scheme != "http" or url.port is None:
+        return [LLM_SERVER]
+    return await get_instances("llm")
+
+
+@dataclass(eq=False)
+class LLMBackend:
+    url: str
+    client: AsyncOpenAI
+    in_flight: int = 0
+    ttft: float | None = None  # Moving average
+    consecutive_failures: int = 0
+    n_ejections: int = 0
+    ejected_until: float = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def score(self, default_ttft: float) -> float:
+        ttft = self.ttft if self.ttft is not None else default_ttft
+        return ttft * (self.in_flight + 1)
+
+
+class LLMRequest:
+    """A request to one of the backends, see `LLMBalancer.request()`."""
+
+    def __init__(self, backend: LLMBackend):
+        self.backend = backend
+        self.client = backend.client
+        self.time_to_first_token: float | None = None
+        self._start_time = time.perf_counter()
+
+    def first_token(self) -> None:
+        """To be called when the first token is received. Calls after that are no-ops."""
+        if self.time_to_first_token is not None:
+            return
+        ttft = time.perf_counter() - self._start_time
+        self.time_to_first_token = ttft
+        mt.VLLM_TTFT.labels(backend=self.backend.url).observe(ttft)
+        backend = self.backend
+        if backend.ttft is None:
+            backend.ttft = ttft
+        else:
+            backend.ttft += TTFT_SMOOTHING * (ttft - backend.ttft)
+
+
+def _is_backend_failure(exc: Exception) -> bool:
+    """Whether the error says something about the health of the backend."""
+    if isinstance(exc, openai.APIStatusError):
+        # Not 4xx errors, they mean our request was wrong, except for "overloaded".
+        return exc.status_code >= 500 or exc.status_code == 429
+    # Includes timeouts. Errors while reading the stream are not wrapped by openai.
+    return isinstance(exc, (openai.APIConnectionError, httpx.TransportError))
+
+
+class LLMBalancer:
+    def __init__(
+        self,
+        client_factory: Callable[[str], AsyncOpenAI],
+        get_urls: Callable[[], Awaitable[list[str]]] = get_llm_urls,
+    ):
+        self._client_factory = client_factory
+        self._get_urls = get_urls
+        self.backends: dict[str, LLMBackend] = {}
+        self._refresh_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._membership_changed = asyncio.Event()
+
+    @classmethod
+    def for_client(cls, client: AsyncOpenAI) -> "LLMBalancer":
+        """A balancer that sends everything to `client`."""
+        url = str(client.base_url)
+
+        async def get_urls() -> list[str]:
+            return [url]
+
+        return cls(lambda _: client, get_urls)
+
+    def start(self) -> None:
+        """Start refreshing the list of instances in the background."""
+        if self._task is None:
+            resolver.add_listener(self._on_membership_change)
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            resolver.remove_listener(self._on_membership_change)
+            self._task.cancel()
+            self._task = None
+
+    def _on_membership_change(
+        self, hostname: str, added: list[str], removed: list[str]
+    ) -> None:
+        if hostname == urlsplit(LLM_SERVER).hostname:
+            self._membership_changed.set()
+
+    async def refresh(self) -> None:
+        """Update the list of instances. Keeps the current one if resolving fails."""
+        try:
+            urls = await self._get_urls()
+        except Exception as e:
+            logger.warning(f"Failed to resolve the instances of the LLM server: {e}")
+            return
+        if not urls:
+            return
+
+        # Keep the stats of the instances we already know.
+        backends = {
+            url: self.backends.get(url) or LLMBackend(url, self._client_factory(url))
+            for url in urls
+        }
+        if backends.keys() != self.backends.keys():
+            logger.info(f"LLM instances: {list(backends)}")
+        self.backends = backends
+        mt.VLLM_BACKENDS.set(len(backends))
+
+    async def _run(self) -> None:
+        while True:
+            self._membership_changed.clear()
+            await self.refresh()
+            try:
+                await asyncio.wait_for(
+                    self._membership_changed.wait(), REFRESH_INTERVAL_SEC
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _pick(self, prefer: LLMBackend | None) -> LLMBackend:
+        if not self.backends:
+            async with self._refresh_lock:
+                if not self.backends:
+                    await self.refresh()
+        if not self.backends:
+            raise MissingServiceUnavailable("llm", "no instance could be resolved")
+
+        now = time.monotonic()
+        if prefer is not None and self.backends.get(prefer.url) is prefer:
+            if not prefer.is_ejected(now):
+                return prefer
+
+        backends = list(self.backends.values())
+        healthy = [backend for backend in backends if not backend.is_ejected(now)]
+        if not healthy:
+            # Better to try the one that comes back first than to fail for sure.
+            return min(backends, key=lambda backend: backend.ejected_until)
+        if len(healthy) == 1:
+            return healthy[0]
+
+        known_ttfts = [b.ttft for b in healthy if b.ttft is not None]
+        default_ttft = statistics.mean(known_ttfts) if known_ttfts else DEFAULT_TTFT_SEC
+        return min(
+            random.sample(healthy, 2), key=lambda backend: backend.score(default_ttft)
+        )
+
+    @asynccontextmanager
+    async def request(
+        self, prefer: LLMBackend | None = None
+    ) -> AsyncGenerator[LLMRequest, None]:
+        """Pick a backend for a request, which lasts until the end of the context.
+
+        Args:
+            prefer: Use this backend if it's still healthy, e.g. to follow up on a
+                request with the same prefix, which the backend may have cached.
+        """
+        backend = await self._pick(prefer)
+        backend.in_flight += 1
+        mt.VLLM_ACTIVE_SESSIONS.labels(backend=backend.url).inc()
+        try:
+            yield LLMRequest(backend)
+        except Exception as e:
+            if _is_backend_failure(e):
+                self._on_failure(backend, e)
+            raise
+        else:
+            backend.consecutive_failures = 0
+            backend.n_ejections = 0
+        finally:
+            # Also when interrupted, which says nothing about the backend.
+            backend.in_flight -= 1
+            mt.VLLM_ACTIVE_SESSIONS.labels(backend=backend.url).dec()
+
+    def _on_failure(self, backend: LLMBackend, exc: Exception) -> None:
+        mt.VLLM_BACKEND_ERRORS.labels(backend=backend.url).inc()
+        backend.consecutive_failures += 1
+        now = time.monotonic()
+        if (
+            backend.consecutive_failures < EJECT_AFTER_FAILURES
+            or backend.is_ejected(now)  # Requests that were in flight when ejected
+        ):
+            return
+
+        duration = min(EJECTION_SEC * 2**backend.n_ejections, MAX_EJECTION_SEC)
+        backend.n_ejections += 1
+        backend.ejected_until = now + duration
+        mt.VLLM_BACKEND_EJECTIONS.labels(backend=backend.url).inc()
+        logger.warning(
+            f"Ejecting LLM instance {backend.url} for {duration:.0f}s after "
+            f"{backend.consecutive_failures} failures in a row, last one: {exc!r}"
+        )
@@ -0,0 +1,129 @@
+"""The HTTP client that all sessions share to talk to the LLM server.
+
+Giving each session its own `AsyncOpenAI` means each session opens its own connections,
+so the first request of every session pays for TCP (and TLS) setup, and idle pools
+pile up. With one client per process, sessions reuse each other's keep-alive
+connections. The transport is instrumented to tell how often that happens and how long
+requests wait for a connection when the pool is full.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncGenerator, AsyncIterator, Callable
+
+import httpx
+
+from unmute import metrics as mt
+from unmute.kyutai_constants import (
+    LLM_HTTP2,
+    LLM_KEEPALIVE_EXPIRY_SEC,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+
+def make_llm_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SEC,
+    )
+    # The OpenAI client sets the timeouts of each request, so none are set here.
+    return httpx.AsyncClient(
+        transport=_InstrumentedTransport(limits=limits, http2=LLM_HTTP2),
+        timeout=None,
+    )
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start_time = time.perf_counter()
+        connect_start_time: float | None = None
+        got_connection = False
+
+        # httpcore calls this at each step of the request. The first step happens once
+        # the pool gave the request a connection: either connecting, if it's a new one,
+        # or sending the headers, if it's reused.
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal connect_start_time, got_connection
+            now = time.perf_counter()
+            if not got_connection:
+                got_connection = True
+                mt.VLLM_HTTP_QUEUE_TIME.observe(now - start_time)
+            if event_name == "connection.connect_tcp.started":
+                connect_start_time = now
+            elif (
+                event_name.endswith("send_request_headers.started")
+                and connect_start_time is not None
+            ):
+                mt.VLLM_HTTP_CONNECT_TIME.observe(now - connect_start_time)
+
+        request.extensions["trace"] = trace
+        mt.VLLM_HTTP_IN_FLIGHT.inc()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            mt.VLLM_HTTP_IN_FLIGHT.dec()
+            raise
+
+        connection = "new" if connect_start_time is not None else "reused"
+        mt.VLLM_HTTP_REQUESTS.labels(connection=connection).inc()
+        # The request is in flight until the (streamed) body has been read.
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        response.stream = _StreamWithCallback(
+            response.stream, mt.VLLM_HTTP_IN_FLIGHT.dec
+        )
+        return response
+
+
+# How long to wait for the end of the body of a stream that is closed after `[DONE]`.
+DRAIN_TIMEOUT_SEC = 0.1
+
+
+class _StreamWithCallback(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        # The one iterator over the body, for the consumer and for draining it. A
+        # second iteration would race with the finalization of the first one, which
+        # closes the connection.
+        self._iterator = stream.__aiter__()
+        self._on_close: Callable[[], None] | None = on_close
+        self._tail = b""
+        self._saw_done = False
+        self._exhausted = False
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self
+
+    async def __anext__(self) -> bytes:
+        try:
+            chunk = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self._exhausted = True
+            raise
+        # Keep the end of the previous chunk in case the marker is split in two.
+        self._tail = self._tail[-8:] + chunk[-16:]
+        if b"[DONE]" in self._tail:
+            self._saw_done = True
+        return chunk
+
+    async def aclose(self) -> None:
+        try:
+            # The OpenAI client closes the stream as soon as it sees `data: [DONE]`,
+            # usually before the end of the chunked body has been read. httpcore then
+            # drops the connection instead of putting it back in the pool. The server
+            # is done at this point, so the rest arrives right away.
+            if self._saw_done and not self._exhausted:
+                try:
+                    async with asyncio.timeout(DRAIN_TIMEOUT_SEC):
+                        async for _ in self:
+                            pass
+                except (TimeoutError, httpx.HTTPError):
+                    pass
+            if isinstance(self._iterator, AsyncGenerator):
+                await self._iterator.aclose()
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
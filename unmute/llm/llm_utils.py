@@ -1,15 +1,24 @@
 import os
 import re
 from copy import deepcopy
-from functools import cache
 from typing import Any, AsyncIterator, Protocol, cast
 
 from mistralai import Mistral
-from openai import AsyncOpenAI, OpenAI
+from openai import AsyncOpenAI
 
 from unmute.kyutai_constants import LLM_SERVER
-
-from ..kyutai_constants import KYUTAI_LLM_API_KEY, KYUTAI_LLM_MODEL
+from unmute.llm.llm_balancer import LLMBalancer
+from unmute.llm.llm_http_client import make_llm_http_client
+from unmute.llm.model_discovery import LLMModelDiscovery
+from unmute.llm.tool_executor import (
+    ToolResultCache,
+    cacheable_tool_settings,
+    execute_tool_calls,
+    openai_tool_definition,
+    order_dependent_tool_names,
+)
+
+from ..kyutai_constants import KYUTAI_LLM_API_KEY
 
 INTERRUPTION_CHAR = "—"  # em-dash
 USER_SILENCE_MARKER = "..."
@@ -60,6 +69,103 @@ def preprocess_messages_for_llm(
     return output
 
 
+def _append_preprocessed(output: list[dict[str, str]], message: dict[str, str]):
+    """Add a message to the output of `preprocess_messages_for_llm()`.
+
+    Unlike `preprocess_messages_for_llm()`, the messages already in `output` are
+    replaced rather than modified, because they may be shared with earlier outputs.
+    """
+    if message["content"].replace(INTERRUPTION_CHAR, "") == "":
+        return
+    if output and message["role"] == output[-1]["role"]:
+        last = output[-1]
+        output[-1] = {**last, "content": last["content"] + " " + message["content"]}
+    else:
+        output.append(dict(message))
+
+
+def _has_silence_marker_prefix(message: dict[str, str]) -> bool:
+    return (
+        message["role"] == "user"
+        and message["content"].startswith(USER_SILENCE_MARKER)
+        and message["content"] != USER_SILENCE_MARKER
+    )
+
+
+class IncrementalPreprocessor:
+    """Same as `preprocess_messages_for_llm()`, but for a chat history that grows.
+
+    Only the last message of the history is expected to change, and only by getting
+    longer. All the messages before it are preprocessed once and the result is kept,
+    so each call only handles the messages added since the previous one. If the start
+    of the history is different, e.g. because older turns were dropped, everything
+    is preprocessed again.
+
+    The returned messages are shared between calls and must not be modified, but the
+    list itself is new and can be appended to.
+    """
+
+    def __init__(self):
+        # The messages of the history that are done, and their preprocessed version
+        self._sources: list[dict[str, str]] = []
+        self._output: list[dict[str, str]] = []
+        # Silence markers removed from the history, see preprocess_messages_for_llm()
+        self.n_markers_removed = 0
+
+    def reset(self) -> None:
+        self._sources = []
+        self._output = []
+
+    def preprocess(self, chat_history: list[dict[str, str]]) -> list[dict[str, str]]:
+        if not self._is_continuation_of(chat_history):
+            self.reset()
+
+        # All messages but the last one are done.
+        n_done = max(len(chat_history) - 1, 0)
+        new_sources = chat_history[len(self._sources) : n_done]
+        for message in new_sources:
+            _append_preprocessed(self._output, message)
+        self._sources.extend(new_sources)
+
+        output = self._output.copy()
+        if len(chat_history) > n_done:
+            _append_preprocessed(output, chat_history[-1])
+
+        if (
+            output
+            and output[0]["role"] == "system"
+            and (len(output) == 1 or output[1]["role"] == "assistant")
+        ):
+            output = [output[0]] + [{"role": "user", "content": "Hello."}] + output[1:]
+
+        # Like preprocess_messages_for_llm(), remove the silence marker from the
+        # history itself, once the output has been computed.
+        for message in new_sources:
+            if _has_silence_marker_prefix(message):
+                message["content"] = message["content"][len(USER_SILENCE_MARKER) :]
+                self.n_markers_removed += 1
+                # Then our preprocessed version is outdated.
+                self.reset()
+        if len(chat_history) > n_done and _has_silence_marker_prefix(chat_history[-1]):
+            message = chat_history[-1]
+            message["content"] = message["content"][len(USER_SILENCE_MARKER) :]
+            self.n_markers_removed += 1
+
+        return output
+
+    def _is_continuation_of(self, chat_history: list[dict[str, str]]) -> bool:
+        n_sources = len(self._sources)
+        if n_sources == 0:
+            return True
+        # The history only grows, so comparing the ends is enough: the system prompt,
+        # the first turn (which moves when older turns are dropped), and the last one.
+        return len(chat_history) > n_sources and all(
+            chat_history[i] is self._sources[i]
+            for i in {0, 1, n_sources - 1}
+            if i < n_sources
+        )
+
+
 async def rechunk_to_words(iterator: AsyncIterator[str]) -> AsyncIterator[str]:
     """Rechunk the stream of text to whole words.
 
@@ -117,55 +223,84 @@ class MistralStream:
             yield delta
 
 
+# Keyed by (server URL, API key)
+_openai_clients: dict[tuple[str, str | None], AsyncOpenAI] = {}
+
+
 def get_openai_client(
     server_url: str = LLM_SERVER, api_key: str | None = KYUTAI_LLM_API_KEY
 ) -> AsyncOpenAI:
-    # AsyncOpenAI() will complain if the API key is not set, so set a dummy string if it's None.
-    # This still makes sense when using vLLM because it doesn't care about the API key.
-    return AsyncOpenAI(api_key=api_key or "EMPTY", base_url=server_url + "/v1")
-
-
-@cache
-def autoselect_model() -> str:
-    if KYUTAI_LLM_MODEL is not None:
-        return KYUTAI_LLM_MODEL
-    openai_client = get_openai_client()
-    # OpenAI() will complain if the API key is not set, so set a dummy string if it's None.
-    # This still makes sense when using vLLM because it doesn't care about the API key.
-    client_sync = OpenAI(
-        api_key=openai_client.api_key or "EMPTY", base_url=openai_client.base_url
-    )
-    models = client_sync.models.list()
-    if len(models.data) != 1:
-        raise ValueError("There are multiple models available. Please specify one.")
-    return models.data[0].id
+    """Get the client for an LLM server, shared by all sessions of the process."""
+    client = _openai_clients.get((server_url, api_key))
+    if client is None:
+        # AsyncOpenAI() will complain if the API key is not set, so set a dummy string if it's None.
+        # This still makes sense when using vLLM because it doesn't care about the API key.
+        client = AsyncOpenAI(
+            api_key=api_key or "EMPTY",
+            base_url=server_url + "/v1",
+            http_client=make_llm_http_client(),
+        )
+        _openai_clients[(server_url, api_key)] = client
+    return client
+
+
+async def close_openai_clients():
+    clients = list(_openai_clients.values())
+    _openai_clients.clear()
+    for client in clients:
+        await client.close()
+
+
+# Started by the server at startup, see LLMModelDiscovery.start()
+model_discovery = LLMModelDiscovery(lambda: get_openai_client())
+
+
+# Started by the server at startup, see LLMBalancer.start()
+llm_balancer = LLMBalancer(lambda url: get_openai_client(server_url=url))
+
+
+def autoselect_model(preferred: str | None = None) -> str:
+    """Get the model to use, preferably `preferred`. Doesn't block, see model_discovery."""
+    return model_discovery.select(preferred)
 
 
 class VLLMStream:
     def __init__(
         self,
-        client: AsyncOpenAI,
+        client: AsyncOpenAI | LLMBalancer,
         temperature: float = 1.0,
         tools: list[dict[str, Any]] | None = None,
         prompt_generator: Any = None,
         tool_validators: dict[str, Any] | None = None,
         character_name: str = "Unknown",
+        tool_result_cache: ToolResultCache | None = None,
+        model: str | None = None,
     ):
         """
         Initialize VLLM stream with optional tool definitions.
 
         Args:
-            client: AsyncOpenAI client instance
+            client: AsyncOpenAI client instance, or the balancer that picks one
+                for each request
             temperature: Sampling temperature (default 1.0)
-            tools: Optional list of OpenAI function calling tool definitions
+            tools: Optional list of tool definitions from the character's TOOLS
             prompt_generator: Character's PromptGenerator instance (for tool execution)
             tool_validators: Dict of Pydantic validators for each tool
             character_name: Character name (for metrics)
+            tool_result_cache: The session's cache of results of cacheable tools
+            model: Model asked for by the character, see autoselect_model()
         """
-        self.client = client
-        self.model = autoselect_model()
+        if isinstance(client, LLMBalancer):
+            self.balancer = client
+        else:
+            self.balancer = LLMBalancer.for_client(client)
+        self.model = autoselect_model(model)
         self.temperature = temperature
-        self.tools = tools
+        # Sent to the LLM without the Unmute-specific keys
+        self.tools = [openai_tool_definition(tool) for tool in tools] if tools else None
+        self.order_dependent_tools = order_dependent_tool_names(tools)
+        self.tool_cache_settings = cacheable_tool_settings(tools)
+        self.tool_result_cache = tool_result_cache
         self.prompt_generator = prompt_generator
         self.tool_validators = tool_validators or {}
         self.character_name = character_name
@@ -191,51 +326,52 @@ class VLLMStream:
         if self.tools:
             api_params["tools"] = self.tools
 
-        stream = await self.client.chat.completions.create(**api_params)
-
         # T015: Collect tool calls if any
         tool_calls_buffer = {}
         assistant_message_content = []
         tool_calls_detected = False
 
-        async with stream:
-            async for chunk in stream:
-                delta = chunk.choices[0].delta
-
-                # T015: Check for tool calls in streaming response
-                if hasattr(delta, 'tool_calls') and delta.tool_calls:
-                    tool_calls_detected = True
-                    for tool_call_delta in delta.tool_calls:
-                        idx = tool_call_delta.index
-                        if idx not in tool_calls_buffer:
-                            tool_calls_buffer[idx] = {
-                                'id': tool_call_delta.id or '',
-                                'type': 'function',
-                                'function': {
-                                    'name': tool_call_delta.function.name or '',
-                                    'arguments': ''
+        async with self.balancer.request() as request:
+            stream = await request.client.chat.completions.create(**api_params)
+            async with stream:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta
+                    if delta.content or delta.tool_calls:
+                        request.first_token()
+
+                    # T015: Check for tool calls in streaming response
+                    if hasattr(delta, 'tool_calls') and delta.tool_calls:
+                        tool_calls_detected = True
+                        for tool_call_delta in delta.tool_calls:
+                            idx = tool_call_delta.index
+                            if idx not in tool_calls_buffer:
+                                tool_calls_buffer[idx] = {
+                                    'id': tool_call_delta.id or '',
+                                    'type': 'function',
+                                    'function': {
+                                        'name': tool_call_delta.function.name or '',
+                                        'arguments': ''
+                                    }
                                 }
-                            }
-
-                        # Accumulate function name and arguments
-                        if tool_call_delta.function.name:
-                            tool_calls_buffer[idx]['function']['name'] = tool_call_delta.function.name
-                        if tool_call_delta.function.arguments:
-                            tool_calls_buffer[idx]['function']['arguments'] += tool_call_delta.function.arguments
-                        if tool_call_delta.id:
-                            tool_calls_buffer[idx]['id'] = tool_call_delta.id
-
-                # Regular content
-                chunk_content = delta.content
-                if chunk_content:
-                    assistant_message_content.append(chunk_content)
-                    # If not executing tools, yield content immediately
-                    if not self.tools or not self.prompt_generator:
+
+                            # Accumulate function name and arguments
+                            if tool_call_delta.function.name:
+                                tool_calls_buffer[idx]['function']['name'] = tool_call_delta.function.name
+                            if tool_call_delta.function.arguments:
+                                tool_calls_buffer[idx]['function']['arguments'] += tool_call_delta.function.arguments
+                            if tool_call_delta.id:
+                                tool_calls_buffer[idx]['id'] = tool_call_delta.id
+
+                    # Regular content. Stream it right away even if tool calls show up
+                    # later, so that characters with tools don't lose streaming. It's
+                    # also kept for the assistant message that goes with the tool calls.
+                    chunk_content = delta.content
+                    if chunk_content:
+                        assistant_message_content.append(chunk_content)
                         yield chunk_content
 
         # T016-T017: If tools were called and we have prompt_generator, execute them
         if tool_calls_detected and self.prompt_generator and self.tools:
-            from unmute.llm.tool_executor import execute_tool
             import logging
             logger = logging.getLogger(__name__)
 
@@ -251,23 +387,24 @@ class VLLMStream:
                 "tool_calls": tool_calls
             })
 
-            # T016: Execute each tool call
-            for tool_call in tool_calls:
+            # T016: Execute the tool calls, concurrently unless they're order-dependent
+            results = await execute_tool_calls(
+                self.prompt_generator,
+                [
+                    (tool_call['function']['name'], tool_call['function']['arguments'])
+                    for tool_call in tool_calls
+                ],
+                self.tool_validators,
+                self.character_name,
+                order_dependent_tools=self.order_dependent_tools,
+                result_cache=self.tool_result_cache,
+                tool_cache_settings=self.tool_cache_settings,
+            )
+
+            for tool_call, result in zip(tool_calls, results, strict=True):
                 tool_name = tool_call['function']['name']
-                tool_arguments_json = tool_call['function']['arguments']
                 tool_call_id = tool_call['id']
 
-                logger.info(f"Executing tool: {tool_name} with args: {tool_arguments_json}")
-
-                # Execute tool
-                result = await execute_tool(
-                    self.prompt_generator,
-                    tool_name,
-                    tool_arguments_json,
-                    self.tool_validators,
-                    self.character_name
-                )
-
                 # T017: Add tool result to messages
                 messages.append({
                     "role": "tool",
@@ -279,22 +416,29 @@ class VLLMStream:
 
             # T017: Re-query LLM with tool results (no tools this time to avoid loops)
             logger.info("Re-querying LLM with tool results")
-            final_stream = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                stream=True,
-                temperature=self.temperature,
-                # Don't include tools in follow-up to avoid infinite loops
-            )
+            # Same instance if possible, it may have the start of the messages cached.
+            async with self.balancer.request(prefer=request.backend) as final_request:
+                final_stream = await final_request.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=True,
+                    temperature=self.temperature,
+                    # Don't include tools in follow-up to avoid infinite loops
+                )
 
-            # Stream the final response
-            async with final_stream:
-                async for chunk in final_stream:
-                    chunk_content = chunk.choices[0].delta.content
-                    if chunk_content:
-                        yield chunk_content
+                # The content before the tool calls was already streamed, make sure
+                # its last word isn't glued to the first word of the final response.
+                needs_space = bool(assistant_message_content) and not (
+                    assistant_message_content[-1][-1].isspace()
+                )
 
-        elif not tool_calls_detected and assistant_message_content:
-            # No tool calls, but we buffered content (shouldn't happen if tools not defined)
-            for content in assistant_message_content:
-                yield content
+                # Stream the final response
+                async with final_stream:
+                    async for chunk in final_stream:
+                        chunk_content = chunk.choices[0].delta.content
+                        if chunk_content:
+                            final_request.first_token()
+                            if needs_space:
+                                needs_space = False
+                                yield " "
+                            yield chunk_content
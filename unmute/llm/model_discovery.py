@@ -0,0 +1,110 @@
+"""Find out which models the LLM server serves, without blocking the event loop.
+
+The list of models is fetched in the background when the server starts and refreshed
+periodically, so picking a model for a session is just a lookup. If the LLM server
+can't be reached, the last known list is kept; if it was never reached, selecting a
+model fails with `MissingServiceUnavailable` instead of hanging.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Literal
+
+from openai import AsyncOpenAI
+
+from unmute import metrics as mt
+from unmute.exceptions import MissingServiceUnavailable
+from unmute.kyutai_constants import KYUTAI_LLM_MODEL
+
+logger = logging.getLogger(__name__)
+
+DiscoveryState = Literal["pending", "ready", "failed"]
+
+REFRESH_INTERVAL_SEC = 60.0
+# Shorter, so that we recover quickly if the LLM server starts after us
+RETRY_INTERVAL_SEC = 2.0
+
+
+class LLMModelDiscovery:
+    def __init__(
+        self,
+        client_factory: Callable[[], AsyncOpenAI],
+        default_model: str | None = KYUTAI_LLM_MODEL,
+    ):
+        self._client_factory = client_factory
+        self.default_model = default_model
+        self.models: list[str] = []
+        self.state: DiscoveryState = "pending"
+        self.error: Exception | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start refreshing the list of models in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def refresh(self) -> None:
+        """Fetch the list of models once. Errors are stored, not raised."""
+        try:
+            page = await self._client_factory().models.list()
+        except Exception as e:
+            mt.VLLM_MODEL_DISCOVERY_ERRORS.inc()
+            logger.warning(f"Failed to list the models of the LLM server: {e}")
+            self.error = e
+            if not self.models:
+                self.state = "failed"
+            return
+
+        models = [model.id for model in page.data]
+        if models != self.models:
+            logger.info(f"Models served by the LLM server: {models}")
+        self.models = models
+        self.state = "ready"
+        self.error = None
+        mt.VLLM_MODELS_AVAILABLE.set(len(models))
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(
+                REFRESH_INTERVAL_SEC if self.error is None else RETRY_INTERVAL_SEC
+            )
+
+    def select(self, preferred: str | None = None) -> str:
+        """Pick the model to use, without doing any I/O.
+
+        Args:
+            preferred: Model asked for by the character, if any. Used if the server
+                serves it, or if we can't tell.
+
+        Raises:
+            MissingServiceUnavailable: If no model is configured and the models of
+                the LLM server are not known (yet).
+            ValueError: If no model is configured and the server serves several.
+        """
+        if preferred is not None:
+            if self.state != "ready" or preferred in self.models:
+                return preferred
+            logger.warning(
+                f"Model {preferred} is not served by the LLM server, "
+                f"which serves {self.models}. Using the default model."
+            )
+
+        if self.default_model is not None:
+            return self.default_model
+
+        if not self.models:
+            if self.state == "pending":
+                reason = "the list of models is not known yet"
+            else:
+                reason = f"failed to list the models ({self.error})"
+            raise MissingServiceUnavailable("llm", reason)
+
+        if len(self.models) != 1:
+            raise ValueError("There are multiple models available. Please specify one.")
+        return self.models[0]
@@ -0,0 +1,46 @@
+"""Start generating a response before we are sure that the user's turn is over.
+
+When a pause is detected, we still flush the STT for `STT_DELAY_SEC` to get the last
+words. A `SpeculativeStream` runs the LLM on the transcript we have at the start of the
+flush and buffers its output. Once the flush is done, the response either reuses the
+buffered output, if the LLM input didn't change, or cancels it and starts over.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable
+
+
+class SpeculativeStream:
+    def __init__(
+        self,
+        messages: list[dict[str, Any]],
+        chat_completion: Callable[[list[dict[str, Any]]], AsyncIterator[str]],
+    ):
+        # Copy the list because `chat_completion()` appends tool calls to it.
+        self.messages = list(messages)
+        self._chat_completion = chat_completion
+        self._deltas: asyncio.Queue[str | None] = asyncio.Queue()
+        self._error: BaseException | None = None
+
+    def matches(self, messages: list[dict[str, Any]]) -> bool:
+        """Whether the output is valid for a response to `messages`."""
+        return self.messages == messages
+
+    async def run(self) -> None:
+        """Generate the response into the buffer. Meant to be run as a Quest."""
+        try:
+            async for delta in self._chat_completion(list(self.messages)):
+                self._deltas.put_nowait(delta)
+        except Exception as e:
+            # Re-raised on the consumer side, where the error handling is.
+            self._error = e
+        finally:
+            self._deltas.put_nowait(None)
+
+    async def stream(self) -> AsyncIterator[str]:
+        """The buffered output, then the rest as it's generated."""
+        while (delta := await self._deltas.get()) is not None:
+            yield delta
+
+        if self._error is not None:
+            raise self._error
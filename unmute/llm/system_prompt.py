@@ -1,5 +1,6 @@
 from typing import Literal
 
+from unmute.exceptions import MissingServiceUnavailable
 from unmute.llm.llm_utils import autoselect_model
 
 _SYSTEM_PROMPT_BASICS = """
@@ -82,6 +83,10 @@ LANGUAGE_CODE_TO_INSTRUCTIONS: dict[LanguageCode | None, str] = {
 }
 
 
-def get_readable_llm_name():
-    model = autoselect_model()
+def get_readable_llm_name(model: str | None = None):
+    try:
+        model = autoselect_model(model)
+    except MissingServiceUnavailable:
+        # Don't prevent sessions from starting, they fail when they call the LLM.
+        return "a large language model"
     return model.replace("-", " ").replace("_", " ")
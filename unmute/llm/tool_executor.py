@@ -2,18 +2,26 @@
 Tool execution module for character function calling.
 
 This module handles:
-- Tool parameter validation using Pydantic models
-- Tool execution with timeout enforcement
+- Tool parameter validation using Pydantic models, cached across characters
+- Tool execution with timeout enforcement, on a dedicated thread pool
+- Concurrent execution of the tool calls of one LLM turn
+- Per-session caching of the results of idempotent tools
 - Error handling and result formatting
 - Prometheus metrics for tool usage
 """
 
 import asyncio
+import hashlib
+import inspect
 import json
 import logging
-from typing import Any, Type
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Type
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 from pydantic import BaseModel, ValidationError, create_model
 
 from unmute.timer import Stopwatch
@@ -31,6 +39,12 @@ CHARACTER_TOOL_CALLS = Counter(
     ["character_name", "tool_name"],
 )
 
+CHARACTER_TOOL_CACHE_HITS = Counter(
+    "character_tool_cache_hits_total",
+    "Tool calls answered from the session's cache of tool results, see ToolResultCache",
+    ["character_name", "tool_name"],
+)
+
 CHARACTER_TOOL_ERRORS = Counter(
     "character_tool_errors_total",
     "Total number of tool execution errors by error type",
@@ -44,6 +58,67 @@ CHARACTER_TOOL_LATENCY = Histogram(
     buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25],  # 1ms to 250ms
 )
 
+# Wall time vs summed time of the tool calls of one LLM turn, to see how much running
+# them concurrently saves.
+CHARACTER_TOOL_TURN_WALL_TIME = Histogram(
+    "character_tool_turn_wall_time_seconds",
+    "Time spent executing all tool calls of one LLM turn",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+
+CHARACTER_TOOL_TURN_SUMMED_TIME = Histogram(
+    "character_tool_turn_summed_time_seconds",
+    "Sum of the durations of all tool calls of one LLM turn",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+
+# Time spent waiting for a thread of the tool pool vs running the handler, to tell
+# whether timeouts come from slow tools or from a saturated pool.
+CHARACTER_TOOL_QUEUE_WAIT = Histogram(
+    "character_tool_queue_wait_seconds",
+    "Time tool calls wait for a thread of the tool pool",
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1],
+)
+
+CHARACTER_TOOL_RUN_TIME = Histogram(
+    "character_tool_run_time_seconds",
+    "Time spent running tool handlers, including after they timed out",
+    ["handler_type"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0],
+)
+
+CHARACTER_TOOL_RUNAWAY = Gauge(
+    "character_tool_runaway",
+    "Tool calls that timed out but whose thread is still running the handler",
+)
+
+CHARACTER_TOOL_POOL_PENDING = Gauge(
+    "character_tool_pool_pending",
+    "Tool calls queued or running on the tool pool, including runaway ones",
+)
+
+CHARACTER_TOOL_VALIDATOR_CACHE = Counter(
+    "character_tool_validator_cache_total",
+    "Lookups in the cache of tool parameter models, by result (hit or miss)",
+    ["result"],
+)
+
+# How many tool calls of one LLM turn can run at the same time.
+MAX_CONCURRENT_TOOL_CALLS = 4
+
+# Maximum time a tool handler can take before its result is replaced by an error.
+TOOL_TIMEOUT_SEC = 0.1
+
+# Synchronous tool handlers run on their own threads instead of the default executor,
+# which is shared with e.g. character loading. When this many calls are queued or
+# running (timed-out ones included), new calls fail right away instead of queuing.
+TOOL_POOL_MAX_WORKERS = 8
+TOOL_POOL_MAX_PENDING = 32
+
+# How many distinct parameter schemas to keep compiled models for. Characters are
+# loaded again on every reload, and their tools usually have the same schemas.
+MAX_CACHED_PARAMETER_MODELS = 1024
+
 
 # ========================================
 # JSON Schema to Pydantic Conversion
@@ -79,12 +154,28 @@ def _json_schema_type_to_python(prop_schema: dict[str, Any]) -> Type:
     return type_mapping.get(json_type, str)
 
 
-def create_parameter_model(tool_name: str, parameters: dict[str, Any] | None) -> Type[BaseModel]:
+# Keyed by the hash of the canonical JSON of the parameter schema, in LRU order
+_parameter_models: OrderedDict[str, Type[BaseModel]] = OrderedDict()
+
+
+def _schema_hash(parameters: dict[str, Any]) -> str:
+    canonical = json.dumps(
+        parameters, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def create_parameter_model(
+    tool_name: str, parameters: dict[str, Any] | None
+) -> Type[BaseModel]:
     """
     Generate Pydantic model from JSON Schema parameters.
 
     This converts OpenAI function calling parameter schemas into Pydantic
-    models for runtime validation.
+    models for runtime validation. Creating a model is expensive, so models are
+    cached by schema and shared between all tools that have the same schema.
+    Schemas without properties don't need a model and get `BaseModel` itself,
+    which `execute_tool()` recognizes to skip validation.
 
     Args:
         tool_name: Name of the tool (used for model class name)
@@ -110,7 +201,27 @@ def create_parameter_model(tool_name: str, parameters: dict[str, Any] | None) ->
     # If no parameters or not an object schema, return empty BaseModel
     if not parameters or parameters.get("type") != "object":
         return BaseModel
+    if not parameters.get("properties"):
+        return BaseModel
+
+    key = _schema_hash(parameters)
+    model = _parameter_models.get(key)
+    if model is not None:
+        _parameter_models.move_to_end(key)
+        CHARACTER_TOOL_VALIDATOR_CACHE.labels(result="hit").inc()
+        return model
+
+    CHARACTER_TOOL_VALIDATOR_CACHE.labels(result="miss").inc()
+    model = _create_parameter_model_uncached(tool_name, parameters)
+    _parameter_models[key] = model
+    if len(_parameter_models) > MAX_CACHED_PARAMETER_MODELS:
+        _parameter_models.popitem(last=False)
+    return model
 
+
+def _create_parameter_model_uncached(
+    tool_name: str, parameters: dict[str, Any]
+) -> Type[BaseModel]:
     fields: dict[str, Any] = {}
     properties = parameters.get("properties", {})
     required = parameters.get("required", [])
@@ -133,17 +244,192 @@ def create_parameter_model(tool_name: str, parameters: dict[str, Any] | None) ->
     return create_model(model_name, **fields)
 
 
+def openai_tool_definition(tool: dict[str, Any]) -> dict[str, Any]:
+    """
+    Strip the Unmute-specific keys (e.g. `order_dependent`) from a TOOLS entry.
+
+    Args:
+        tool: Tool definition from a character's TOOLS list
+
+    Returns:
+        Tool definition that can be sent to the LLM
+    """
+    return {"type": tool.get("type", "function"), "function": tool["function"]}
+
+
+def order_dependent_tool_names(tools: list[dict[str, Any]] | None) -> set[str]:
+    """
+    Get the names of the tools marked with `"order_dependent": True` in TOOLS.
+
+    Args:
+        tools: A character's TOOLS list
+
+    Returns:
+        Set of tool names that must not run concurrently with other tool calls
+    """
+    return {
+        tool["function"]["name"] for tool in tools or [] if tool.get("order_dependent")
+    }
+
+
+def cacheable_tool_settings(
+    tools: list[dict[str, Any]] | None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Get the `"cache"` settings of the tools that have them in TOOLS.
+
+    Args:
+        tools: A character's TOOLS list
+
+    Returns:
+        Dict mapping tool names to their cache settings (`ttl_sec`, `max_entries`)
+    """
+    return {
+        tool["function"]["name"]: tool["cache"]
+        for tool in tools or []
+        if tool.get("cache")
+    }
+
+
+class ToolResultCache:
+    """The results of the cacheable tools called during one session.
+
+    Each tool has its own LRU of results keyed by its canonical (validated,
+    key-sorted) arguments, bounded by the tool's `max_entries`.
+    """
+
+    def __init__(self):
+        # (character name, tool name) -> arguments key -> (expiry time, result)
+        self._results: dict[tuple[str, str], OrderedDict[str, tuple[float, str]]] = {}
+
+    def get(
+        self, character_name: str, tool_name: str, arguments_key: str
+    ) -> str | None:
+        results = self._results.get((character_name, tool_name))
+        if results is None or arguments_key not in results:
+            return None
+
+        expires_at, result = results[arguments_key]
+        if time.monotonic() >= expires_at:
+            del results[arguments_key]
+            return None
+
+        results.move_to_end(arguments_key)
+        return result
+
+    def put(
+        self,
+        character_name: str,
+        tool_name: str,
+        arguments_key: str,
+        result: str,
+        settings: dict[str, Any],
+    ) -> None:
+        results = self._results.setdefault((character_name, tool_name), OrderedDict())
+        results[arguments_key] = (time.monotonic() + settings["ttl_sec"], result)
+        results.move_to_end(arguments_key)
+        while len(results) > settings.get("max_entries", 32):
+            results.popitem(last=False)
+
+
 # ========================================
 # Tool Execution
 # ========================================
 
 
+class ToolPoolOverloaded(Exception):
+    """Too many tool calls are queued or running on the tool pool."""
+
+
+class ToolRunner:
+    """Runs tool handlers with a timeout, sync ones on a dedicated bounded pool.
+
+    Async handlers (`async def handle_tool_call`) run on the event loop and are
+    cancelled when they time out. Sync ones run on the pool's threads: when they
+    time out while running, the thread can't be stopped, so the call is tracked as
+    a runaway until it returns and keeps counting towards the pool's limit.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tool_handler"
+        )
+        self._max_pending = max_pending
+        # Updated from the pool's threads too
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    async def run(
+        self, handler: Callable[..., Any], args: tuple[Any, ...], timeout: float
+    ) -> Any:
+        """Run `handler(*args)`.
+
+        Raises:
+            asyncio.TimeoutError: If the handler takes more than `timeout` seconds
+            ToolPoolOverloaded: If the pool already has too many calls
+        """
+        if inspect.iscoroutinefunction(handler):
+            start_time = time.perf_counter()
+            try:
+                return await asyncio.wait_for(handler(*args), timeout=timeout)
+            finally:
+                CHARACTER_TOOL_RUN_TIME.labels(handler_type="async").observe(
+                    time.perf_counter() - start_time
+                )
+
+        with self._lock:
+            if self._pending >= self._max_pending:
+                raise ToolPoolOverloaded(f"{self._pending} tool calls already pending")
+            self._pending += 1
+        CHARACTER_TOOL_POOL_PENDING.inc()
+
+        submitted_at = time.perf_counter()
+
+        def call() -> Any:
+            start_time = time.perf_counter()
+            CHARACTER_TOOL_QUEUE_WAIT.observe(start_time - submitted_at)
+            try:
+                return handler(*args)
+            finally:
+                CHARACTER_TOOL_RUN_TIME.labels(handler_type="sync").observe(
+                    time.perf_counter() - start_time
+                )
+
+        future = self._executor.submit(call)
+        future.add_done_callback(self._on_done)
+        try:
+            # Shielded so that a timeout doesn't mark the call as done while the
+            # thread is still running it.
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout=timeout
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if not future.cancel():  # Only possible if it hasn't started yet
+                CHARACTER_TOOL_RUNAWAY.inc()
+                future.add_done_callback(lambda _: CHARACTER_TOOL_RUNAWAY.dec())
+            raise
+
+    def _on_done(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+        CHARACTER_TOOL_POOL_PENDING.dec()
+
+    def shutdown(self) -> None:
+        # Runaway handlers can't be interrupted, don't wait for them.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+tool_runner = ToolRunner(TOOL_POOL_MAX_WORKERS, TOOL_POOL_MAX_PENDING)
+
+
 async def execute_tool(
     prompt_generator: Any,
     tool_name: str,
     tool_input_json: str,
     tool_validators: dict[str, Type[BaseModel]],
     character_name: str,
+    result_cache: ToolResultCache | None = None,
+    cache_settings: dict[str, Any] | None = None,
 ) -> str:
     """
     Execute a character tool with full validation and error handling.
@@ -151,7 +437,8 @@ async def execute_tool(
     This function:
     1. Parses JSON arguments from LLM
     2. Validates parameters using Pydantic model
-    3. Executes tool via character's handle_tool_call() method
+    3. Executes tool via character's handle_tool_call() method, which can be
+       async or run on the tool pool, see ToolRunner
     4. Enforces 100ms timeout
     5. Handles all errors gracefully
     6. Emits metrics and logs
@@ -162,6 +449,9 @@ async def execute_tool(
         tool_input_json: JSON string of tool arguments from LLM
         tool_validators: Dict mapping tool names to Pydantic validator models
         character_name: Character name (for metrics)
+        result_cache: The session's cache of tool results
+        cache_settings: The tool's cache settings from TOOLS, if it is cacheable.
+            Successful results are then reused for calls with the same arguments.
 
     Returns:
         Tool result string (success or error message)
@@ -188,7 +478,10 @@ async def execute_tool(
 
     # Step 2: Validate parameters
     validator = tool_validators.get(tool_name)
-    if validator:
+    if validator is BaseModel:
+        # No parameters declared, which validating with BaseModel would also give
+        tool_input = {}
+    elif validator:
         try:
             validated_input = validator(**tool_input)
             tool_input = validated_input.model_dump(exclude_none=True)
@@ -202,18 +495,31 @@ async def execute_tool(
             logger.error(f"Tool {tool_name} validation error: {error_msg}")
             return error_msg
 
+    # Serve repeated calls of cacheable tools from the session's cache
+    arguments_key = None
+    if result_cache is not None and cache_settings:
+        arguments_key = json.dumps(tool_input, sort_keys=True, default=str)
+        cached_result = result_cache.get(character_name, tool_name, arguments_key)
+        if cached_result is not None:
+            CHARACTER_TOOL_CACHE_HITS.labels(
+                character_name=character_name, tool_name=tool_name
+            ).inc()
+            logger.info(
+                f"Tool result from cache: {character_name}.{tool_name}({tool_input})"
+            )
+            return cached_result
+
     # Step 3: Execute tool with timeout and metrics
     try:
         # Start timing
         timer = Stopwatch()
 
-        # Run in thread pool to avoid blocking event loop
+        # Run in the tool pool (or on the event loop for async handlers)
         # Enforce 100ms timeout
-        result = await asyncio.wait_for(
-            asyncio.to_thread(
-                prompt_generator.handle_tool_call, tool_name, tool_input
-            ),
-            timeout=0.1,  # 100ms maximum
+        result = await tool_runner.run(
+            prompt_generator.handle_tool_call,
+            (tool_name, tool_input),
+            timeout=TOOL_TIMEOUT_SEC,
         )
 
         # Record metrics
@@ -226,17 +532,28 @@ async def execute_tool(
         # Log successful execution
         logger.info(
             f"Tool executed: {character_name}.{tool_name}({tool_input}) -> {result[:100]} "
-            f"({execution_time*1000:.1f}ms)"
+            f"({execution_time * 1000:.1f}ms)"
         )
 
         # Warn if approaching timeout
         if execution_time > 0.08:  # 80ms warning threshold
             logger.warning(
-                f"Tool {tool_name} took {execution_time*1000:.1f}ms (approaching 100ms timeout)"
+                f"Tool {tool_name} took {execution_time * 1000:.1f}ms (approaching 100ms timeout)"
+            )
+
+        if arguments_key is not None:
+            assert result_cache is not None and cache_settings is not None
+            result_cache.put(
+                character_name, tool_name, arguments_key, str(result), cache_settings
             )
 
         return str(result)
 
+    except ToolPoolOverloaded as e:
+        CHARACTER_TOOL_ERRORS.labels(error_type="overloaded").inc()
+        logger.error(f"Tool {tool_name} not run, the tool pool is overloaded: {e}")
+        return "Error: Too many tool calls in progress, try again later"
+
     except asyncio.TimeoutError:
         CHARACTER_TOOL_ERRORS.labels(error_type="timeout").inc()
         error_msg = "Error: Tool execution timed out (exceeded 100ms)"
@@ -248,3 +565,70 @@ async def execute_tool(
         error_msg = f"Error: {type(e).__name__} - {str(e)}"
         logger.error(f"Tool {tool_name} execution error: {e}", exc_info=True)
         return error_msg
+
+
+async def execute_tool_calls(
+    prompt_generator: Any,
+    tool_calls: list[tuple[str, str]],
+    tool_validators: dict[str, Type[BaseModel]],
+    character_name: str,
+    order_dependent_tools: set[str] | None = None,
+    max_concurrency: int = MAX_CONCURRENT_TOOL_CALLS,
+    result_cache: ToolResultCache | None = None,
+    tool_cache_settings: dict[str, dict[str, Any]] | None = None,
+) -> list[str]:
+    """
+    Execute the tool calls of one LLM turn, concurrently where possible.
+
+    Independent tool calls run concurrently, at most `max_concurrency` at a time.
+    A call to an order-dependent tool waits for all the calls before it and runs
+    alone, so it sees their side effects and the calls after it see its own.
+
+    Args:
+        prompt_generator: Character's PromptGenerator instance
+        tool_calls: (tool name, JSON arguments) pairs, in the order the LLM made them
+        tool_validators: Dict mapping tool names to Pydantic validator models
+        character_name: Character name (for metrics)
+        order_dependent_tools: Names of the tools that must run in call order
+        max_concurrency: Maximum number of tool calls running at the same time
+        result_cache: The session's cache of tool results
+        tool_cache_settings: Cache settings of the cacheable tools, by tool name
+
+    Returns:
+        Tool results, in the same order as `tool_calls`
+    """
+    order_dependent_tools = order_dependent_tools or set()
+    tool_cache_settings = tool_cache_settings or {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: list[str] = [""] * len(tool_calls)
+    durations: list[float] = []
+
+    async def run_one(i: int) -> None:
+        tool_name, tool_input_json = tool_calls[i]
+        async with semaphore:
+            timer = Stopwatch()
+            results[i] = await execute_tool(
+                prompt_generator,
+                tool_name,
+                tool_input_json,
+                tool_validators,
+                character_name,
+                result_cache=result_cache,
+                cache_settings=tool_cache_settings.get(tool_name),
+            )
+            durations.append(timer.time())
+
+    turn_timer = Stopwatch()
+    pending: list[int] = []
+    for i, (tool_name, _) in enumerate(tool_calls):
+        if tool_name in order_dependent_tools:
+            await asyncio.gather(*[run_one(j) for j in pending])
+            pending = []
+            await run_one(i)
+        else:
+            pending.append(i)
+    await asyncio.gather(*[run_one(j) for j in pending])
+
+    CHARACTER_TOOL_TURN_WALL_TIME.observe(turn_timer.time())
+    CHARACTER_TOOL_TURN_SUMMED_TIME.observe(sum(durations))
+    return results
@@ -0,0 +1,77 @@
+"""A stand-in for vLLM's OpenAI-compatible API that streams canned text.
+
+It simulates the cost of setting up a connection (TCP and TLS to a remote server)
+by delaying the first request of each new connection, which is what sharing
+connections between sessions saves. Run with:
+
+    DUMMY_LLM_CONNECTION_SETUP_DELAY_SEC=0.05 uv run fastapi run unmute/loadtest/dummy_llm_server.py --port 8091
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+
+MODEL_NAME = "dummy-llm"
+CONNECTION_SETUP_DELAY_SEC = float(
+    os.environ.get("DUMMY_LLM_CONNECTION_SETUP_DELAY_SEC", "0.05")
+)
+TOKEN_DELAY_SEC = float(os.environ.get("DUMMY_LLM_TOKEN_DELAY_SEC", "0.01"))
+TIME_TO_FIRST_TOKEN_SEC = float(os.environ.get("DUMMY_LLM_TTFT_SEC", "0.02"))
+RESPONSE = "This is a dummy response from the stand-in LLM server. " * 2
+
+app = FastAPI()
+
+# (host, port) of the connections we've already seen a request on
+_known_connections: set[tuple[str, int]] = set()
+
+
+@app.middleware("http")
+async def simulate_connection_setup(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    client = request.client
+    if client is not None and (client.host, client.port) not in _known_connections:
+        _known_connections.add((client.host, client.port))
+        await asyncio.sleep(CONNECTION_SETUP_DELAY_SEC)
+    return await call_next(request)
+
+
+@app.get("/v1/models")
+async def models():
+    return {
+        "object": "list",
+        "data": [
+            {"id": MODEL_NAME, "object": "model", "created": 0, "owned_by": "dummy"}
+        ],
+    }
+
+
+def _chunk(delta: dict[str, Any], finish_reason: str | None = None) -> str:
+    chunk = {
+        "id": "chatcmpl-dummy",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": MODEL_NAME,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+async def _stream_response() -> AsyncIterator[str]:
+    await asyncio.sleep(TIME_TO_FIRST_TOKEN_SEC)
+    yield _chunk({"role": "assistant", "content": ""})
+    for word in RESPONSE.split(" "):
+        yield _chunk({"content": word + " "})
+        await asyncio.sleep(TOKEN_DELAY_SEC)
+    yield _chunk({}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions():
+    return StreamingResponse(_stream_response(), media_type="text/event-stream")
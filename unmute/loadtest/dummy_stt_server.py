@@ -0,0 +1,95 @@
+"""A dummy STT server that accepts both the list and the bytes audio formats.
+
+It replies to every audio frame with a "Step" message, like moshi-server does, and
+emits a dummy word every few frames of non-silent audio. Useful to benchmark the
+STT client without a GPU, see `unmute/scripts/benchmark_stt_audio_format.py`.
+"""
+
+import logging
+from typing import Any, cast
+
+import msgpack
+import numpy as np
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+from unmute.kyutai_constants import FRAME_TIME_SEC, SPEECH_TO_TEXT_PATH
+from unmute.stt.speech_to_text import decode_audio_message
+
+app = FastAPI()
+
+logger = logging.getLogger(__name__)
+
+# Emit one word per this many frames of non-silent audio.
+FRAMES_PER_WORD = 5
+
+
+async def send_message(websocket: WebSocket, message: dict[str, Any]) -> None:
+    await websocket.send_bytes(cast(bytes, msgpack.packb(message)))
+
+
+@app.get("/api/build_info")
+def get_build_info():
+    return {"note": "this is a dummy build info"}
+
+
+@app.websocket(SPEECH_TO_TEXT_PATH)
+async def websocket_endpoint(websocket: WebSocket):
+    await websocket.accept()
+    await send_message(websocket, {"type": "Ready"})
+
+    step_idx = 0
+    voiced_frames = 0
+
+    try:
+        while True:
+            message_bytes = await websocket.receive_bytes()
+            if message_bytes == b"\0":
+                break
+
+            data = msgpack.unpackb(message_bytes)
+
+            if data["type"] == "Marker":
+                await send_message(websocket, {"type": "Marker", "id": data["id"]})
+                continue
+            elif data["type"] != "Audio":
+                raise ValueError(f"Invalid message: {data['type']}")
+
+            pcm = decode_audio_message(data["pcm"])
+            is_voiced = bool(np.abs(pcm).max(initial=0.0) > 1e-3)
+
+            if is_voiced:
+                voiced_frames += 1
+                if voiced_frames % FRAMES_PER_WORD == 1:
+                    await send_message(
+                        websocket,
+                        {
+                            "type": "Word",
+                            "text": "hello",
+                            "start_time": step_idx * FRAME_TIME_SEC,
+                        },
+                    )
+
+            # prs[2] is the pause prediction used by the client.
+            pause_prediction = 0.0 if is_voiced else 1.0
+            await send_message(
+                websocket,
+                {
+                    "type": "Step",
+                    "step_idx": step_idx,
+                    "prs": [0.0, 0.0, pause_prediction],
+                },
+            )
+            step_idx += 1
+
+    except WebSocketDisconnect:
+        print("Client disconnected")
+        return
+
+    await websocket.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    print(f"Run this via:\nfastapi dev {sys.argv[0]}")
+    exit(1)
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 import random
 
 import msgpack
@@ -9,6 +10,8 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from unmute.kyutai_constants import SAMPLE_RATE, SAMPLES_PER_FRAME
 
 TEXT_TO_SPEECH_PATH = "/api/tts_streaming"
+# Simulates the time the real server takes to set up a session before sending Ready.
+STARTUP_DELAY_SEC = float(os.environ.get("DUMMY_TTS_STARTUP_DELAY_SEC", "0.1"))
 
 app = FastAPI()
 
@@ -66,6 +69,8 @@ def get_build_info():
 @app.websocket(TEXT_TO_SPEECH_PATH)
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
+    await asyncio.sleep(STARTUP_DELAY_SEC)
+    await websocket.send_bytes(msgpack.packb({"type": "Ready"}))
 
     try:
         current_time = 0.0
@@ -82,11 +87,19 @@ async def websocket_endpoint(websocket: WebSocket):
             # message = await websocket.receive()
             logger.info(message)
 
-            if "text" in message:
+            if message["type"] == "websocket.disconnect":
+                return
+            elif message.get("text") is not None:
                 text = message["text"]
+            elif message["bytes"] == b"\0":
+                break
             else:
-                if message["bytes"] == b"\0":
+                # msgpack messages, as sent by `TextToSpeech`
+                data = msgpack.unpackb(message["bytes"])
+                if data["type"] == "Eos":
                     break
+                elif data["type"] == "Text":
+                    text = data["text"]
                 else:
                     raise ValueError(f"Invalid message: {message}")
 
@@ -141,6 +154,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
     except WebSocketDisconnect:
         print("Client disconnected")
+        return
 
     await websocket.close()
 
@@ -35,7 +35,13 @@ from unmute.loadtest.loadtest_result import (
 from unmute.timer import PhasesStopwatch
 from unmute.tts.realtime_queue import RealtimeQueue
 from unmute.tts.voices import VoiceSample
-from unmute.websocket_utils import ws_to_http
+from unmute.websocket_utils import (
+    BINARY_AUDIO_SUBPROTOCOL,
+    REALTIME_SUBPROTOCOL,
+    decode_binary_audio,
+    encode_binary_audio,
+    ws_to_http,
+)
 
 TARGET_CHANNELS = 1  # Mono
 MAX_N_MESSAGES = 6
@@ -78,6 +84,9 @@ async def emit_loop(
     audio_to_emit: asyncio.Queue[np.ndarray | CloseStream],
     voice: str,
 ):
+    binary_audio = websocket.subprotocol == BINARY_AUDIO_SUBPROTOCOL
+    n_bytes_sent = 0
+
     # An initial update is necessary for the model to send the conversation starter
     await websocket.send(
         ora.SessionUpdate(
@@ -128,16 +137,19 @@ async def emit_loop(
                 queue_up_chunk(np.zeros(OUTPUT_FRAME_SIZE, dtype=np.float32))
 
             async for _, opus_bytes in queue:
-                await websocket.send(
-                    ora.InputAudioBufferAppend(
+                if binary_audio:
+                    message = encode_binary_audio(opus_bytes)
+                else:
+                    message = ora.InputAudioBufferAppend(
                         audio=base64.b64encode(opus_bytes).decode("utf-8"),
                     ).model_dump_json()
-                )
+                n_bytes_sent += len(message)
+                await websocket.send(message)
 
     except websockets.ConnectionClosed as e:
         emit_logger.info(f"Connection closed while sending messages: {e}")
 
-    emit_logger.info("Finished sending messages.")
+    emit_logger.info(f"Finished sending messages. Sent {n_bytes_sent} bytes of audio.")
 
 
 async def receive_loop(
@@ -158,12 +170,28 @@ async def receive_loop(
 
     chat_history = []
     benchmark_chat_history: list[BenchmarkMessage] = []
+    n_audio_bytes_received = 0
+
+    def receive_opus(opus_bytes: bytes):
+        assistant_stopwatch.time_phase_if_not_started(
+            "audio_start",
+            # On rare occasions, the audio_start is before the text_start
+            check_previous=False,
+        )
+
+        pcm = opus_reader.append_bytes(opus_bytes)
+
+        if pcm.size:
+            current_audio_chunks.append(pcm)
 
     try:
         async for message_raw in websocket:
-            assert isinstance(message_raw, str), (
-                f"Message is not a string: {message_raw}"
-            )
+            if isinstance(message_raw, bytes):
+                # Audio when using BINARY_AUDIO_SUBPROTOCOL
+                n_audio_bytes_received += len(message_raw)
+                receive_opus(decode_binary_audio(message_raw))
+                continue
+
             message: ora.ServerEvent = TypeAdapter(
                 Annotated[ora.ServerEvent, Field(discriminator="type")]
             ).validate_json(message_raw)
@@ -194,18 +222,8 @@ async def receive_loop(
             elif isinstance(message, ora.UnmuteResponseTextDeltaReady):
                 assistant_stopwatch.time_phase_if_not_started("text_start")
             elif isinstance(message, ora.ResponseAudioDelta):
-                assistant_stopwatch.time_phase_if_not_started(
-                    "audio_start",
-                    # On rare occasions, the audio_start is before the text_start
-                    check_previous=False,
-                )
-
-                base64_audio = message.delta
-                binary_audio_data = base64.b64decode(base64_audio)
-                pcm = opus_reader.append_bytes(binary_audio_data)
-
-                if pcm.size:
-                    current_audio_chunks.append(pcm)
+                n_audio_bytes_received += len(message_raw)
+                receive_opus(base64.b64decode(message.delta))
 
             elif isinstance(message, ora.ResponseAudioDone):
                 n_samples_received = sum(len(b) for b in current_audio_chunks)
@@ -268,6 +286,7 @@ async def receive_loop(
         if e.code != websockets.CloseCode.NORMAL_CLOSURE:
             return e
 
+    receive_logger.info(f"Received {n_audio_bytes_received} bytes of audio.")
     return benchmark_chat_history
 
 
@@ -306,15 +325,22 @@ async def _main(
     server_url: str,
     basic_auth: tuple[str, str] | None,
     listen: bool,
+    binary_audio: bool = False,
 ) -> list[BenchmarkMessage] | BaseException:
     voice = get_voice(server_url, basic_auth)
 
     websocket_url = f"{server_url.strip('/')}/v1/realtime"
+    subprotocols = [websockets.Subprotocol(REALTIME_SUBPROTOCOL)]
+    if binary_audio:
+        subprotocols.insert(0, websockets.Subprotocol(BINARY_AUDIO_SUBPROTOCOL))
+
     async with websockets.connect(
         websocket_url,
-        subprotocols=[websockets.Subprotocol("realtime")],
+        subprotocols=subprotocols,
     ) as websocket:
-        main_logger.info(f"Connected to {websocket_url}")
+        main_logger.info(
+            f"Connected to {websocket_url} with subprotocol {websocket.subprotocol}"
+        )
         audio_to_emit: asyncio.Queue[np.ndarray | CloseStream] = asyncio.Queue()
 
         emit_task = asyncio.create_task(emit_loop(websocket, audio_to_emit, voice))
@@ -333,13 +359,20 @@ def main_one_worker(
     listen: bool,
     catch_exceptions: bool = False,
     delay: float = 0.0,
+    binary_audio: bool = False,
 ) -> list[BenchmarkMessage] | BaseException:
     if delay > 0:
         time.sleep(delay)
 
     try:
         return asyncio.run(
-            _main(audio_files_data, server_url, basic_auth, listen=listen)
+            _main(
+                audio_files_data,
+                server_url,
+                basic_auth,
+                listen=listen,
+                binary_audio=binary_audio,
+            )
         )
     except Exception as e:
         if not catch_exceptions:
@@ -370,6 +403,7 @@ def main(
     listen: bool,
     n_workers: int = 1,
     n_conversations: int = 1,
+    binary_audio: bool = False,
 ):
     check_health(server_url, basic_auth)
 
@@ -397,6 +431,7 @@ def main(
                     # If there are more tasks than workers, we don't want to keep
                     # increasing the delay, hence the modulo
                     DELAY_STEP * (i % n_workers),
+                    binary_audio,
                 )
                 for i in range(n_conversations)
             ),
@@ -467,6 +502,12 @@ if __name__ == "__main__":
         type=int,
         help="How many conversations to run in total. By default, equal to n_workers.",
     )
+    parser.add_argument(
+        "--binary-audio",
+        action="store_true",
+        help="Send and receive audio as binary frames instead of base64 in JSON. "
+        "Compare the number of audio bytes logged with and without this flag.",
+    )
     parser.add_argument("--username", type=str, help="Username for HTTP basic auth.")
     parser.add_argument("--password", type=str, help="Password for HTTP basic auth.")
 
@@ -482,4 +523,5 @@ if __name__ == "__main__":
         listen=args.listen,
         n_workers=args.n_workers,
         n_conversations=args.n_conversations or args.n_workers,
+        binary_audio=args.binary_audio,
     )
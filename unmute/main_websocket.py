@@ -7,7 +7,6 @@ from typing import Annotated
 
 import numpy as np
 import requests
-import sphn
 from fastapi import (
     FastAPI,
     File,
@@ -34,10 +33,12 @@ from unmute import metrics as mt
 from unmute.exceptions import (
     MissingServiceAtCapacity,
     MissingServiceTimeout,
+    MissingServiceUnavailable,
     WebSocketClosedError,
     make_ora_error,
 )
 from unmute.kyutai_constants import (
+    CHARACTERS_WATCH_INTERVAL_SEC,
     KYUTAI_LLM_API_KEY,
     LLM_SERVER,
     MAX_VOICE_FILE_SIZE_MB,
@@ -46,7 +47,10 @@ from unmute.kyutai_constants import (
     TTS_SERVER,
     VOICE_CLONING_SERVER,
 )
-from unmute.service_discovery import async_ttl_cached
+from unmute.llm.llm_utils import close_openai_clients, llm_balancer, model_discovery
+from unmute.llm.tool_executor import tool_runner
+from unmute.opus_codec import OpusCodecWorker
+from unmute.service_discovery import async_ttl_cached, resolver
 from unmute.timer import Stopwatch
 from unmute.tts.voice_cloning import clone_voice
 from unmute.tts.voice_donation import (
@@ -54,15 +58,29 @@ from unmute.tts.voice_donation import (
     generate_verification,
     submit_voice_donation,
 )
-from unmute.tts.character_loader import CharacterManager
+from unmute.tts.character_loader import (
+    CharacterManager,
+    CharacterRegistry,
+    get_character_registry,
+    watch_character_registry,
+)
+from unmute.tts.tts_pool import tts_pool
 from unmute.tts.voices import VoiceList
 from unmute.unmute_handler import UnmuteHandler
+from unmute.websocket_utils import (
+    BINARY_AUDIO_SUBPROTOCOL,
+    REALTIME_SUBPROTOCOL,
+    decode_binary_audio,
+    encode_binary_audio,
+)
 
 app = FastAPI()
 
 # Global CharacterManager instance (used only for /v1/voices endpoint for initial character discovery)
 # Per-session character management is handled by UnmuteHandler.character_manager
 _character_manager: CharacterManager | None = None
+# Reloads the default characters when they change, see CHARACTERS_WATCH_INTERVAL_SEC
+_character_watch_task: asyncio.Task | None = None
 
 # Global set to track active WebSocket connections (legacy, kept for compatibility)
 _active_websockets: set[WebSocket] = set()
@@ -104,23 +122,65 @@ async def startup_event():
     """Load default characters for /v1/voices endpoint.
 
     Note: Each WebSocket session creates its own CharacterManager instance.
-    This global manager is only used for the /v1/voices HTTP endpoint.
+    This global manager is only used for the /v1/voices HTTP endpoint. Loading the
+    shared registry here also means that the first session doesn't have to.
     """
     global _character_manager
     from pathlib import Path
 
+    # Find out which models the LLM serves in the background, without making
+    # sessions wait for it.
+    model_discovery.start()
+    llm_balancer.start()
+
     _character_manager = CharacterManager(session_id="global")
     characters_dir = Path(__file__).parents[1] / "characters"
 
     try:
-        result = await _character_manager.load_characters(characters_dir)
+        registry = await get_character_registry(characters_dir)
+        result = _character_manager.use_registry(registry)
         logger.info(
             f"Global character loading complete: {result.loaded_count}/{result.total_files} files loaded "
             f"({result.error_count} errors) in {result.load_duration:.2f}s"
         )
     except FileNotFoundError as e:
-        logger.warning(f"Character directory not found: {e}. Starting with empty character list.")
+        logger.warning(
+            f"Character directory not found: {e}. Starting with empty character list."
+        )
         _character_manager.characters = {}
+        return
+
+    if CHARACTERS_WATCH_INTERVAL_SEC > 0:
+        global _character_watch_task
+        _character_watch_task = asyncio.create_task(
+            watch_character_registry(
+                characters_dir,
+                CHARACTERS_WATCH_INTERVAL_SEC,
+                on_reload=_on_character_registry_reload,
+            )
+        )
+
+
+def _on_character_registry_reload(registry: CharacterRegistry):
+    result = get_character_manager().use_registry(registry)
+    voices.cache_clear()
+    logger.info(
+        f"Characters changed on disk, reloaded {registry.directory}: "
+        f"added {result.added_files}, changed {result.changed_files}, "
+        f"removed {result.removed_files}"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if _character_watch_task is not None:
+        _character_watch_task.cancel()
+    await tts_pool.close()
+    tool_runner.shutdown()
+    model_discovery.stop()
+    llm_balancer.stop()
+    resolver.stop()
+    await close_openai_clients()
 
 
 def get_character_manager() -> CharacterManager:
@@ -129,7 +189,9 @@ def get_character_manager() -> CharacterManager:
     Note: For WebSocket sessions, use handler.character_manager instead.
     """
     if _character_manager is None:
-        raise RuntimeError("CharacterManager not initialized. Call startup_event() first.")
+        raise RuntimeError(
+            "CharacterManager not initialized. Call startup_event() first."
+        )
     return _character_manager
 
 
@@ -159,8 +221,7 @@ async def terminate_all_sessions(reason: str = "Server is reloading characters")
             if ws.client_state == WebSocketState.CONNECTED:
                 # Send a graceful error message before closing
                 error_event = make_ora_error(
-                    type="fatal",
-                    message=reason + ". Please reconnect."
+                    type="fatal", message=reason + ". Please reconnect."
                 )
                 await ws.send_text(error_event.model_dump_json())
                 await ws.close(code=1012, reason=reason)  # 1012 = Service Restart
@@ -292,10 +353,16 @@ def voices():
 
 class CharacterReloadRequest(BaseModel):
     """Request model for reloading characters from a new directory."""
+
     directory: str = Field(
         ...,
         description="Absolute path to the directory containing character files. "
-        "Use 'default' to reload the default characters/ directory."
+        "Use 'default' to reload the default characters/ directory.",
+    )
+    full_reload: bool = Field(
+        False,
+        description="Re-import every file instead of only the ones whose content "
+        "changed. Needed when a helper module imported by character files changed.",
     )
 
 
@@ -304,8 +371,10 @@ async def reload_characters_endpoint(request: CharacterReloadRequest):
     """
     [DEPRECATED] Global character reload endpoint.
 
-    This endpoint reloads the global character manager used by /v1/voices.
-    It does NOT affect active WebSocket sessions, which have their own character managers.
+    This endpoint reloads the global character manager used by /v1/voices, and the
+    shared character registry of the directory. For the default directory, new
+    WebSocket sessions get the reloaded characters. It does NOT affect active
+    WebSocket sessions, which keep the characters they started with.
 
     **Recommended approach**: Use the WebSocket event `session.characters.reload` for
     per-session character reloading without affecting other users.
@@ -341,25 +410,27 @@ async def reload_characters_endpoint(request: CharacterReloadRequest):
     # Validate the directory exists
     if not characters_dir.exists():
         raise HTTPException(
-            status_code=404,
-            detail=f"Directory not found: {characters_dir}"
+            status_code=404, detail=f"Directory not found: {characters_dir}"
         )
 
     if not characters_dir.is_dir():
         raise HTTPException(
-            status_code=400,
-            detail=f"Path is not a directory: {characters_dir}"
+            status_code=400, detail=f"Path is not a directory: {characters_dir}"
         )
 
     try:
-        # Step 1: Reload characters
-        result = await character_manager.reload_characters(characters_dir)
+        # Step 1: Reload characters. This replaces the shared registry of the
+        # directory, so new sessions get the new characters too.
+        registry = await get_character_registry(
+            characters_dir, reload=True, incremental=not request.full_reload
+        )
+        result = character_manager.use_registry(registry)
 
         # Step 2: Clear the cache for the /v1/voices endpoint
         voices.cache_clear()
 
-        # Note: We no longer terminate sessions since they have their own character managers
-        # This only affects the global manager used by /v1/voices
+        # Note: We no longer terminate sessions since they keep referencing the
+        # registry they started with
         logger.info(
             f"Global characters reloaded successfully: {result.loaded_count}/{result.total_files} loaded "
             f"from {characters_dir}. Active sessions are unaffected."
@@ -374,21 +445,20 @@ async def reload_characters_endpoint(request: CharacterReloadRequest):
                 "loaded_count": result.loaded_count,
                 "error_count": result.error_count,
                 "load_duration": result.load_duration,
-                "message": f"Successfully loaded {result.loaded_count} characters from {characters_dir}"
-            }
+                "added_files": result.added_files,
+                "changed_files": result.changed_files,
+                "removed_files": result.removed_files,
+                "message": f"Successfully loaded {result.loaded_count} characters from {characters_dir}",
+            },
         )
 
     except FileNotFoundError as e:
         logger.error(f"Character reload failed: {e}")
-        raise HTTPException(
-            status_code=404,
-            detail=str(e)
-        )
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Character reload failed with unexpected error: {e}")
         raise HTTPException(
-            status_code=500,
-            detail=f"Failed to reload characters: {str(e)}"
+            status_code=500, detail=f"Failed to reload characters: {str(e)}"
         )
 
 
@@ -493,7 +563,16 @@ async def websocket_route(websocket: WebSocket):
             # protocol(s) it supports and OpenAI uses "realtime" as the value. If we
             # don't set this, the client will think this is not the right endpoint and
             # will not connect.
-            await websocket.accept(subprotocol="realtime")
+            # Our own clients can also offer BINARY_AUDIO_SUBPROTOCOL to get rid of the
+            # base64 and JSON overhead for audio.
+            binary_audio = BINARY_AUDIO_SUBPROTOCOL in websocket.scope.get(
+                "subprotocols", []
+            )
+            await websocket.accept(
+                subprotocol=BINARY_AUDIO_SUBPROTOCOL
+                if binary_audio
+                else REALTIME_SUBPROTOCOL
+            )
 
             # Register this websocket for reload tracking
             _active_websockets.add(websocket)
@@ -501,7 +580,7 @@ async def websocket_route(websocket: WebSocket):
             handler = UnmuteHandler()
             async with handler:
                 await handler.start_up()
-                await _run_route(websocket, handler)
+                await _run_route(websocket, handler, binary_audio=binary_audio)
 
         except Exception as exc:
             await _report_websocket_exception(websocket, exc)
@@ -539,6 +618,11 @@ async def _report_websocket_exception(websocket: WebSocket, exc: Exception):
             error_message = (
                 f"Service '{exc.service}' timed out. Please try again later."
             )
+        elif isinstance(exc, MissingServiceUnavailable):
+            mt.FATAL_SERVICE_MISSES.inc()
+            error_message = (
+                f"Service '{exc.service}' is not available. Please try again later."
+            )
         elif isinstance(exc, WebSocketClosedError):
             logger.debug("Websocket was closed.")
         else:
@@ -565,7 +649,9 @@ async def _report_websocket_exception(websocket: WebSocket, exc: Exception):
             logger.warning("Socket already closed.")
 
 
-async def _run_route(websocket: WebSocket, handler: UnmuteHandler):
+async def _run_route(
+    websocket: WebSocket, handler: UnmuteHandler, binary_audio: bool = False
+):
     health = await get_health()
     if not health.ok:
         logger.info("Health check failed, closing WebSocket connection.")
@@ -575,18 +661,27 @@ async def _run_route(websocket: WebSocket, handler: UnmuteHandler):
         )
         return
 
-    emit_queue: asyncio.Queue[ora.ServerEvent] = asyncio.Queue()
+    emit_queue: asyncio.Queue[ora.ServerEvent] = handler.output_channel.new_queue()
+    codec = OpusCodecWorker(
+        SAMPLE_RATE, name=f"opus_codec({handler.character_manager.session_id})"
+    )
     try:
         async with asyncio.TaskGroup() as tg:
             tg.create_task(
-                receive_loop(websocket, handler, emit_queue), name="receive_loop()"
+                receive_loop(websocket, handler, emit_queue, codec),
+                name="receive_loop()",
             )
             tg.create_task(
-                emit_loop(websocket, handler, emit_queue), name="emit_loop()"
+                emit_loop(
+                    websocket, handler, emit_queue, codec, binary_audio=binary_audio
+                ),
+                name="emit_loop()",
             )
             tg.create_task(handler.quest_manager.wait(), name="quest_manager.wait()")
             tg.create_task(debug_running_tasks(), name="debug_running_tasks()")
     finally:
+        codec.close()
+        mt.SESSION_EMIT_WAKEUPS.observe(handler.output_channel.n_wakeups)
         await handler.cleanup()
         logger.info("websocket_route() finished")
 
@@ -595,16 +690,39 @@ async def receive_loop(
     websocket: WebSocket,
     handler: UnmuteHandler,
     emit_queue: asyncio.Queue[ora.ServerEvent],
+    codec: OpusCodecWorker,
 ):
     """Receive messages from the WebSocket.
 
-    Can decide to send messages via `emit_queue`.
+    Can decide to send messages via `emit_queue`. Audio can come either as JSON
+    events or as binary frames, see BINARY_AUDIO_SUBPROTOCOL.
     """
-    opus_reader = sphn.OpusStreamReader(SAMPLE_RATE)
     wait_for_first_opus = True
+
+    async def receive_opus(
+        opus_bytes: bytes,
+    ) -> ora.UnmuteInputAudioBufferAppendAnonymized | None:
+        nonlocal wait_for_first_opus
+        if wait_for_first_opus:
+            # Somehow the UI is sending us potentially old messages from a previous
+            # connection on reconnect, so that we might get some old OGG packets,
+            # waiting for the bit set for first packet to feed to the decoder.
+            if opus_bytes[5] & 2:
+                wait_for_first_opus = False
+            else:
+                return None
+        pcm = await codec.decode(opus_bytes)
+
+        if pcm.size:
+            await handler.receive((SAMPLE_RATE, pcm[np.newaxis, :]))
+
+        return ora.UnmuteInputAudioBufferAppendAnonymized(
+            number_of_samples=pcm.size,
+        )
+
     while True:
         try:
-            message_raw = await websocket.receive_text()
+            message_raw = await _receive_text_or_bytes(websocket)
         except WebSocketDisconnect as e:
             logger.info(
                 "receive_loop() stopped because WebSocket disconnected: "
@@ -619,6 +737,25 @@ async def receive_loop(
             logger.info("receive_loop() stopped because WebSocket disconnected.")
             raise WebSocketClosedError() from e
 
+        if isinstance(message_raw, bytes):
+            try:
+                opus_bytes = decode_binary_audio(message_raw)
+            except ValueError as e:
+                await emit_queue.put(
+                    ora.Error(
+                        error=ora.ErrorDetails(
+                            type="invalid_request_error",
+                            message=str(e),
+                        )
+                    )
+                )
+                continue
+
+            audio_to_record = await receive_opus(opus_bytes)
+            if audio_to_record is not None and handler.recorder is not None:
+                await handler.recorder.add_event("client", audio_to_record)
+            continue
+
         try:
             message: ora.ClientEvent = ClientEventAdapter.validate_json(message_raw)
         except json.JSONDecodeError as e:
@@ -646,23 +783,7 @@ async def receive_loop(
         message_to_record = message
 
         if isinstance(message, ora.InputAudioBufferAppend):
-            opus_bytes = base64.b64decode(message.audio)
-            if wait_for_first_opus:
-                # Somehow the UI is sending us potentially old messages from a previous
-                # connection on reconnect, so that we might get some old OGG packets,
-                # waiting for the bit set for first packet to feed to the decoder.
-                if opus_bytes[5] & 2:
-                    wait_for_first_opus = False
-                else:
-                    continue
-            pcm = await asyncio.to_thread(opus_reader.append_bytes, opus_bytes)
-
-            message_to_record = ora.UnmuteInputAudioBufferAppendAnonymized(
-                number_of_samples=pcm.size,
-            )
-
-            if pcm.size:
-                await handler.receive((SAMPLE_RATE, pcm[np.newaxis, :]))
+            message_to_record = await receive_opus(base64.b64decode(message.audio))
         elif isinstance(message, ora.SessionUpdate):
             await handler.update_session(message.session)
             await emit_queue.put(ora.SessionUpdated(session=message.session))
@@ -673,9 +794,11 @@ async def receive_loop(
                 # Resolve "default" to actual default directory
                 if message.directory == "default":
                     from pathlib import Path
+
                     characters_dir = Path(__file__).parent / "characters"
                 else:
                     from pathlib import Path
+
                     characters_dir = Path(message.directory)
 
                 # Validate directory exists
@@ -704,7 +827,9 @@ async def receive_loop(
                     continue
 
                 # Load characters
-                result = await handler.character_manager.reload_characters(characters_dir)
+                result = await handler.character_manager.reload_characters(
+                    characters_dir
+                )
 
                 # Check if any characters loaded successfully
                 if result.loaded_count == 0:
@@ -723,8 +848,8 @@ async def receive_loop(
                 characters = [
                     ora.CharacterInfo(
                         name=char.name,
-                        good=char.good if hasattr(char, 'good') else None,
-                        comment=char.comment if hasattr(char, 'comment') else None,
+                        good=char.good if hasattr(char, "good") else None,
+                        comment=char.comment if hasattr(char, "comment") else None,
                     )
                     for char in result.characters.values()
                 ]
@@ -763,15 +888,17 @@ async def receive_loop(
                 characters = [
                     ora.CharacterInfo(
                         name=char.name,
-                        good=char.good if hasattr(char, 'good') else None,
-                        comment=char.comment if hasattr(char, 'comment') else None,
+                        good=char.good if hasattr(char, "good") else None,
+                        comment=char.comment if hasattr(char, "comment") else None,
                     )
                     for char in handler.character_manager.characters.values()
                 ]
 
                 await emit_queue.put(
                     ora.SessionCharactersListed(
-                        directory=str(handler.character_manager._current_directory or ""),
+                        directory=str(
+                            handler.character_manager._current_directory or ""
+                        ),
                         character_count=len(characters),
                         characters=characters,
                     )
@@ -801,6 +928,43 @@ async def receive_loop(
             await handler.recorder.add_event("client", message_to_record)
 
 
+async def _receive_text_or_bytes(websocket: WebSocket) -> str | bytes:
+    """Like `websocket.receive_text()`, but binary frames are returned as bytes."""
+    if websocket.application_state != WebSocketState.CONNECTED:
+        raise RuntimeError('WebSocket is not connected. Need to call "accept" first.')
+
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+
+    if message.get("text") is not None:
+        return message["text"]
+    return message["bytes"]
+
+
+async def _send(websocket: WebSocket, data: str | bytes):
+    try:
+        if isinstance(data, bytes):
+            await websocket.send_bytes(data)
+        else:
+            await websocket.send_text(data)
+    except (WebSocketDisconnect, RuntimeError) as e:
+        if isinstance(e, RuntimeError):
+            if "Unexpected ASGI message 'websocket.send'" in str(e):
+                # This is expected when the client disconnects
+                message = f"emit_loop() stopped because WebSocket disconnected: {e}"
+            else:
+                raise
+        else:
+            message = (
+                "emit_loop() stopped because WebSocket disconnected: "
+                f"{e.code=} {e.reason=}"
+            )
+
+        logger.info(message)
+        raise WebSocketClosedError() from e
+
+
 class EmitDebugLogger:
     def __init__(self):
         self.last_emitted_n = 0
@@ -823,11 +987,15 @@ async def emit_loop(
     websocket: WebSocket,
     handler: UnmuteHandler,
     emit_queue: asyncio.Queue[ora.ServerEvent],
+    codec: OpusCodecWorker,
+    binary_audio: bool = False,
 ):
-    """Send messages to the WebSocket."""
-    emit_debug_logger = EmitDebugLogger()
+    """Send messages to the WebSocket.
 
-    opus_writer = sphn.OpusStreamWriter(SAMPLE_RATE)
+    If `binary_audio` is set, audio is sent as binary frames instead of
+    `ora.ResponseAudioDelta` events, see BINARY_AUDIO_SUBPROTOCOL.
+    """
+    emit_debug_logger = EmitDebugLogger()
 
     while True:
         if (
@@ -837,58 +1005,55 @@ async def emit_loop(
             logger.info("emit_loop() stopped because WebSocket disconnected")
             raise WebSocketClosedError()
 
-        try:
-            to_emit = emit_queue.get_nowait()
-        except asyncio.QueueEmpty:
-            emitted_by_handler = await handler.emit()
+        # The control events and the handler's output share one channel that only
+        # wakes us up when something was put. The handler's queue is replaced on
+        # interruptions, which is why we pass it again every time.
+        emitted_by_handler = await handler.output_channel.get(
+            (emit_queue, handler.output_queue)
+        )
 
-            if emitted_by_handler is None:
+        if emitted_by_handler is None:
+            continue
+        elif isinstance(emitted_by_handler, AdditionalOutputs):
+            assert len(emitted_by_handler.args) == 1
+            to_emit = ora.UnmuteAdditionalOutputs(
+                args=emitted_by_handler.args[0],
+            )
+        elif isinstance(emitted_by_handler, CloseStream):
+            # Close here explicitly so that the receive loop stops too
+            await websocket.close()
+            break
+        elif isinstance(emitted_by_handler, ora.ServerEvent):
+            to_emit = emitted_by_handler
+        else:
+            _sr, audio = emitted_by_handler
+            audio = audio_to_float32(audio)
+            opus_bytes = await codec.encode(audio)
+            # Due to buffering/chunking, Opus doesn't necessarily output something on every PCM added
+            if not opus_bytes:
                 continue
-            elif isinstance(emitted_by_handler, AdditionalOutputs):
-                assert len(emitted_by_handler.args) == 1
-                to_emit = ora.UnmuteAdditionalOutputs(
-                    args=emitted_by_handler.args[0],
-                )
-            elif isinstance(emitted_by_handler, CloseStream):
-                # Close here explicitly so that the receive loop stops too
-                await websocket.close()
-                break
-            elif isinstance(emitted_by_handler, ora.ServerEvent):
-                to_emit = emitted_by_handler
-            else:
-                _sr, audio = emitted_by_handler
-                audio = audio_to_float32(audio)
-                opus_bytes = await asyncio.to_thread(opus_writer.append_pcm, audio)
-                # Due to buffering/chunking, Opus doesn't necessarily output something on every PCM added
-                if opus_bytes:
-                    to_emit = ora.ResponseAudioDelta(
-                        delta=base64.b64encode(opus_bytes).decode("utf-8"),
+
+            if binary_audio:
+                if handler.recorder is not None:
+                    await handler.recorder.add_event(
+                        "server",
+                        ora.ResponseAudioDelta(
+                            delta=base64.b64encode(opus_bytes).decode("utf-8")
+                        ),
                     )
-                else:
-                    continue
+                await _send(websocket, encode_binary_audio(opus_bytes))
+                continue
+
+            to_emit = ora.ResponseAudioDelta(
+                delta=base64.b64encode(opus_bytes).decode("utf-8"),
+            )
 
         emit_debug_logger.on_emit(to_emit)
 
         if handler.recorder is not None:
             await handler.recorder.add_event("server", to_emit)
 
-        try:
-            await websocket.send_text(to_emit.model_dump_json())
-        except (WebSocketDisconnect, RuntimeError) as e:
-            if isinstance(e, RuntimeError):
-                if "Unexpected ASGI message 'websocket.send'" in str(e):
-                    # This is expected when the client disconnects
-                    message = f"emit_loop() stopped because WebSocket disconnected: {e}"
-                else:
-                    raise
-            else:
-                message = (
-                    "emit_loop() stopped because WebSocket disconnected: "
-                    f"{e.code=} {e.reason=}"
-                )
-
-            logger.info(message)
-            raise WebSocketClosedError() from e
+        await _send(websocket, to_emit.model_dump_json())
 
 
 def _cors_headers_for_error(request: Request):
@@ -63,6 +63,20 @@ NUM_WORDS_REPLY_BINS = [5.0, 10.0, 25.0, 50.0, 100.0, 200.0]
 SESSIONS = Counter("worker_sessions", "")
 SERVICE_MISSES = Counter("worker_service_misses", "")
 HARD_SERVICE_MISSES = Counter("worker_hard_service_misses", "")
+# Connections to the STT or TTS closed because another instance accepted us first
+SERVICE_RACE_LOSERS = Counter("worker_service_race_losers", "", ["service"])
+# STT and TTS instances not tried for a while after hard errors, see
+# unmute/instance_scoreboard.py
+SERVICE_INSTANCES_COOLING_DOWN = Gauge(
+    "worker_service_instances_cooling_down", "", ["service"]
+)
+SERVICE_COOL_DOWNS = Counter("worker_service_cool_downs", "", ["service"])
+# Resolving the hostnames of the services in the background, see
+# unmute/dns_resolver.py. The members are the IPs that the hostname resolves to.
+DNS_RESOLVE_TIME = Histogram("worker_dns_resolve_time", "", ["host"], buckets=PING_BINS)
+DNS_RESOLVE_ERRORS = Counter("worker_dns_resolve_errors", "", ["host"])
+DNS_MEMBERS = Gauge("worker_dns_members", "", ["host"])
+DNS_MEMBERSHIP_CHANGES = Counter("worker_dns_membership_changes", "", ["host"])
 FORCE_DISCONNECTS = Counter("worker_force_disconnects", "")
 FATAL_SERVICE_MISSES = Counter("worker_fatal_service_misses", "")
 HARD_ERRORS = Counter("worker_hard_errors", "")
@@ -71,6 +85,21 @@ SESSION_DURATION = Histogram(
     "worker_session_duration", "", buckets=SESSION_DURATION_BINS
 )
 HEALTH_OK = Summary("worker_health_ok", "")
+# How many times the emit loop woke up, in total and per session.
+EMIT_WAKEUPS = Counter("worker_emit_wakeups", "")
+SESSION_EMIT_WAKEUPS = Histogram(
+    "worker_session_emit_wakeups", "", buckets=[10, 100, 1000, 10000, 100000]
+)
+
+# See unmute/opus_codec.py. The queue depth is how many packets were pending when the
+# codec thread of a session picked up work.
+OPUS_CODEC_PENDING = Gauge("worker_opus_codec_pending", "")
+OPUS_CODEC_QUEUE_DEPTH = Histogram(
+    "worker_opus_codec_queue_depth", "", buckets=[1, 2, 3, 5, 10, 20]
+)
+OPUS_CODEC_LATENCY = Histogram(
+    "worker_opus_codec_latency", "", ["operation"], buckets=PING_BINS
+)
 
 STT_SESSIONS = Counter("worker_stt_sessions", "")
 STT_ACTIVE_SESSIONS = Gauge("worker_stt_active_sessions", "")
@@ -107,14 +136,20 @@ TTS_AUDIO_DURATION = Histogram(
 TTS_GEN_DURATION = Histogram(
     "worker_tts_gen_duration", "", buckets=GENERATION_DURATION_BINS
 )
+TTS_POOL_HITS = Counter("worker_tts_pool_hits", "")
+TTS_POOL_MISSES = Counter("worker_tts_pool_misses", "")
+TTS_POOL_DISCARDED = Counter("worker_tts_pool_discarded", "", ["reason"])
+TTS_POOL_REFILL_ERRORS = Counter("worker_tts_pool_refill_errors", "", ["error_type"])
+TTS_POOL_IDLE = Gauge("worker_tts_pool_idle", "")
 
 VLLM_SESSIONS = Counter("worker_vllm_sessions", "")
-VLLM_ACTIVE_SESSIONS = Gauge("worker_vllm_active_sessions", "")
+# Requests in flight, by LLM instance
+VLLM_ACTIVE_SESSIONS = Gauge("worker_vllm_active_sessions", "", ["backend"])
 VLLM_INTERRUPTS = Counter("worker_vllm_interrupt", "")
 VLLM_HARD_ERRORS = Counter("worker_vllm_hard_errors", "")
 VLLM_SENT_WORDS = Counter("worker_vllm_sent_words", "")
 VLLM_RECV_WORDS = Counter("worker_vllm_recv_words", "")
-VLLM_TTFT = Histogram("worker_vllm_ttft", "", buckets=TTFT_BINS_VLLM)
+VLLM_TTFT = Histogram("worker_vllm_ttft", "", ["backend"], buckets=TTFT_BINS_VLLM)
 VLLM_REQUEST_LENGTH = Histogram(
     "worker_vllm_request_length", "", buckets=NUM_WORDS_REQUEST_BINS
 )
@@ -124,6 +159,34 @@ VLLM_REPLY_LENGTH = Histogram(
 VLLM_GEN_DURATION = Histogram(
     "worker_vllm_gen_duration", "", buckets=GENERATION_DURATION_BINS
 )
+# "confirmed" if the speculative LLM output was used, "restarted" if the transcript
+# changed during the STT flush.
+VLLM_SPECULATIONS = Counter("worker_vllm_speculations", "", ["outcome"])
+# Old turns dropped to stay under the token budget, see unmute/llm/context_window.py.
+# The tokens are estimated.
+VLLM_HISTORY_TRIMS = Counter("worker_vllm_history_trims", "")
+VLLM_HISTORY_DROPPED_TOKENS = Counter("worker_vllm_history_dropped_tokens", "")
+VLLM_MODELS_AVAILABLE = Gauge("worker_vllm_models_available", "")
+VLLM_MODEL_DISCOVERY_ERRORS = Counter("worker_vllm_model_discovery_errors", "")
+# HTTP requests to the LLM server, by whether they opened a new connection ("new") or
+# used a keep-alive one ("reused"). See unmute/llm/llm_http_client.py.
+VLLM_HTTP_REQUESTS = Counter("worker_vllm_http_requests", "", ["connection"])
+VLLM_HTTP_IN_FLIGHT = Gauge("worker_vllm_http_in_flight", "")
+# Time waiting for a connection from the pool, which is ~0 unless it's full
+VLLM_HTTP_QUEUE_TIME = Histogram(
+    "worker_vllm_http_queue_time",
+    "",
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0],
+)
+VLLM_HTTP_CONNECT_TIME = Histogram(
+    "worker_vllm_http_connect_time",
+    "",
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+# LLM instances that requests are balanced over, see unmute/llm/llm_balancer.py.
+VLLM_BACKENDS = Gauge("worker_vllm_backends", "")
+VLLM_BACKEND_ERRORS = Counter("worker_vllm_backend_errors", "", ["backend"])
+VLLM_BACKEND_EJECTIONS = Counter("worker_vllm_backend_ejections", "", ["backend"])
 
 VOICE_DONATION_SUBMISSIONS = Counter("worker_voice_donation_submissions", "")
 
@@ -136,6 +199,18 @@ CHARACTER_LOAD_DURATION = Histogram(
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0]
 )
 CHARACTERS_LOADED = Gauge("worker_characters_loaded", "Number of characters currently loaded")
+CHARACTER_REGISTRY_LOADS = Counter(
+    "worker_character_registry_loads",
+    "Number of times a shared character registry was (re)loaded",
+)
+CHARACTER_LAZY_IMPORTS = Counter(
+    "worker_character_lazy_imports",
+    "Number of lazily indexed character modules imported on first use",
+)
+CHARACTER_REGISTRY_VERSION = Gauge(
+    "worker_character_registry_version",
+    "Version of the most recently loaded shared character registry",
+)
 
 # Per-session character management metrics
 CHARACTER_RELOAD_DURATION = Histogram(
@@ -0,0 +1,115 @@
+"""Opus encoding and decoding on a dedicated thread per session.
+
+Running every packet through `asyncio.to_thread()` means going through the default
+executor that all sessions share, so under load packets wait behind other sessions'
+work and the audio gets jittery. Instead, each session gets one long-lived thread that
+owns the Opus stream state. Packets are processed in the order they were submitted,
+and when several are pending, they're handled as a batch and their results are handed
+back to the event loop in one go.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal
+
+import numpy as np
+import sphn
+
+from unmute import metrics as mt
+
+CodecOperation = Literal["encode", "decode"]
+
+
+@dataclass
+class _Job:
+    operation: CodecOperation
+    function: Callable[[Any], Any]
+    argument: Any
+    future: asyncio.Future[Any]
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class OpusCodecWorker:
+    def __init__(self, sample_rate: int, name: str = "opus_codec"):
+        self._reader = sphn.OpusStreamReader(sample_rate)
+        self._writer = sphn.OpusStreamWriter(sample_rate)
+        self._jobs: queue.SimpleQueue[_Job | None] = queue.SimpleQueue()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread = threading.Thread(target=self._work, name=name, daemon=True)
+        self._closed = False
+
+    async def decode(self, opus_bytes: bytes) -> np.ndarray:
+        """Decode Opus bytes into PCM. Returns an empty array if no frame is ready."""
+        return await self._submit("decode", self._reader.append_bytes, opus_bytes)
+
+    async def encode(self, pcm: np.ndarray) -> bytes:
+        """Encode PCM into Opus bytes. Returns b"" if no page is ready."""
+        return await self._submit("encode", self._writer.append_pcm, pcm)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._loop is not None:  # Otherwise the thread was never started
+            self._jobs.put(None)
+
+    async def _submit(
+        self, operation: CodecOperation, function: Callable[[Any], Any], argument: Any
+    ) -> Any:
+        if self._closed:
+            raise RuntimeError("The Opus codec worker is closed.")
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._thread.start()
+
+        future = self._loop.create_future()
+        mt.OPUS_CODEC_PENDING.inc()
+        self._jobs.put(_Job(operation, function, argument, future))
+        return await future
+
+    def _work(self) -> None:
+        assert self._loop is not None
+        while True:
+            batch = [self._jobs.get()]
+            # Take everything that's pending so that it's handled in one go.
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            jobs = [job for job in batch if job is not None]
+            if jobs:
+                mt.OPUS_CODEC_QUEUE_DEPTH.observe(len(jobs))
+            results = []
+            for job in jobs:
+                try:
+                    results.append((job, job.function(job.argument), None))
+                except Exception as e:
+                    results.append((job, None, e))
+
+            try:
+                self._loop.call_soon_threadsafe(self._resolve, results)
+            except RuntimeError:
+                return  # The event loop is closed, nobody is waiting anymore.
+
+            if batch[-1] is None:
+                return
+
+    @staticmethod
+    def _resolve(results: list[tuple[_Job, Any, Exception | None]]) -> None:
+        now = time.perf_counter()
+        for job, result, error in results:
+            mt.OPUS_CODEC_PENDING.dec()
+            mt.OPUS_CODEC_LATENCY.labels(operation=job.operation).observe(
+                now - job.submitted_at
+            )
+            if job.future.done():
+                continue  # Cancelled
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
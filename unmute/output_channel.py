@@ -0,0 +1,72 @@
+"""Merge the outputs of a session into a single channel that never polls.
+
+A session produces events from several places: the handler's output queue (which gets
+replaced when the bot is interrupted) and the control events of the websocket route.
+All of these queues share one `asyncio.Event`, so the consumer sleeps until something
+is actually put in any of them instead of waking up on a timeout.
+"""
+
+import asyncio
+from typing import Any, Sequence, TypeVar, overload
+
+from unmute import metrics as mt
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+
+class WakeupQueue(asyncio.Queue[T]):
+    """An `asyncio.Queue` that wakes up its `OutputChannel` when an item is put."""
+
+    def __init__(self, wakeup: asyncio.Event):
+        super().__init__()
+        self._wakeup = wakeup
+
+    def put_nowait(self, item: T) -> None:
+        # `put()` goes through here too.
+        super().put_nowait(item)
+        self._wakeup.set()
+
+
+class OutputChannel:
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self.n_wakeups = 0
+
+    def new_queue(self) -> WakeupQueue:
+        return WakeupQueue(self._wakeup)
+
+    @overload
+    async def get(self, queues: tuple[asyncio.Queue[T]]) -> T | None: ...
+
+    @overload
+    async def get(
+        self, queues: tuple[asyncio.Queue[T], asyncio.Queue[U]]
+    ) -> T | U | None: ...
+
+    async def get(self, queues: Sequence[asyncio.Queue[Any]]) -> Any:
+        """Get an item from the first non-empty queue, waiting if they're all empty.
+
+        Returns None when woken up without an item being available, e.g. because the
+        queue it was put in was replaced in the meantime. The caller should then
+        just call again with the current queues.
+        """
+        item = _get_first_nowait(queues)
+        if item is not None:
+            return item
+
+        await self._wakeup.wait()
+        # Clearing before looking at the queues again means we can't miss a put.
+        self._wakeup.clear()
+        self.n_wakeups += 1
+        mt.EMIT_WAKEUPS.inc()
+        return _get_first_nowait(queues)
+
+
+def _get_first_nowait(queues: Sequence[asyncio.Queue[Any]]) -> Any:
+    for queue in queues:
+        try:
+            return queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    return None
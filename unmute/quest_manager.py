@@ -81,8 +81,12 @@ class Quest[T]:
     async def __aexit__(self, *exc: Any):
         await self.remove()
 
-    async def remove(self):
+    async def remove(self, close: bool = True):
+        """Cancel the quest. With `close=False`, the close step is skipped, for when the
+        data of the init step has been handed over to someone else."""
         assert self.task is not None
+        if not close:
+            self.close = None
         try:
             if self.close is not None:
                 # We explicitely wait on the init being successful to avoid weird mixed-status.
@@ -126,12 +130,12 @@ class QuestManager:
         future.add_done_callback(partial(self._one_is_done, name, self._future))
         return quest
 
-    async def remove(self, name: str):
+    async def remove(self, name: str, close: bool = True):
         try:
             quest = self.quests.pop(name)
         except KeyError:
             return
-        await quest.remove()
+        await quest.remove(close=close)
 
     @staticmethod
     def _one_is_done(name: str, agg_future: asyncio.Future, future: asyncio.Future):
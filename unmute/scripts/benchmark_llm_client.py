@@ -0,0 +1,84 @@
+"""Measure the time to first token of the first LLM request of new sessions.
+
+Compares giving each session its own client, as sessions used to, with the client
+shared by the whole process, which keeps connections alive between sessions. Run
+against the dummy LLM server:
+
+    DUMMY_LLM_CONNECTION_SETUP_DELAY_SEC=0.05 uv run fastapi run unmute/loadtest/dummy_llm_server.py --port 8091
+    KYUTAI_LLM_URL=http://localhost:8091 uv run unmute/scripts/benchmark_llm_client.py
+"""
+
+import argparse
+import asyncio
+
+import numpy as np
+from openai import AsyncOpenAI
+from prometheus_client import REGISTRY
+
+from unmute.kyutai_constants import KYUTAI_LLM_API_KEY, LLM_SERVER
+from unmute.llm.llm_utils import VLLMStream, close_openai_clients, get_openai_client
+from unmute.timer import Stopwatch
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful assistant."},
+    {"role": "user", "content": "Hello."},
+]
+
+
+async def run_session(shared: bool, model: str) -> float:
+    if shared:
+        client = get_openai_client()
+    else:
+        client = AsyncOpenAI(
+            api_key=KYUTAI_LLM_API_KEY or "EMPTY", base_url=LLM_SERVER + "/v1"
+        )
+
+    stopwatch = Stopwatch()
+    time_to_first_token = None
+    async for _ in VLLMStream(client, model=model).chat_completion(list(MESSAGES)):
+        if time_to_first_token is None:
+            time_to_first_token = stopwatch.time()
+
+    if not shared:
+        await client.close()
+    assert time_to_first_token is not None
+    return time_to_first_token
+
+
+async def benchmark(shared: bool, n_sessions: int, model: str) -> list[float]:
+    times = []
+    for _ in range(n_sessions):
+        times.append(await run_session(shared, model))
+        await asyncio.sleep(0.1)
+
+    await close_openai_clients()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-sessions", type=int, default=20)
+    parser.add_argument("--model", type=str, default="dummy-llm")
+    args = parser.parse_args()
+
+    for shared in [False, True]:
+        times = np.array(asyncio.run(benchmark(shared, args.n_sessions, args.model)))
+        name = "shared" if shared else "per-session"
+        print(
+            f"[{name:>11}] time to first token: "
+            f"mean {times.mean() * 1000:.1f} ms, "
+            f"median {np.median(times) * 1000:.1f} ms, "
+            f"p90 {np.percentile(times, 90) * 1000:.1f} ms"
+        )
+
+    requests = {
+        connection: REGISTRY.get_sample_value(
+            "worker_vllm_http_requests_total", {"connection": connection}
+        )
+        for connection in ["new", "reused"]
+    }
+    print(f"HTTP requests of the shared client by connection: {requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the CPU cost of the "list" and "bytes" STT audio formats.
+
+Without --stt-url, only the encoding is measured. With --stt-url, the given number of
+sessions stream audio in real time to an STT server that accepts both formats, such as
+the dummy one:
+
+    uv run fastapi run unmute/loadtest/dummy_stt_server.py --port 8090
+    uv run unmute/scripts/benchmark_stt_audio_format.py --stt-url ws://localhost:8090
+"""
+
+import argparse
+import asyncio
+import time
+from typing import get_args
+
+import numpy as np
+
+from unmute.kyutai_constants import FRAME_TIME_SEC, SAMPLE_RATE, SAMPLES_PER_FRAME
+from unmute.stt.speech_to_text import (
+    SpeechToText,
+    STTAudioFormat,
+    encode_audio_message,
+)
+
+
+def make_frame() -> np.ndarray:
+    t = np.arange(SAMPLES_PER_FRAME) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def benchmark_encoding(audio_format: STTAudioFormat, n_frames: int) -> float:
+    """Return the CPU time per frame, in seconds."""
+    frame = make_frame()
+    start = time.process_time()
+    for _ in range(n_frames):
+        encode_audio_message(frame, audio_format)
+    return (time.process_time() - start) / n_frames
+
+
+async def _run_session(stt_url: str, audio_format: STTAudioFormat, n_frames: int):
+    stt = SpeechToText(stt_url, audio_format=audio_format)
+    await stt.start_up()
+
+    async def _consume():
+        async for _ in stt:
+            pass
+
+    consumer = asyncio.create_task(_consume())
+    frame = make_frame()
+    for _ in range(n_frames):
+        await stt.send_audio(frame)
+        await asyncio.sleep(FRAME_TIME_SEC)
+
+    await stt.shutdown()
+    await consumer
+
+
+async def benchmark_sessions(
+    stt_url: str, audio_format: STTAudioFormat, n_sessions: int, duration_sec: float
+) -> float:
+    """Return the client CPU time per session per second of audio."""
+    n_frames = int(duration_sec / FRAME_TIME_SEC)
+    start = time.process_time()
+    await asyncio.gather(
+        *[_run_session(stt_url, audio_format, n_frames) for _ in range(n_sessions)]
+    )
+    return (time.process_time() - start) / n_sessions / duration_sec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stt-url", type=str, default=None)
+    parser.add_argument("--n-frames", type=int, default=10_000)
+    parser.add_argument("--n-sessions", type=int, default=16)
+    parser.add_argument("--duration-sec", type=float, default=10.0)
+    args = parser.parse_args()
+
+    for audio_format in get_args(STTAudioFormat):
+        per_frame = benchmark_encoding(audio_format, args.n_frames)
+        print(
+            f"[{audio_format:>5}] encoding: {per_frame * 1e6:.1f} us CPU/frame, "
+            f"{per_frame / FRAME_TIME_SEC * 100:.3f}% of a core per session"
+        )
+
+    if args.stt_url is None:
+        return
+
+    for audio_format in get_args(STTAudioFormat):
+        per_session = asyncio.run(
+            benchmark_sessions(
+                args.stt_url, audio_format, args.n_sessions, args.duration_sec
+            )
+        )
+        print(
+            f"[{audio_format:>5}] {args.n_sessions} sessions: "
+            f"{per_session * 100:.3f}% of a core per session"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure how many TTS audio frames per second one process can decode.
+
+Compares the generic path (msgpack + pydantic validation + np.array) with
+`decode_tts_message()`, for both float32 and float64 encoded samples.
+"""
+
+import argparse
+import time
+from typing import Callable, cast
+
+import msgpack
+import numpy as np
+
+from unmute.kyutai_constants import FRAME_TIME_SEC, SAMPLES_PER_FRAME
+from unmute.tts.text_to_speech import (
+    TTSAudioMessage,
+    TTSMessageAdapter,
+    decode_tts_message,
+)
+
+
+def decode_generic(message_bytes: bytes) -> np.ndarray:
+    message = TTSMessageAdapter.validate_python(msgpack.unpackb(message_bytes))
+    assert isinstance(message, TTSAudioMessage)
+    return np.array(message.pcm, dtype=np.float32)
+
+
+def decode_fast(message_bytes: bytes) -> np.ndarray:
+    message = decode_tts_message(message_bytes)
+    assert isinstance(message, TTSAudioMessage)
+    return message.pcm
+
+
+def frames_per_second(
+    decode: Callable[[bytes], np.ndarray], message_bytes: bytes, n_frames: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(n_frames):
+        decode(message_bytes)
+    return n_frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-frames", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pcm = rng.uniform(-0.5, 0.5, SAMPLES_PER_FRAME).astype(np.float32)
+
+    for use_single_float in [True, False]:
+        message_bytes = cast(
+            bytes,
+            msgpack.packb(
+                {"type": "Audio", "pcm": pcm.tolist()},
+                use_single_float=use_single_float,
+            ),
+        )
+        np.testing.assert_allclose(decode_fast(message_bytes), pcm)
+
+        precision = "float32" if use_single_float else "float64"
+        for name, decode in [("generic", decode_generic), ("fast", decode_fast)]:
+            fps = frames_per_second(decode, message_bytes, args.n_frames)
+            # A session receives 1 / FRAME_TIME_SEC frames per second of audio.
+            print(
+                f"[{precision}] {name:>7}: {fps:,.0f} frames/s "
+                f"(~{fps * FRAME_TIME_SEC:,.0f} real-time sessions per core)"
+            )
+
+
+if __name__ == "__main__":
+    main()
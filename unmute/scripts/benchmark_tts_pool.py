@@ -0,0 +1,78 @@
+"""Measure the time to first audio of a TTS turn with and without the connection pool.
+
+The time is measured from the moment a response starts, so it includes finding a TTS
+instance and waiting for Ready, which is what the pool saves. Run against the dummy
+TTS server:
+
+    DUMMY_TTS_STARTUP_DELAY_SEC=0.1 uv run fastapi run unmute/loadtest/dummy_tts_server.py --port 8089
+    KYUTAI_TTS_URL=ws://localhost:8089 uv run unmute/scripts/benchmark_tts_pool.py
+"""
+
+import argparse
+import asyncio
+from functools import partial
+
+import numpy as np
+
+from unmute.service_discovery import find_instance
+from unmute.timer import Stopwatch
+from unmute.tts.text_to_speech import TextToSpeech, TTSAudioMessage, TTSClientEosMessage
+from unmute.tts.tts_pool import TTSConnectionPool
+
+
+async def run_turn(pool: TTSConnectionPool | None, voice: str | None) -> float:
+    stopwatch = Stopwatch()
+
+    tts = await pool.checkout(voice) if pool is not None else None
+    if tts is None:
+        tts = await find_instance("tts", partial(TextToSpeech, voice=voice))
+    tts.bind_session()
+
+    await tts.send("Hi there.")
+    await tts.send(TTSClientEosMessage())
+
+    time_to_first_audio = None
+    # Consume everything so that the TTS closes the connection cleanly.
+    async for message in tts:
+        if isinstance(message, TTSAudioMessage) and time_to_first_audio is None:
+            time_to_first_audio = stopwatch.time()
+
+    assert time_to_first_audio is not None
+    return time_to_first_audio
+
+
+async def benchmark(use_pool: bool, n_turns: int, voice: str | None) -> list[float]:
+    pool = TTSConnectionPool(size_per_voice=1) if use_pool else None
+    if pool is not None:
+        pool.prewarm(voice)
+
+    times = []
+    for _ in range(n_turns):
+        # Users take a while to answer, which gives the pool time to refill.
+        await asyncio.sleep(0.5)
+        times.append(await run_turn(pool, voice))
+
+    if pool is not None:
+        await pool.close()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-turns", type=int, default=20)
+    parser.add_argument("--voice", type=str, default=None)
+    args = parser.parse_args()
+
+    for use_pool in [False, True]:
+        times = np.array(asyncio.run(benchmark(use_pool, args.n_turns, args.voice)))
+        name = "pool" if use_pool else "no pool"
+        print(
+            f"[{name:>7}] time to first audio: "
+            f"mean {times.mean() * 1000:.1f} ms, "
+            f"median {np.median(times) * 1000:.1f} ms, "
+            f"p90 {np.percentile(times, 90) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
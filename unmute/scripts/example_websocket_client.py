@@ -13,6 +13,12 @@ import websockets
 from fastrtc import audio_to_int16
 
 from unmute.kyutai_constants import SAMPLE_RATE
+from unmute.websocket_utils import (
+    BINARY_AUDIO_SUBPROTOCOL,
+    REALTIME_SUBPROTOCOL,
+    decode_binary_audio,
+    encode_binary_audio,
+)
 
 INPUT_FRAME_SIZE = 960
 TARGET_SAMPLE_RATE = 24000
@@ -29,43 +35,65 @@ async def send_messages(websocket: websockets.ClientConnection, audio_path: Path
     data, _sr = sphn.read(audio_path, sample_rate=SAMPLE_RATE)
     data = data[0]  # Take first channel to make it mono
 
+    # With the binary audio subprotocol (Unmute only), audio is sent as Opus in binary
+    # frames. Otherwise, it's sent as base64 PCM in JSON, like OpenAI expects.
+    binary_audio = websocket.subprotocol == BINARY_AUDIO_SUBPROTOCOL
+    opus_writer = sphn.OpusStreamWriter(SAMPLE_RATE)
+    n_bytes_sent = 0
+
+    async def send_audio(audio: np.ndarray):
+        nonlocal n_bytes_sent
+        if binary_audio:
+            opus_bytes = opus_writer.append_pcm(audio.astype(np.float32))
+            if not opus_bytes:
+                return
+            message = encode_binary_audio(opus_bytes)
+        else:
+            event = {
+                "type": "input_audio_buffer.append",
+                "audio": base64_encode_audio(audio),
+            }
+            message = json.dumps(event)
+
+        n_bytes_sent += len(message)
+        await websocket.send(message)
+
     try:
         while True:
             chunk_size = 1920  # Send data in chunks
             for i in range(0, len(data), chunk_size):
-                event = {
-                    "type": "input_audio_buffer.append",
-                    "audio": base64_encode_audio(data[i : i + chunk_size]),
-                }
-
-                await websocket.send(json.dumps(event))
+                await send_audio(data[i : i + chunk_size])
                 await asyncio.sleep(0.01)  # Simulate real-time streaming
 
             await websocket.send(json.dumps({"type": "input_audio_buffer.commit"}))
             await websocket.send(json.dumps({"type": "response.create"}))
 
             for _ in range(0, len(data), chunk_size):
-                event = {
-                    "type": "input_audio_buffer.append",
-                    "audio": base64_encode_audio(
-                        np.zeros(chunk_size, dtype=np.float32)
-                    ),
-                }
-
-                await websocket.send(json.dumps(event))
+                await send_audio(np.zeros(chunk_size, dtype=np.float32))
                 await asyncio.sleep(0.01)  # Simulate real-time streaming
     except websockets.ConnectionClosed:
         print("Connection closed while sending messages.")
+        print(f"Sent {n_bytes_sent} bytes of audio.")
 
 
 async def receive_messages(websocket: websockets.ClientConnection):
     buffer = []
     transcript = ""
+    opus_reader = sphn.OpusStreamReader(SAMPLE_RATE)
+    n_bytes_received = 0
 
     try:
-        async for message in websocket:
-            message = json.loads(message)
+        async for message_raw in websocket:
+            if isinstance(message_raw, bytes):
+                # Opus audio, when using the binary audio subprotocol
+                n_bytes_received += len(message_raw)
+                pcm = opus_reader.append_bytes(decode_binary_audio(message_raw))
+                buffer.append(audio_to_int16(pcm).tobytes())
+                continue
+
+            message = json.loads(message_raw)
             if message["type"] == "response.audio.delta":
+                n_bytes_received += len(message_raw)
                 base64_audio = message["delta"]
                 binary_audio_data = base64.b64decode(base64_audio)
                 buffer.append(binary_audio_data)
@@ -80,6 +108,8 @@ async def receive_messages(websocket: websockets.ClientConnection):
     except websockets.ConnectionClosed:
         print("Connection closed while receiving messages.")
 
+    print(f"Received {n_bytes_received} bytes of audio.")
+
     # save and play using pydub
     audio = pydub.AudioSegment(
         data=b"".join(buffer),
@@ -91,7 +121,7 @@ async def receive_messages(websocket: websockets.ClientConnection):
     pydub.playback.play(audio)
 
 
-async def main(audio_path: Path, server_url: str):
+async def main(audio_path: Path, server_url: str, binary_audio: bool = False):
     if "openai.com" in server_url:
         additional_headers = {
             "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
@@ -102,10 +132,14 @@ async def main(audio_path: Path, server_url: str):
         additional_headers = {}
         query_string = ""
 
+    subprotocols = [websockets.Subprotocol(REALTIME_SUBPROTOCOL)]
+    if binary_audio:
+        subprotocols.insert(0, websockets.Subprotocol(BINARY_AUDIO_SUBPROTOCOL))
+
     async with websockets.connect(
         f"{server_url}/v1/realtime?{query_string}",
         additional_headers=additional_headers,
-        subprotocols=[websockets.Subprotocol("realtime")],
+        subprotocols=subprotocols,
     ) as websocket:
         send_task = asyncio.create_task(send_messages(websocket, audio_path))
         receive_task = asyncio.create_task(receive_messages(websocket))
@@ -115,7 +149,16 @@ async def main(audio_path: Path, server_url: str):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--server-url", type=str, default="wss://api.openai.com")
+    parser.add_argument(
+        "--binary-audio",
+        action="store_true",
+        help="Send and receive Opus audio as binary frames. Only for Unmute servers.",
+    )
     parser.add_argument("audio_path", type=Path)
     args = parser.parse_args()
 
-    asyncio.run(main(args.audio_path, server_url=args.server_url))
+    asyncio.run(
+        main(
+            args.audio_path, server_url=args.server_url, binary_audio=args.binary_audio
+        )
+    )
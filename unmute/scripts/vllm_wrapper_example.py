@@ -6,6 +6,7 @@ from typing import Any, cast
 
 from unmute.kyutai_constants import LLM_SERVER
 from unmute.llm.llm_utils import VLLMStream, get_openai_client, rechunk_to_words
+from unmute.llm.model_discovery import LLMModelDiscovery
 
 # Predefined message
 PREDEFINED_MESSAGE = "Explain the second law of thermodynamics"
@@ -13,7 +14,9 @@ PREDEFINED_MESSAGE = "Explain the second law of thermodynamics"
 
 async def main(server_url: str):
     client = get_openai_client(server_url=server_url)
-    s = VLLMStream(client)
+    model_discovery = LLMModelDiscovery(lambda: client)
+    await model_discovery.refresh()
+    s = VLLMStream(client, model=model_discovery.select())
 
     messages = [
         {"role": "system", "content": "You are a helpful assistant."},
@@ -3,16 +3,22 @@
 import asyncio
 import logging
 import random
-import socket
 import time
 import typing as tp
 from collections import defaultdict
 from collections.abc import Awaitable
-from functools import partial, wraps
+from functools import wraps
 
 from unmute import metrics as mt
+from unmute.dns_resolver import DNSResolver
 from unmute.exceptions import MissingServiceAtCapacity, MissingServiceTimeout
-from unmute.kyutai_constants import LLM_SERVER, STT_SERVER, TTS_SERVER
+from unmute.instance_scoreboard import InstanceScoreboard
+from unmute.kyutai_constants import (
+    LLM_SERVER,
+    SERVICE_RACE_STAGGER_SEC,
+    STT_SERVER,
+    TTS_SERVER,
+)
 from unmute.timer import Stopwatch
 
 logger = logging.getLogger(__name__)
@@ -49,17 +55,14 @@ def async_ttl_cached(func: tp.Callable[[K], Awaitable[V]], ttl_sec: float = 0.1)
     return cached
 
 
-@partial(async_ttl_cached, ttl_sec=0.5)
-async def _resolve(hostname: str) -> list[str]:
-    *_, ipaddrlist = await asyncio.to_thread(socket.gethostbyname_ex, hostname)
-    return ipaddrlist
+resolver = DNSResolver()
 
 
 async def get_instances(service_name: str) -> list[str]:
     url = SERVICES[service_name]
     protocol, remaining = url.split("://", 1)
     hostname, port = remaining.split(":", 1)
-    ips = list(await _resolve(hostname))
+    ips = await resolver.get(hostname)
     random.shuffle(ips)
     return [f"{protocol}://{ip}:{port}" for ip in ips]
 
@@ -69,79 +72,157 @@ class ServiceWithStartup(tp.Protocol):
         """Initiate connection. Should raise an exception if the instance is not ready."""
         ...
 
+    async def close_unused(self) -> None:
+        """Close a connection that was started up but is not going to be used."""
+        ...
+
+
+# How the instances treated this process recently, to decide which ones to try first
+scoreboard = InstanceScoreboard()
+# Keeps a reference to the tasks closing the connections we didn't use.
+_cleanup_tasks: set[asyncio.Task] = set()
+
+
+def _observe_ping_time(service_name: str, elapsed: float) -> None:
+    if service_name == "tts":
+        mt.TTS_PING_TIME.observe(elapsed)
+    elif service_name == "stt":
+        mt.STT_PING_TIME.observe(elapsed)
+
+
+def _record_failed_attempt(
+    service_name: str, instance: str, exc: BaseException, elapsed: float
+) -> None:
+    if isinstance(exc, MissingServiceAtCapacity):
+        logger.info(
+            f"[{service_name}] Instance {instance} took {elapsed * 1000:.1f}ms to reject us."
+        )
+        _observe_ping_time(service_name, elapsed)
+        scoreboard.record(service_name, instance, "reject", elapsed)
+        return
+
+    scoreboard.record(service_name, instance, "hard_miss")
+    mt.HARD_SERVICE_MISSES.inc()
+    if service_name == "tts":
+        mt.TTS_HARD_MISSES.inc()
+    elif service_name == "stt":
+        mt.STT_HARD_MISSES.inc()
+    if isinstance(exc, TimeoutError):
+        logger.warning(f"[{service_name}] Instance {instance} did not reply in time.")
+    else:
+        logger.error(
+            f"[{service_name}] Unexpected error connecting to {instance}: {exc}."
+        )
+
+
+async def _start_up(client: ServiceWithStartup, timeout_sec: float) -> None:
+    async with asyncio.timeout(timeout_sec):
+        await client.start_up()
+
+
+async def _close_losers(
+    service_name: str, attempts: dict[asyncio.Task[None], ServiceWithStartup]
+) -> None:
+    """Wait for the cancelled attempts to stop, and close the ones that succeeded."""
+    await asyncio.wait(attempts)
+    for task, client in attempts.items():
+        if task.cancelled() or task.exception() is not None:
+            continue  # start_up() closes the connection itself when it fails
+        mt.SERVICE_RACE_LOSERS.labels(service=service_name).inc()
+        try:
+            await client.close_unused()
+        except Exception as e:
+            logger.warning(f"[{service_name}] Error closing an unused connection: {e}")
+
 
 async def find_instance(
     service_name: str,
     client_factory: tp.Callable[[str], S],
     timeout_sec: float = 0.5,
     max_trials: int = 3,
+    stagger_sec: float = SERVICE_RACE_STAGGER_SEC,
 ) -> S:
+    """Connect to one of the instances of a service.
+
+    The instances are tried in a random order that favors the ones that accepted us
+    recently, see `InstanceScoreboard`. When an instance hasn't answered after
+    `stagger_sec`, or as soon as it fails, the next one is tried without waiting for
+    the previous one ("happy eyeballs"). The first instance to accept us wins, and the
+    attempts still in progress are cancelled. With `stagger_sec >= timeout_sec`, the
+    instances are tried one after the other.
+    """
     stopwatch = Stopwatch()
-    instances = await get_instances(service_name)
-    max_trials = min(len(instances), max_trials)
-    for instance in instances:
-        client = client_factory(instance)
-        logger.debug(f"[{service_name}]Trying to connect to {instance}")
-        pingwatch = Stopwatch()
-        try:
-            async with asyncio.timeout(timeout_sec):
-                await client.start_up()
-        except Exception as exc:
-            max_trials -= 1
-            if isinstance(exc, MissingServiceAtCapacity):
+    instances = scoreboard.order(service_name, await get_instances(service_name))
+    instances = instances[:max_trials]
+    next_instance_i = 0
+    # The attempts in progress, by the task that runs them
+    attempts: dict[asyncio.Task[None], tuple[str, S, Stopwatch]] = {}
+    winner: tuple[str, S, float] | None = None
+    losers: dict[asyncio.Task[None], ServiceWithStartup] = {}
+    last_exc: BaseException | None = None
+
+    try:
+        while winner is None and (next_instance_i < len(instances) or attempts):
+            if next_instance_i < len(instances):
+                instance = instances[next_instance_i]
+                next_instance_i += 1
+                client = client_factory(instance)
+                logger.debug(f"[{service_name}]Trying to connect to {instance}")
+                task = asyncio.create_task(_start_up(client, timeout_sec))
+                attempts[task] = (instance, client, Stopwatch())
+
+            done, _ = await asyncio.wait(
+                attempts,
+                timeout=stagger_sec if next_instance_i < len(instances) else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            # In the order they were started, to prefer the first one on ties
+            for task in [task for task in attempts if task in done]:
+                instance, client, pingwatch = attempts.pop(task)
                 elapsed = pingwatch.time()
-                logger.info(
-                    f"[{service_name}] Instance {instance} took {elapsed * 1000:.1f}ms to reject us."
-                )
-                if service_name == "tts":
-                    mt.TTS_PING_TIME.observe(elapsed)
-                elif service_name == "stt":
-                    mt.STT_PING_TIME.observe(elapsed)
-            else:
-                mt.HARD_SERVICE_MISSES.inc()
-                if service_name == "tts":
-                    mt.TTS_HARD_MISSES.inc()
-                elif service_name == "stt":
-                    mt.STT_HARD_MISSES.inc()
-                if isinstance(exc, TimeoutError):
-                    logger.warning(
-                        f"[{service_name}] Instance {instance} did not reply in time."
-                    )
+                exc = task.exception()
+                if exc is not None:
+                    _record_failed_attempt(service_name, instance, exc, elapsed)
+                    last_exc = exc
                 else:
-                    logger.error(
-                        f"[{service_name}] Unexpected error connecting to {instance}: {exc}."
-                    )
-            if max_trials > 0:
-                continue
-            else:
-                mt.SERVICE_MISSES.inc()
-                if service_name == "tts":
-                    mt.TTS_MISSES.inc()
-                elif service_name == "stt":
-                    mt.STT_MISSES.inc()
-                if isinstance(exc, MissingServiceAtCapacity):
-                    raise
-                else:
-                    if isinstance(exc, TimeoutError):
-                        raise MissingServiceTimeout(service_name) from exc
+                    scoreboard.record(service_name, instance, "accept", elapsed)
+                    if winner is None:
+                        winner = (instance, client, elapsed)
                     else:
-                        raise  # Let internal errors propagate
-        elapsed = pingwatch.time()
-        logger.info(
-            f"[{service_name}] Instance {instance} took {elapsed * 1000:.1f}ms to accept us."
-        )
-
-        if service_name == "tts":
-            mt.TTS_PING_TIME.observe(elapsed)
-        elif service_name == "stt":
-            mt.STT_PING_TIME.observe(elapsed)
-        elapsed = stopwatch.time()
+                        losers[task] = client  # Accepted at the same time
+    finally:
+        # Also when we're cancelled ourselves
+        for task, (_, client, _) in attempts.items():
+            task.cancel()
+            losers[task] = client
+        if losers:
+            cleanup_task = asyncio.create_task(_close_losers(service_name, losers))
+            _cleanup_tasks.add(cleanup_task)
+            cleanup_task.add_done_callback(_cleanup_tasks.discard)
+
+    if winner is None:
+        mt.SERVICE_MISSES.inc()
         if service_name == "tts":
-            mt.TTS_FIND_TIME.observe(elapsed)
+            mt.TTS_MISSES.inc()
         elif service_name == "stt":
-            mt.STT_FIND_TIME.observe(elapsed)
-        logger.info(
-            f"[{service_name}] Connection to {instance} took {1000 * elapsed:.1f}ms."
-        )
-        return client
-    raise AssertionError("Should not be reached.")
+            mt.STT_MISSES.inc()
+        if last_exc is None:
+            raise AssertionError("Should not be reached.")  # No instances
+        if isinstance(last_exc, TimeoutError):
+            raise MissingServiceTimeout(service_name) from last_exc
+        raise last_exc  # Including MissingServiceAtCapacity
+
+    instance, client, elapsed = winner
+    logger.info(
+        f"[{service_name}] Instance {instance} took {elapsed * 1000:.1f}ms to accept us."
+    )
+    _observe_ping_time(service_name, elapsed)
+    elapsed = stopwatch.time()
+    if service_name == "tts":
+        mt.TTS_FIND_TIME.observe(elapsed)
+    elif service_name == "stt":
+        mt.STT_FIND_TIME.observe(elapsed)
+    logger.info(
+        f"[{service_name}] Connection to {instance} took {1000 * elapsed:.1f}ms."
+    )
+    return client
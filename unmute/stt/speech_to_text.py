@@ -1,7 +1,7 @@
 import asyncio
 import random
 from logging import getLogger
-from typing import AsyncIterator, Literal, Union
+from typing import AsyncIterator, Literal, Union, cast
 
 import msgpack
 import numpy as np
@@ -16,6 +16,7 @@ from unmute.kyutai_constants import (
     HEADERS,
     SAMPLE_RATE,
     SPEECH_TO_TEXT_PATH,
+    STT_AUDIO_FORMAT,
     STT_DELAY_SEC,
     STT_SERVER,
 )
@@ -68,13 +69,62 @@ STTMessage = Union[
 ]
 STTMessageAdapter = TypeAdapter(STTMessage)
 
+STTAudioFormat = Literal["list", "bytes"]
+
+
+def _parse_audio_format(audio_format: str) -> STTAudioFormat:
+    if audio_format == "list" or audio_format == "bytes":
+        return audio_format
+    raise ValueError(
+        f"KYUTAI_STT_AUDIO_FORMAT must be 'list' or 'bytes', got {audio_format!r}"
+    )
+
+
+DEFAULT_STT_AUDIO_FORMAT = _parse_audio_format(STT_AUDIO_FORMAT)
+
+
+def encode_audio_message(audio: np.ndarray, audio_format: STTAudioFormat) -> bytes:
+    """Encode a 1D float32 frame as a msgpack "Audio" message.
+
+    With "list", the samples are sent as a msgpack array of floats, which is what
+    moshi-server expects. With "bytes", the little-endian float32 buffer is packed as a
+    msgpack bin payload straight from the array memory, without converting every
+    sample to a Python float.
+    """
+    if audio_format == "list":
+        message = msgpack.packb(
+            {"type": "Audio", "pcm": audio.tolist()},
+            use_bin_type=True,
+            use_single_float=True,
+        )
+    elif audio_format == "bytes":
+        audio = np.ascontiguousarray(audio, dtype="<f4")
+        message = msgpack.packb(
+            {"type": "Audio", "pcm": memoryview(audio.view(np.uint8))},
+            use_bin_type=True,
+        )
+    else:
+        raise ValueError(f"Unknown STT audio format: {audio_format}")
+    return cast(bytes, message)
+
+
+def decode_audio_message(pcm: list[float] | bytes) -> np.ndarray:
+    """Inverse of `encode_audio_message()`, used by servers accepting both formats."""
+    if isinstance(pcm, bytes):
+        return np.frombuffer(pcm, dtype="<f4")
+    return np.array(pcm, dtype=np.float32)
+
 
 class SpeechToText(ServiceWithStartup):
     def __init__(
-        self, stt_instance: str = STT_SERVER, delay_sec: float = STT_DELAY_SEC
+        self,
+        stt_instance: str = STT_SERVER,
+        delay_sec: float = STT_DELAY_SEC,
+        audio_format: STTAudioFormat = DEFAULT_STT_AUDIO_FORMAT,
     ):
         self.stt_instance = stt_instance
         self.delay_sec = delay_sec
+        self.audio_format: STTAudioFormat = audio_format
         self.websocket: websockets.ClientConnection | None = None
         self.sent_samples = 0
         self.received_words = 0
@@ -113,7 +163,7 @@ class SpeechToText(ServiceWithStartup):
         self.time_since_first_audio_sent.start_if_not_started()
         mt.STT_SENT_FRAMES.inc()
 
-        await self._send({"type": "Audio", "pcm": audio.tolist()})
+        await self._send_bytes(encode_audio_message(audio, self.audio_format))
 
     async def send_marker(self, id: int) -> None:
         await self._send({"type": "Marker", "id": id})
@@ -121,7 +171,9 @@ class SpeechToText(ServiceWithStartup):
     async def _send(self, data: dict) -> None:
         """Send an arbitrary message to the STT server."""
         to_send = msgpack.packb(data, use_bin_type=True, use_single_float=True)
+        await self._send_bytes(cast(bytes, to_send))
 
+    async def _send_bytes(self, to_send: bytes) -> None:
         if self.websocket:
             await self.websocket.send(to_send)
         else:
@@ -147,13 +199,22 @@ class SpeechToText(ServiceWithStartup):
                 raise RuntimeError(
                     f"Expected ready or error message, got {message.type}"
                 )
-        except Exception as e:
-            logger.error(f"Error during STT startup: {repr(e)}")
+        except BaseException as e:
+            # Cancelled e.g. when another instance accepted us first, see find_instance()
+            if not isinstance(e, asyncio.CancelledError):
+                logger.error(f"Error during STT startup: {repr(e)}")
             # Make sure we don't leave a dangling websocket connection
             await self.websocket.close()
             self.websocket = None
             raise
 
+    async def close_unused(self) -> None:
+        """Close a connection that was started up but never iterated over."""
+        if self.websocket:
+            mt.STT_ACTIVE_SESSIONS.dec()  # Counted by start_up()
+            await self.websocket.close()
+            self.websocket = None
+
     async def shutdown(self):
         logger.info("Shutting down STT, receiving last messages")
         if self.shutdown_complete.is_set():
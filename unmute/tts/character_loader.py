@@ -6,25 +6,35 @@ This module handles:
 - Dynamic module loading using importlib
 - Character validation and error handling
 - Prometheus metrics for character loading
+- A process-wide registry so sessions share the default characters by reference
+- Optionally, a lazy mode that indexes metadata statically and imports on first use
+- Incremental reloads that only re-import the files whose content changed
 """
 
+import ast
 import asyncio
+import hashlib
 import importlib.util
 import inspect
 import logging
 import sys
 import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Literal
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Literal, Mapping
 
 from pydantic import BaseModel, Field, ValidationError, field_validator
 
+from unmute.kyutai_constants import CHARACTERS_LAZY_LOADING
 from unmute.metrics import (
+    CHARACTER_LAZY_IMPORTS,
     CHARACTER_LOAD_COUNT,
     CHARACTER_LOAD_DURATION,
     CHARACTER_LOAD_ERRORS,
+    CHARACTER_REGISTRY_LOADS,
+    CHARACTER_REGISTRY_VERSION,
     CHARACTERS_LOADED,
 )
 from unmute.tts.voices import VoiceSample
@@ -33,6 +43,17 @@ logger = logging.getLogger(__name__)
 
 # Required attributes in character files
 REQUIRED_ATTRIBUTES = ["CHARACTER_NAME", "VOICE_SOURCE", "INSTRUCTIONS"]
+# Attributes read without executing the file in lazy mode
+INDEXED_ATTRIBUTES = ["CHARACTER_NAME", "VOICE_SOURCE", "METADATA"]
+# Internal fields that are only available once the character's module is imported
+MODULE_FIELDS = [
+    "_instructions",
+    "_tools",
+    "_tool_validators",
+    "_llm_model",
+    "_llm_max_context_tokens",
+    "_prompt_generator",
+]
 
 
 # ========================================
@@ -59,11 +80,24 @@ class ToolFunctionDefinition(BaseModel):
         return v
 
 
+class ToolCacheSettings(BaseModel):
+    """How results of a cacheable tool are reused within a session."""
+
+    ttl_sec: float = Field(gt=0)
+    max_entries: int = Field(default=32, gt=0, le=1024)
+
+
 class ToolDefinition(BaseModel):
     """OpenAI tool definition schema."""
 
     type: Literal["function"] = "function"
     function: ToolFunctionDefinition
+    # Calls to this tool wait for the previous tool calls of the turn instead of
+    # running concurrently with them. Not sent to the LLM.
+    order_dependent: bool = False
+    # If set, the tool is idempotent and a call with the same arguments as an earlier
+    # one of the session gets the same result without running. Not sent to the LLM.
+    cache: ToolCacheSettings | None = None
 
 
 class CharacterTools(BaseModel):
@@ -82,6 +116,49 @@ class CharacterTools(BaseModel):
         return tools
 
 
+# Files to skip (utility modules, not character definitions)
+# Only skip __init__.py; resources/ subdirectory is excluded separately
+SKIP_FILES = {
+    "__init__.py",
+}
+
+
+@dataclass
+class CharacterFileState:
+    """What a character file looked like when it was loaded."""
+
+    mtime_ns: int
+    size: int
+    sha256: str
+    character: VoiceSample | None  # None if the file failed to load
+
+
+@dataclass(frozen=True)
+class CharacterIndex:
+    """Read-only lookup tables of a set of characters, built once per load."""
+
+    by_name: Mapping[str, VoiceSample]
+    by_voice_path: Mapping[str, VoiceSample]  # Keyed by source.path_on_server
+    by_source_file: Mapping[str, VoiceSample]  # Keyed by file name, e.g. "charles.py"
+
+    @staticmethod
+    def build(characters: Mapping[str, VoiceSample]) -> "CharacterIndex":
+        by_voice_path: Dict[str, VoiceSample] = {}
+        by_source_file: Dict[str, VoiceSample] = {}
+        for character in characters.values():
+            # setdefault: when several characters share a voice, the first one wins
+            by_voice_path.setdefault(character.source.path_on_server, character)
+            source_file = getattr(character, "_source_file", None)
+            if source_file is not None:
+                by_source_file[source_file] = character
+
+        return CharacterIndex(
+            by_name=MappingProxyType(characters),  # type: ignore[arg-type]
+            by_voice_path=MappingProxyType(by_voice_path),
+            by_source_file=MappingProxyType(by_source_file),
+        )
+
+
 @dataclass
 class CharacterLoadResult:
     """Result of loading all character files."""
@@ -91,6 +168,18 @@ class CharacterLoadResult:
     loaded_count: int
     error_count: int
     load_duration: float
+    # File names, compared to the previous load in an incremental reload. On a full
+    # load, every file is "added".
+    added_files: list[str] = field(default_factory=list)
+    changed_files: list[str] = field(default_factory=list)
+    removed_files: list[str] = field(default_factory=list)
+    unchanged_files: list[str] = field(default_factory=list)
+    # Keyed by file name, used to tell what changed at the next reload
+    files: Dict[str, CharacterFileState] = field(default_factory=dict, repr=False)
+    index: CharacterIndex = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.index = CharacterIndex.build(self.characters)
 
 
 def _load_character_file_sync(file_path: Path, module_prefix: str) -> Dict[str, Any]:
@@ -148,6 +237,53 @@ def _load_character_file_sync(file_path: Path, module_prefix: str) -> Dict[str,
         "metadata": getattr(module, "METADATA", {}),
         "prompt_generator": getattr(module, "PromptGenerator"),
         "tools": getattr(module, "TOOLS", None),  # Optional TOOLS variable
+        "llm_model": getattr(module, "LLM_MODEL", None),  # Optional LLM_MODEL variable
+        "llm_max_context_tokens": getattr(module, "LLM_MAX_CONTEXT_TOKENS", None),
+    }
+
+
+def _index_character_file_sync(file_path: Path) -> Dict[str, Any] | None:
+    """
+    Read the metadata of a character file without executing it.
+
+    Only top-level assignments of literals are understood, which is how character
+    files are written in practice.
+
+    Args:
+        file_path: Path to character .py file
+
+    Returns:
+        Dict with the indexed attributes, or None if they can't be read statically
+        (the file then has to be imported to know)
+    """
+    tree = ast.parse(file_path.read_bytes(), filename=str(file_path))
+
+    values: Dict[str, Any] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+
+        for target in targets:
+            if not (isinstance(target, ast.Name) and target.id in INDEXED_ATTRIBUTES):
+                continue
+            try:
+                values[target.id] = ast.literal_eval(value)
+            except Exception:
+                # Computed at import time, or a literal that can't be evaluated,
+                # e.g. `{["a"]: 1}`. Importing the file reports the error, if any.
+                return None
+
+    if "CHARACTER_NAME" not in values or "VOICE_SOURCE" not in values:
+        return None
+
+    return {
+        "name": values["CHARACTER_NAME"],
+        "voice_source": values["VOICE_SOURCE"],
+        "metadata": values.get("METADATA", {}),
     }
 
 
@@ -240,6 +376,25 @@ async def _validate_character_data(
                 CHARACTER_LOAD_ERRORS.labels(error_type="ToolValidationError").inc()
                 return None
 
+        llm_model = raw_data.get("llm_model")
+        if llm_model is not None and not isinstance(llm_model, str):
+            logger.error(
+                f"{file_path.name}: LLM_MODEL must be a string, got {type(llm_model).__name__}"
+            )
+            CHARACTER_LOAD_ERRORS.labels(error_type="InvalidLLMModel").inc()
+            return None
+
+        llm_max_context_tokens = raw_data.get("llm_max_context_tokens")
+        if llm_max_context_tokens is not None and (
+            type(llm_max_context_tokens) is not int or llm_max_context_tokens <= 0
+        ):
+            logger.error(
+                f"{file_path.name}: LLM_MAX_CONTEXT_TOKENS must be a positive integer, "
+                f"got {llm_max_context_tokens!r}"
+            )
+            CHARACTER_LOAD_ERRORS.labels(error_type="InvalidLLMMaxContextTokens").inc()
+            return None
+
         # Create VoiceSample with Pydantic validation
         # Note: instructions are NOT part of VoiceSample schema - they are attached as internal attributes
         character = VoiceSample(
@@ -254,6 +409,8 @@ async def _validate_character_data(
         character._prompt_generator = prompt_generator_class  # type: ignore
         character._tools = tools_list  # type: ignore
         character._tool_validators = tool_validators  # type: ignore
+        character._llm_model = llm_model  # type: ignore
+        character._llm_max_context_tokens = llm_max_context_tokens  # type: ignore
 
         logger.debug(
             f"{file_path.name}: Attached _instructions={raw_data['instructions']}, "
@@ -308,11 +465,317 @@ async def _load_single_character(file_path: Path, module_prefix: str) -> VoiceSa
         return None
 
 
+def _index_character_files_sync(file_paths: list[Path]) -> list[Dict[str, Any] | None]:
+    """Index several character files, see `_index_character_file_sync()`.
+
+    Files that can't be parsed are indexed as None, the error is reported when
+    they are imported instead. Any error is caught, so that one broken file doesn't
+    abort the load of the whole directory.
+    """
+    results: list[Dict[str, Any] | None] = []
+    for file_path in file_paths:
+        try:
+            results.append(_index_character_file_sync(file_path))
+        except Exception:
+            results.append(None)
+    return results
+
+
+async def _index_single_character(
+    file_path: Path, raw_data: Dict[str, Any] | None, module_prefix: str
+) -> VoiceSample | None:
+    """
+    Create a character from the metadata of its file, without importing it.
+
+    The module is imported by `ensure_character_loaded()` when the character is
+    used. Files whose metadata can't be read statically are imported right away.
+
+    Args:
+        file_path: Path to character .py file
+        raw_data: Metadata from `_index_character_file_sync()`
+        module_prefix: Module prefix to import the file under later
+
+    Returns:
+        VoiceSample if successful, None if failed
+    """
+    if raw_data is None:
+        return await _load_single_character(file_path, module_prefix)
+
+    try:
+        character = VoiceSample(
+            name=raw_data["name"],
+            source=raw_data["voice_source"],
+            **raw_data["metadata"],
+        )
+    except (ValidationError, TypeError) as e:
+        logger.error(f"{file_path.name}: Validation failed - {e}")
+        CHARACTER_LOAD_ERRORS.labels(error_type="ValidationError").inc()
+        return None
+
+    character._source_file = file_path.name  # type: ignore
+    character._module_file = file_path  # type: ignore
+    character._module_prefix = module_prefix  # type: ignore
+    return character
+
+
+# Imports of lazily indexed characters in progress, keyed by id() of the character they
+# attach the module fields to. Not by module name: after a reload, the character of the
+# previous registry version can share it, and callers with the new object must not get
+# the old one back.
+_lazy_imports: Dict[int, asyncio.Task[bool]] = {}
+
+
+async def ensure_character_loaded(character: VoiceSample) -> VoiceSample | None:
+    """
+    Make sure that the module of a character is imported.
+
+    This is a no-op for characters that were loaded eagerly. For characters indexed
+    lazily, the PromptGenerator, instructions and tools are attached to the
+    character the first time, so concurrent and later callers don't import again.
+
+    Args:
+        character: A character from a CharacterManager or CharacterRegistry
+
+    Returns:
+        The character, or None if its module turned out to be invalid
+    """
+    if hasattr(character, "_prompt_generator"):
+        return character
+
+    # The task keeps the character alive, so its id can't be reused while it runs.
+    key = id(character)
+    task = _lazy_imports.get(key)
+    if task is None:
+        task = asyncio.create_task(_import_indexed_character(character))
+        _lazy_imports[key] = task
+        task.add_done_callback(lambda _: _lazy_imports.pop(key, None))
+
+    # Shielded so that a session going away doesn't cancel it for the others.
+    return character if await asyncio.shield(task) else None
+
+
+async def _import_indexed_character(character: VoiceSample) -> bool:
+    file_path: Path = character._module_file  # type: ignore
+    start_time = time.time()
+
+    loaded = await _load_single_character(file_path, character._module_prefix)  # type: ignore
+    if loaded is None:
+        return False
+    if loaded.name != character.name:
+        logger.error(
+            f"{file_path.name}: CHARACTER_NAME changed since indexing "
+            f"('{character.name}' -> '{loaded.name}'), reload the characters."
+        )
+        CHARACTER_LOAD_ERRORS.labels(error_type="StaleIndex").inc()
+        return False
+
+    for field_name in MODULE_FIELDS:
+        setattr(character, field_name, getattr(loaded, field_name))
+
+    CHARACTER_LAZY_IMPORTS.inc()
+    logger.info(
+        f"{file_path.name}: Imported on first use in {time.time() - start_time:.3f}s"
+    )
+    return True
+
+
+def _discover_character_files(characters_dir: Path) -> list[Path]:
+    # Discover all .py files (sorted for deterministic order)
+    # Skip files in SKIP_FILES and anything in the resources/ subdirectory
+    all_py_files = sorted(characters_dir.glob("*.py"))
+    return [f for f in all_py_files if f.name not in SKIP_FILES]
+
+
+def _fingerprint_character_files_sync(
+    file_paths: list[Path], previous_files: Mapping[str, CharacterFileState]
+) -> list[tuple[int, int, str]]:
+    """
+    Get the (mtime_ns, size, sha256) of each file.
+
+    Files whose mtime and size didn't change since the previous load aren't read.
+    Files that were touched but not modified get the same hash, so they're still
+    considered unchanged.
+    """
+    fingerprints = []
+    for file_path in file_paths:
+        stat = file_path.stat()
+        previous = previous_files.get(file_path.name)
+        if (
+            previous is not None
+            and previous.mtime_ns == stat.st_mtime_ns
+            and previous.size == stat.st_size
+        ):
+            sha256 = previous.sha256
+        else:
+            sha256 = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        fingerprints.append((stat.st_mtime_ns, stat.st_size, sha256))
+    return fingerprints
+
+
+def _character_files_changed_sync(
+    characters_dir: Path, previous_files: Mapping[str, CharacterFileState]
+) -> bool:
+    """Cheap check, based on mtime and size only, for whether a reload is needed."""
+    file_paths = _discover_character_files(characters_dir)
+    if {f.name for f in file_paths} != set(previous_files):
+        return True
+    for file_path in file_paths:
+        stat = file_path.stat()
+        previous = previous_files[file_path.name]
+        if (previous.mtime_ns, previous.size) != (stat.st_mtime_ns, stat.st_size):
+            return True
+    return False
+
+
+async def _load_characters_from_directory(
+    characters_dir: Path,
+    module_prefix: str,
+    lazy: bool = False,
+    previous: CharacterLoadResult | None = None,
+) -> CharacterLoadResult:
+    """
+    Load all character files from a directory under the given module prefix.
+
+    Args:
+        characters_dir: Path to characters/ directory
+        module_prefix: Module prefix to register the character modules under
+        lazy: Only index the metadata, see `ensure_character_loaded()`
+        previous: Result of a previous load of the same directory. Characters of
+            files whose content didn't change are reused instead of re-imported.
+
+    Returns:
+        CharacterLoadResult with loaded characters and metrics
+
+    Raises:
+        FileNotFoundError: If characters_dir does not exist
+    """
+    if not characters_dir.exists():
+        raise FileNotFoundError(f"Character directory not found: {characters_dir}")
+
+    start_time = time.time()
+
+    character_files = _discover_character_files(characters_dir)
+    total_files = len(character_files)
+
+    if total_files == 0:
+        logger.warning(
+            f"No character files found in {characters_dir}. System will start with empty character list."
+        )
+
+    previous_files = previous.files if previous is not None else {}
+    fingerprints = await asyncio.to_thread(
+        _fingerprint_character_files_sync, character_files, previous_files
+    )
+
+    added_files: list[str] = []
+    changed_files: list[str] = []
+    unchanged_files: list[str] = []
+    files_to_load: list[Path] = []
+    for file_path, (_, _, sha256) in zip(character_files, fingerprints, strict=True):
+        previous_state = previous_files.get(file_path.name)
+        if previous_state is None:
+            added_files.append(file_path.name)
+        elif previous_state.sha256 != sha256:
+            changed_files.append(file_path.name)
+        else:
+            unchanged_files.append(file_path.name)
+            if previous_state.character is not None:
+                continue
+            # Failed last time: retry, in case it depended on something that changed.
+        files_to_load.append(file_path)
+
+    removed_files = sorted(set(previous_files) - {f.name for f in character_files})
+    for file_name in removed_files:
+        sys.modules.pop(f"{module_prefix}.{Path(file_name).stem}", None)
+
+    # Load all characters concurrently under the given module prefix
+    if lazy:
+        # Parsing is too quick to be worth a thread per file.
+        raw_data = await asyncio.to_thread(_index_character_files_sync, files_to_load)
+        newly_loaded = await asyncio.gather(
+            *[
+                _index_single_character(file_path, data, module_prefix)
+                for file_path, data in zip(files_to_load, raw_data, strict=True)
+            ]
+        )
+    else:
+        newly_loaded = await asyncio.gather(
+            *[_load_single_character(file_path, module_prefix) for file_path in files_to_load]
+        )
+    loaded_by_file = dict(
+        zip([f.name for f in files_to_load], newly_loaded, strict=True)
+    )
+
+    # Build character dictionary with duplicate detection
+    characters: Dict[str, VoiceSample] = {}
+    files: Dict[str, CharacterFileState] = {}
+    loaded_count = 0
+    error_count = 0
+
+    for file_path, (mtime_ns, size, sha256) in zip(
+        character_files, fingerprints, strict=True
+    ):
+        if file_path.name in loaded_by_file:
+            character = loaded_by_file[file_path.name]
+            if character is not None:
+                CHARACTER_LOAD_COUNT.inc()
+        else:
+            character = previous_files[file_path.name].character
+
+        files[file_path.name] = CharacterFileState(mtime_ns, size, sha256, character)
+
+        if character is None:
+            error_count += 1
+            continue
+
+        # Check for duplicate names (first-loaded-wins)
+        if character.name in characters:
+            existing_file = characters[character.name]._source_file  # type: ignore
+            logger.error(
+                f"{character._source_file}: Duplicate character name '{character.name}' "  # type: ignore
+                f"(first defined in {existing_file}). Skipping."
+            )
+            CHARACTER_LOAD_ERRORS.labels(error_type="DuplicateName").inc()
+            error_count += 1
+            continue
+
+        characters[character.name] = character
+        loaded_count += 1
+
+    load_duration = time.time() - start_time
+
+    if previous is not None:
+        logger.info(
+            f"Incremental load of {characters_dir}: {len(added_files)} added, "
+            f"{len(changed_files)} changed, {len(removed_files)} removed, "
+            f"{len(unchanged_files)} unchanged"
+        )
+
+    # Emit metrics
+    CHARACTER_LOAD_DURATION.observe(load_duration)
+    CHARACTERS_LOADED.set(loaded_count)
+
+    return CharacterLoadResult(
+        characters=characters,
+        total_files=total_files,
+        loaded_count=loaded_count,
+        error_count=error_count,
+        load_duration=load_duration,
+        added_files=added_files,
+        changed_files=changed_files,
+        removed_files=removed_files,
+        unchanged_files=unchanged_files,
+        files=files,
+    )
+
+
 class CharacterManager:
     """Manager for loading and accessing characters from Python files.
 
     Each CharacterManager instance is scoped to a session, enabling
     multiple simultaneous users to load different character sets independently.
+    By default, a session references the shared CharacterRegistry of the default
+    directory and only loads its own copy when it reloads characters.
 
     Args:
         session_id: Optional session identifier. If not provided, generates a unique ID.
@@ -328,12 +791,22 @@ class CharacterManager:
         # Create session-unique module prefix (e.g., "session_abc12345.characters")
         self.module_prefix = f"session_{self.session_id}.characters"
 
-        self.characters: Dict[str, VoiceSample] = {}
+        self._index = CharacterIndex.build({})
         self._load_result: CharacterLoadResult | None = None
         self._current_directory: Path | None = None
+        self._registry_version: int | None = None
 
         logger.debug(f"CharacterManager initialized with session_id={self.session_id}, module_prefix={self.module_prefix}")
 
+    @property
+    def characters(self) -> Mapping[str, VoiceSample]:
+        """The loaded characters keyed by name. Read-only, assign to replace them."""
+        return self._index.by_name
+
+    @characters.setter
+    def characters(self, characters: Mapping[str, VoiceSample]) -> None:
+        self._index = CharacterIndex.build(characters)
+
     def _cleanup_character_modules(self) -> None:
         """
         Remove all session-specific character modules from sys.modules.
@@ -352,20 +825,24 @@ class CharacterManager:
             del sys.modules[module_name]
             logger.debug(f"Cleaned up session module: {module_name}")
 
-    async def reload_characters(self, characters_dir: Path) -> CharacterLoadResult:
+    async def reload_characters(
+        self, characters_dir: Path, incremental: bool = True
+    ) -> CharacterLoadResult:
         """
-        Reload characters from a new directory, clearing all previously loaded characters.
+        Reload characters from a directory, replacing all previously loaded characters.
 
-        This method:
-        1. Cleans up old character modules from sys.modules
-        2. Loads new characters from the specified directory
-        3. Updates the character registry
+        If the directory is the one currently loaded and `incremental` is set, only
+        the files whose content changed are re-imported, see the file lists of
+        `CharacterLoadResult`. Otherwise, old character modules are cleaned up from
+        sys.modules and everything is loaded again. In both cases, the characters are
+        swapped in one go once loading is done.
 
-        WARNING: This will break active sessions using old characters.
-        Sessions should be terminated/reconnected after calling this method.
+        An incremental reload doesn't notice changes in helper modules that character
+        files import, use `incremental=False` for that.
 
         Args:
-            characters_dir: Path to the new characters directory
+            characters_dir: Path to the characters directory
+            incremental: Reuse the characters of unchanged files
 
         Returns:
             CharacterLoadResult with loaded characters and metrics
@@ -375,16 +852,18 @@ class CharacterManager:
         """
         logger.info(f"Reloading characters from: {characters_dir}")
 
-        # Step 1: Clean up old modules
-        self._cleanup_character_modules()
-
-        # Step 2: Clear old characters
-        old_count = len(self.characters)
-        self.characters = {}
-        logger.info(f"Cleared {old_count} previously loaded characters")
+        previous = None
+        if (
+            incremental
+            and self._load_result is not None
+            and self._current_directory is not None
+            and self._current_directory.resolve() == characters_dir.resolve()
+        ):
+            previous = self._load_result
+        else:
+            self._cleanup_character_modules()
 
-        # Step 3: Load new characters
-        result = await self.load_characters(characters_dir)
+        result = await self.load_characters(characters_dir, previous=previous)
 
         logger.info(
             f"Reload complete: {result.loaded_count} characters loaded from {characters_dir}"
@@ -392,12 +871,20 @@ class CharacterManager:
 
         return result
 
-    async def load_characters(self, characters_dir: Path) -> CharacterLoadResult:
+    async def load_characters(
+        self, characters_dir: Path, previous: CharacterLoadResult | None = None
+    ) -> CharacterLoadResult:
         """
         Load all character files from the specified directory.
 
+        The modules are executed under this session's module prefix, so the result
+        is private to this manager. To share the default characters between
+        sessions, use `use_registry()` instead.
+
         Args:
             characters_dir: Path to characters/ directory
+            previous: Result of a previous load of the same directory, to only
+                re-import the files that changed since
 
         Returns:
             CharacterLoadResult with loaded characters and metrics
@@ -405,79 +892,41 @@ class CharacterManager:
         Raises:
             FileNotFoundError: If characters_dir does not exist
         """
-        if not characters_dir.exists():
-            raise FileNotFoundError(f"Character directory not found: {characters_dir}")
-
-        start_time = time.time()
-
-        # Files to skip (utility modules, not character definitions)
-        # Only skip __init__.py; resources/ subdirectory is excluded separately
-        SKIP_FILES = {
-            "__init__.py",
-        }
-
-        # Discover all .py files (sorted for deterministic order)
-        # Skip files in SKIP_FILES and anything in the resources/ subdirectory
-        all_py_files = sorted(characters_dir.glob("*.py"))
-        character_files = [
-            f for f in all_py_files
-            if f.name not in SKIP_FILES
-        ]
-        total_files = len(character_files)
-
-        if total_files == 0:
-            logger.warning(
-                f"No character files found in {characters_dir}. System will start with empty character list."
-            )
-
-        # Load all characters concurrently with session-specific module prefix
-        loaded_characters = await asyncio.gather(
-            *[_load_single_character(file_path, self.module_prefix) for file_path in character_files]
+        result = await _load_characters_from_directory(
+            characters_dir, self.module_prefix, previous=previous
         )
 
-        # Build character dictionary with duplicate detection
-        characters: Dict[str, VoiceSample] = {}
-        loaded_count = 0
-        error_count = 0
+        # Update instance state
+        self._index = result.index
+        self._current_directory = characters_dir
+        self._load_result = result
+        self._registry_version = None
 
-        for character in loaded_characters:
-            if character is None:
-                error_count += 1
-                continue
+        return result
 
-            # Check for duplicate names (first-loaded-wins)
-            if character.name in characters:
-                existing_file = characters[character.name]._source_file  # type: ignore
-                logger.error(
-                    f"{character._source_file}: Duplicate character name '{character.name}' "  # type: ignore
-                    f"(first defined in {existing_file}). Skipping."
-                )
-                CHARACTER_LOAD_ERRORS.labels(error_type="DuplicateName").inc()
-                error_count += 1
-                continue
+    def use_registry(self, registry: "CharacterRegistry") -> CharacterLoadResult:
+        """
+        Use the characters of a shared registry instead of loading them.
 
-            characters[character.name] = character
-            loaded_count += 1
-            CHARACTER_LOAD_COUNT.inc()
+        No module is executed and nothing is copied: the manager references the
+        registry's read-only mapping. If the session later calls
+        `reload_characters()`, it gets its own copy and the registry is unaffected.
 
-        load_duration = time.time() - start_time
+        Args:
+            registry: The registry to use, usually from `get_character_registry()`
 
-        # Update instance state
-        self.characters = characters
-        self._current_directory = characters_dir
-        self._load_result = CharacterLoadResult(
-            characters=characters,
-            total_files=total_files,
-            loaded_count=loaded_count,
-            error_count=error_count,
-            load_duration=load_duration,
-        )
+        Returns:
+            The CharacterLoadResult the registry was built from
+        """
+        # Drop modules of a previous per-session load, the registry doesn't need them.
+        self._cleanup_character_modules()
 
-        # Emit metrics
-        CHARACTER_LOAD_DURATION.observe(load_duration)
-        CHARACTERS_LOADED.set(loaded_count)
+        self._index = registry.load_result.index
+        self._current_directory = registry.directory
+        self._load_result = registry.load_result
+        self._registry_version = registry.version
 
-        return self._load_result
+        return registry.load_result
 
     def get_character(self, name_or_voice_path: str) -> VoiceSample | None:
         """
@@ -490,17 +939,24 @@ class CharacterManager:
             VoiceSample if found, None otherwise
         """
         # First try direct name lookup
-        character = self.characters.get(name_or_voice_path)
-        if character:
+        character = self._index.by_name.get(name_or_voice_path)
+        if character is not None:
             return character
 
         # If not found, try matching by voice path
-        for char in self.characters.values():
-            voice_path = char.source.model_dump().get('path_on_server')
-            if voice_path == name_or_voice_path:
-                return char
+        return self._index.by_voice_path.get(name_or_voice_path)
 
-        return None
+    def get_character_by_source_file(self, file_name: str) -> VoiceSample | None:
+        """
+        Get a character by the name of the file it's defined in.
+
+        Args:
+            file_name: File name in the characters directory (e.g., "charles.py")
+
+        Returns:
+            VoiceSample if found, None otherwise
+        """
+        return self._index.by_source_file.get(file_name)
 
     def cleanup_session_modules(self) -> None:
         """
@@ -514,3 +970,145 @@ class CharacterManager:
         """
         self._cleanup_character_modules()
         logger.info(f"Session {self.session_id} modules cleaned up")
+
+
+@dataclass(frozen=True)
+class CharacterRegistry:
+    """An immutable set of characters loaded once and shared between sessions.
+
+    Registries are never modified: reloading a directory builds a new registry with
+    a higher version, and sessions that still reference the old one keep working.
+    """
+
+    characters: Mapping[str, VoiceSample]  # Read-only, keyed by character name
+    directory: Path
+    version: int
+    module_prefix: str
+    load_result: CharacterLoadResult
+
+
+_registries: Dict[Path, CharacterRegistry] = {}
+_registry_lock = asyncio.Lock()
+_registry_version = 0
+
+
+async def get_character_registry(
+    characters_dir: Path,
+    reload: bool = False,
+    lazy: bool = CHARACTERS_LAZY_LOADING,
+    incremental: bool = True,
+) -> CharacterRegistry:
+    """
+    Get the shared registry of a directory, loading it on first use.
+
+    The modules are executed at most once per directory (and per reload), no matter
+    how many sessions ask for the registry concurrently.
+
+    Args:
+        characters_dir: Path to characters/ directory
+        reload: Load the directory again even if a registry already exists
+        lazy: When loading, only index the characters' metadata. Their modules are
+            imported by `ensure_character_loaded()` when a session selects them.
+        incremental: When reloading, only re-import the files whose content changed,
+            see `CharacterManager.reload_characters()`
+
+    Returns:
+        The current CharacterRegistry for the directory
+
+    Raises:
+        FileNotFoundError: If characters_dir does not exist
+    """
+    global _registry_version
+    key = characters_dir.resolve()
+
+    registry = _registries.get(key)
+    if registry is not None and not reload:
+        return registry
+
+    async with _registry_lock:
+        # Someone else may have loaded it while we were waiting for the lock.
+        current = _registries.get(key)
+        if current is not None and (not reload or current is not registry):
+            return current
+
+        _registry_version += 1
+        if current is not None and incremental:
+            # Changed files are re-executed in place. Sessions still using the old
+            # registry keep the classes they already have.
+            module_prefix = current.module_prefix
+            previous = current.load_result
+        else:
+            module_prefix = f"shared_v{_registry_version}.characters"
+            previous = None
+
+        result = await _load_characters_from_directory(
+            characters_dir, module_prefix, lazy=lazy, previous=previous
+        )
+        new_registry = CharacterRegistry(
+            characters=result.index.by_name,
+            directory=characters_dir,
+            version=_registry_version,
+            module_prefix=module_prefix,
+            load_result=result,
+        )
+        _registries[key] = new_registry
+
+    CHARACTER_REGISTRY_LOADS.inc()
+    CHARACTER_REGISTRY_VERSION.set(new_registry.version)
+    logger.info(
+        f"Character registry v{new_registry.version}: {result.loaded_count} characters "
+        f"from {characters_dir} ({result.error_count} errors)"
+    )
+
+    if current is not None and current.module_prefix != module_prefix:
+        # Sessions still using the old registry hold the classes they need, so only
+        # the sys.modules entries are dropped.
+        _remove_modules_with_prefix(current.module_prefix)
+
+    return new_registry
+
+
+async def watch_character_registry(
+    characters_dir: Path,
+    interval_sec: float,
+    on_reload: Callable[[CharacterRegistry], None] | None = None,
+) -> None:
+    """
+    Reload the shared registry of a directory whenever its files change.
+
+    Polls the mtimes and sizes of the files, and does an incremental reload when one
+    of them changed or a file was added or removed. Runs until cancelled.
+
+    Args:
+        characters_dir: Path to characters/ directory, whose registry must be loaded
+        interval_sec: Time between two checks
+        on_reload: Called with the new registry after each reload
+    """
+    while True:
+        await asyncio.sleep(interval_sec)
+
+        registry = _registries.get(characters_dir.resolve())
+        if registry is None:
+            continue
+
+        try:
+            changed = await asyncio.to_thread(
+                _character_files_changed_sync,
+                characters_dir,
+                registry.load_result.files,
+            )
+            if not changed:
+                continue
+            registry = await get_character_registry(characters_dir, reload=True)
+        except Exception as e:
+            logger.error(f"Failed to reload characters from {characters_dir}: {e}")
+            continue
+
+        if on_reload is not None:
+            on_reload(registry)
+
+
+def _remove_modules_with_prefix(module_prefix: str) -> None:
+    prefix = f"{module_prefix}."
+    for module_name in [m for m in sys.modules if m.startswith(prefix)]:
+        del sys.modules[module_name]
@@ -4,8 +4,16 @@ from logging import getLogger
 from typing import Annotated, Any, AsyncIterator, Callable, Literal, Union, cast
 
 import msgpack
+import numpy as np
 import websockets
-from pydantic import BaseModel, Field, TypeAdapter
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    Field,
+    PlainSerializer,
+    TypeAdapter,
+)
 
 import unmute.openai_realtime_api_events as ora
 from unmute import metrics as mt
@@ -60,9 +68,24 @@ class TTSTextMessage(BaseModel):
     stop_s: float
 
 
+def _pcm_to_array(pcm: Any) -> np.ndarray:
+    if isinstance(pcm, np.ndarray):
+        return pcm.astype(np.float32, copy=False)
+    elif isinstance(pcm, (bytes, bytearray, memoryview)):
+        return np.frombuffer(pcm, dtype="<f4")
+    else:
+        return np.asarray(pcm, dtype=np.float32)
+
+
 class TTSAudioMessage(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     type: Literal["Audio"]
-    pcm: list[float]
+    pcm: Annotated[
+        np.ndarray,
+        BeforeValidator(_pcm_to_array),
+        PlainSerializer(lambda pcm: pcm.tolist()),
+    ]
 
 
 class TTSErrorMessage(BaseModel):
@@ -80,6 +103,80 @@ TTSMessage = Annotated[
 ]
 TTSMessageAdapter = TypeAdapter(TTSMessage)
 
+# What the server sends for audio: {"type": "Audio", "pcm": [floats]}, encoded as a
+# msgpack fixmap whose "pcm" value is an array of float32 (0xca) or float64 (0xcb).
+_AUDIO_TYPE_ENTRY = b"\xa4type\xa5Audio"
+_PCM_KEY = b"\xa3pcm"
+_FLOAT_DTYPES = {
+    0xCA: np.dtype([("tag", "u1"), ("value", ">f4")]),
+    0xCB: np.dtype([("tag", "u1"), ("value", ">f8")]),
+}
+
+
+def _decode_audio_message_fast(message_bytes: bytes) -> TTSAudioMessage | None:
+    """Decode an audio message without going through Python floats.
+
+    The samples are read straight from the msgpack buffer with a structured numpy
+    dtype. Returns None if the message doesn't have the expected layout, in which case
+    the caller should use the generic path.
+    """
+    if len(message_bytes) < 32 or message_bytes[0] != 0x82:
+        return None
+
+    pcm_key_pos = message_bytes.find(_PCM_KEY)
+    if pcm_key_pos == -1:
+        return None
+
+    header_pos = pcm_key_pos + len(_PCM_KEY)
+    marker = message_bytes[header_pos]
+    if 0x90 <= marker <= 0x9F:  # fixarray
+        n_bytes_length = 0
+        n = marker & 0x0F
+    elif marker in (0xDC, 0xDD):  # array 16, array 32
+        n_bytes_length = 2 if marker == 0xDC else 4
+        n = int.from_bytes(
+            message_bytes[header_pos + 1 : header_pos + 1 + n_bytes_length]
+        )
+    else:
+        return None
+    start = header_pos + 1 + n_bytes_length
+
+    if n == 0 or start >= len(message_bytes):
+        return None
+    dtype = _FLOAT_DTYPES.get(message_bytes[start])
+    if dtype is None:
+        return None
+    end = start + n * dtype.itemsize
+    if end > len(message_bytes):
+        return None
+
+    # The map has exactly two entries: the pcm array and the type.
+    rest = message_bytes[1:pcm_key_pos] + message_bytes[end:]
+    if rest != _AUDIO_TYPE_ENTRY:
+        return None
+
+    samples = np.frombuffer(message_bytes, dtype=dtype, count=n, offset=start)
+    if not (samples["tag"] == message_bytes[start]).all():
+        return None
+
+    pcm = samples["value"].astype(np.float32)
+    return TTSAudioMessage.model_construct(type="Audio", pcm=pcm)
+
+
+def decode_tts_message(message_bytes: bytes) -> TTSMessage:
+    """Decode a msgpack message received from the TTS server.
+
+    Audio frames make up almost all of the traffic, so they skip pydantic validation
+    and are decoded directly into a float32 array. The rare control messages
+    (Text/Error/Ready) are still validated.
+    """
+    message = _decode_audio_message_fast(message_bytes)
+    if message is not None:
+        return message
+
+    message_dict = msgpack.unpackb(message_bytes)
+    return TTSMessageAdapter.validate_python(message_dict)
+
 
 def url_escape(value: object) -> str:
     return urllib.parse.quote(str(value), safe="")
@@ -166,6 +263,28 @@ class TextToSpeech(ServiceWithStartup):
         self.shutdown_lock = asyncio.Lock()
         self.shutdown_complete = asyncio.Event()
 
+    def bind_session(
+        self,
+        recorder: Recorder | None = None,
+        get_time: Callable[[], float] | None = None,
+    ) -> None:
+        """Attach session state to a connection that was started up ahead of time.
+
+        Used for connections checked out of the `TTSConnectionPool`, which are created
+        before we know which session will use them.
+        """
+        self.recorder = recorder
+        self.text_output_queue = RealtimeQueue(get_time=get_time)
+
+    async def close_unused(self) -> None:
+        """Close a connection that was started up but never iterated over.
+
+        Unlike shutdown(), this doesn't touch the session metrics.
+        """
+        if self.websocket:
+            await self.websocket.close()
+            self.websocket = None
+
     def state(self) -> WebsocketState:
         if not self.websocket:
             return "not_created"
@@ -226,8 +345,7 @@ class TextToSpeech(ServiceWithStartup):
             for _ in range(10):
                 # Due to some race condition in the TTS, we might get packets from a previous TTS client.
                 message_bytes = await self.websocket.recv(decode=False)
-                message_dict = msgpack.unpackb(message_bytes)
-                message = TTSMessageAdapter.validate_python(message_dict)
+                message = decode_tts_message(message_bytes)
                 if isinstance(message, TTSReadyMessage):
                     return
                 elif isinstance(message, TTSErrorMessage):
@@ -236,8 +354,10 @@ class TextToSpeech(ServiceWithStartup):
                     logger.warning(
                         f"Received unexpected message type from {self.tts_instance}, {message.type}"
                     )
-        except Exception as e:
-            logger.error(f"Error during TTS startup: {repr(e)}")
+        except BaseException as e:
+            # Cancelled e.g. when another instance accepted us first, see find_instance()
+            if not isinstance(e, asyncio.CancelledError):
+                logger.error(f"Error during TTS startup: {repr(e)}")
             # Make sure we don't leave a dangling websocket connection
             await self.websocket.close()
             self.websocket = None
@@ -274,8 +394,7 @@ class TextToSpeech(ServiceWithStartup):
 
         try:
             async for message_bytes in self.websocket:
-                message_dict = msgpack.unpackb(cast(Any, message_bytes))
-                message: TTSMessage = TTSMessageAdapter.validate_python(message_dict)
+                message: TTSMessage = decode_tts_message(cast(bytes, message_bytes))
 
                 if isinstance(message, TTSAudioMessage):
                     # Use `yield message` if you want to to release the audio
@@ -0,0 +1,222 @@
+"""A process-wide pool of TTS connections that are ready to be used.
+
+Connecting to the TTS, waiting for its Ready message and uploading a custom voice
+embedding would otherwise happen on the critical path of every response. Instead, we
+keep a few connections per voice that have already received Ready, and refill the pool
+in the background whenever one is checked out.
+
+Idle connections hold a slot on the TTS server, so the pool is kept small, backs off
+when the servers are at capacity, and can be emptied when a session can't find a TTS.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from functools import partial
+
+from unmute import metrics as mt
+from unmute.exceptions import MissingServiceAtCapacity
+from unmute.kyutai_constants import TTS_POOL_SIZE
+from unmute.service_discovery import find_instance
+from unmute.tts.text_to_speech import TextToSpeech
+
+logger = logging.getLogger(__name__)
+
+# Never keep more than this many idle connections in total, across all voices.
+MAX_IDLE_CONNECTIONS = 4
+# The TTS server might drop connections that have been idle for too long, so we
+# recycle them before that happens.
+MAX_IDLE_SEC = 30.0
+# Stop pre-warming a voice if no session asked for it for this long.
+VOICE_TTL_SEC = 300.0
+REAP_INTERVAL_SEC = 1.0
+MIN_BACKOFF_SEC = 0.5
+MAX_BACKOFF_SEC = 10.0
+
+
+@dataclass
+class _IdleConnection:
+    tts: TextToSpeech
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class TTSConnectionPool:
+    def __init__(
+        self,
+        size_per_voice: int = TTS_POOL_SIZE,
+        max_idle_connections: int = MAX_IDLE_CONNECTIONS,
+        max_idle_sec: float = MAX_IDLE_SEC,
+    ):
+        self.size_per_voice = size_per_voice
+        self.max_idle_connections = max_idle_connections
+        self.max_idle_sec = max_idle_sec
+
+        self._idle: dict[str | None, deque[_IdleConnection]] = defaultdict(deque)
+        self._last_requested: dict[str | None, float] = {}
+        self._refill_tasks: dict[str | None, asyncio.Task[None]] = {}
+        self._reap_task: asyncio.Task[None] | None = None
+
+        self._cooldown_until = 0.0
+        self._backoff_sec = MIN_BACKOFF_SEC
+
+    @property
+    def enabled(self) -> bool:
+        return self.size_per_voice > 0 and self.max_idle_connections > 0
+
+    def n_idle(self) -> int:
+        return sum(len(connections) for connections in self._idle.values())
+
+    def prewarm(self, voice: str | None) -> None:
+        """Mark a voice as wanted and start filling the pool for it."""
+        if not self.enabled:
+            return
+
+        self._last_requested[voice] = time.monotonic()
+        self._ensure_reaper()
+        self._schedule_refill(voice)
+
+    async def checkout(self, voice: str | None) -> TextToSpeech | None:
+        """Get a ready connection for `voice`, or None if there is none available.
+
+        The caller owns the returned connection and must call `bind_session()` on it.
+        """
+        if not self.enabled:
+            return None
+
+        connections = self._idle[voice]
+        tts = None
+        while connections:
+            idle = connections.popleft()
+            if self._is_usable(idle):
+                tts = idle.tts
+                break
+            await self._discard(idle, reason="dead")
+
+        mt.TTS_POOL_IDLE.set(self.n_idle())
+        if tts is None:
+            mt.TTS_POOL_MISSES.inc()
+        else:
+            mt.TTS_POOL_HITS.inc()
+
+        self.prewarm(voice)
+        return tts
+
+    async def release_idle(self) -> None:
+        """Close all idle connections to free up slots on the TTS servers.
+
+        Called when a session can't find a TTS, since our own idle connections might be
+        what's keeping the servers at capacity. Also pauses refilling for a while.
+        """
+        self._start_cooldown()
+        for voice in list(self._idle):
+            connections = self._idle.pop(voice)
+            for idle in connections:
+                await self._discard(idle, reason="released")
+        mt.TTS_POOL_IDLE.set(0)
+
+    async def close(self) -> None:
+        """Close everything, for when the server shuts down."""
+        for task in [*self._refill_tasks.values(), self._reap_task]:
+            if task is not None:
+                task.cancel()
+        self._refill_tasks.clear()
+        self._reap_task = None
+        self._last_requested.clear()
+        await self.release_idle()
+
+    def _is_usable(self, idle: _IdleConnection) -> bool:
+        return (
+            idle.tts.state() == "connected"
+            and time.monotonic() - idle.created_at < self.max_idle_sec
+        )
+
+    async def _discard(self, idle: _IdleConnection, reason: str) -> None:
+        mt.TTS_POOL_DISCARDED.labels(reason=reason).inc()
+        try:
+            await idle.tts.close_unused()
+        except Exception as e:
+            logger.warning(f"Error closing idle TTS connection: {e}")
+
+    def _wants_more(self, voice: str | None) -> bool:
+        last_requested = self._last_requested.get(voice)
+        if last_requested is None or time.monotonic() - last_requested > VOICE_TTL_SEC:
+            return False
+
+        return (
+            len(self._idle[voice]) < self.size_per_voice
+            and self.n_idle() < self.max_idle_connections
+        )
+
+    def _start_cooldown(self) -> None:
+        self._cooldown_until = time.monotonic() + self._backoff_sec
+        self._backoff_sec = min(MAX_BACKOFF_SEC, self._backoff_sec * 2)
+
+    def _schedule_refill(self, voice: str | None) -> None:
+        if voice in self._refill_tasks or not self._wants_more(voice):
+            return
+
+        task = asyncio.create_task(
+            self._refill(voice), name=f"tts_pool_refill({voice})"
+        )
+        self._refill_tasks[voice] = task
+        task.add_done_callback(lambda _: self._refill_tasks.pop(voice, None))
+
+    async def _refill(self, voice: str | None) -> None:
+        while self._wants_more(voice):
+            cooldown = self._cooldown_until - time.monotonic()
+            if cooldown > 0:
+                await asyncio.sleep(cooldown)
+                continue
+
+            try:
+                tts = await find_instance("tts", partial(TextToSpeech, voice=voice))
+            except Exception as e:
+                # Includes MissingServiceAtCapacity: the sessions need the slots more
+                # than we do, so don't insist.
+                mt.TTS_POOL_REFILL_ERRORS.labels(error_type=type(e).__name__).inc()
+                if not isinstance(e, MissingServiceAtCapacity):
+                    logger.warning(f"Could not pre-warm a TTS for {voice}: {e!r}")
+                self._start_cooldown()
+                continue
+
+            self._backoff_sec = MIN_BACKOFF_SEC
+            if self._wants_more(voice):
+                self._idle[voice].append(_IdleConnection(tts))
+                mt.TTS_POOL_IDLE.set(self.n_idle())
+            else:
+                # Filled up by someone else, or the voice is not wanted anymore.
+                await tts.close_unused()
+
+    def _ensure_reaper(self) -> None:
+        if self._reap_task is None or self._reap_task.done():
+            self._reap_task = asyncio.create_task(self._reap(), name="tts_pool_reap()")
+
+    async def _reap(self) -> None:
+        """Periodically drop connections that died or have been idle for too long."""
+        while True:
+            await asyncio.sleep(REAP_INTERVAL_SEC)
+
+            expired: list[_IdleConnection] = []
+            for connections in self._idle.values():
+                for idle in [x for x in connections if not self._is_usable(x)]:
+                    connections.remove(idle)
+                    expired.append(idle)
+
+            now = time.monotonic()
+            for voice, last_requested in list(self._last_requested.items()):
+                if now - last_requested > VOICE_TTL_SEC and not self._idle.get(voice):
+                    del self._last_requested[voice]
+                    self._idle.pop(voice, None)
+
+            for idle in expired:
+                await self._discard(idle, reason="expired")
+
+            for voice in list(self._idle):
+                self._schedule_refill(voice)
+
+            mt.TTS_POOL_IDLE.set(self.n_idle())
+
+
+tts_pool = TTSConnectionPool()
@@ -3,7 +3,7 @@ import math
 from functools import partial
 from logging import getLogger
 from pathlib import Path
-from typing import Any, Literal, cast
+from typing import Any, AsyncIterator, Literal, cast
 
 import numpy as np
 import websockets
@@ -19,33 +19,43 @@ from pydantic import BaseModel
 import unmute.openai_realtime_api_events as ora
 from unmute import metrics as mt
 from unmute.audio_input_override import AudioInputOverride
-from unmute.exceptions import make_ora_error
+from unmute.exceptions import MissingServiceAtCapacity, make_ora_error
 from unmute.kyutai_constants import (
     FRAME_TIME_SEC,
+    LLM_MAX_CONTEXT_TOKENS,
     RECORDINGS_DIR,
     SAMPLE_RATE,
     SAMPLES_PER_FRAME,
+    SPECULATIVE_RESPONSE,
 )
 from unmute.llm.chatbot import Chatbot
 from unmute.llm.llm_utils import (
     INTERRUPTION_CHAR,
     USER_SILENCE_MARKER,
     VLLMStream,
-    get_openai_client,
+    llm_balancer,
     rechunk_to_words,
 )
+from unmute.llm.speculative_stream import SpeculativeStream
+from unmute.llm.tool_executor import ToolResultCache
+from unmute.output_channel import OutputChannel
 from unmute.quest_manager import Quest, QuestManager
 from unmute.recorder import Recorder
 from unmute.service_discovery import find_instance
 from unmute.stt.speech_to_text import SpeechToText, STTMarkerMessage
 from unmute.timer import Stopwatch
-from unmute.tts.character_loader import CharacterManager
+from unmute.tts.character_loader import (
+    CharacterManager,
+    ensure_character_loaded,
+    get_character_registry,
+)
 from unmute.tts.text_to_speech import (
     TextToSpeech,
     TTSAudioMessage,
     TTSClientEosMessage,
     TTSTextMessage,
 )
+from unmute.tts.tts_pool import tts_pool
 
 # TTS_DEBUGGING_TEXT: str | None = "What's 'Hello world'?"
 # TTS_DEBUGGING_TEXT: str | None = "What's the difference between a bagel and a donut?"
@@ -87,7 +97,9 @@ class UnmuteHandler(AsyncStreamHandler):
             output_sample_rate=SAMPLE_RATE,
         )
         self.n_samples_received = 0  # Used for measuring time
-        self.output_queue: asyncio.Queue[HandlerOutput] = asyncio.Queue()
+        # Everything the session sends goes through this channel, see main_websocket.py
+        self.output_channel = OutputChannel()
+        self.output_queue: asyncio.Queue[HandlerOutput] = self.output_channel.new_queue()
         self.recorder = Recorder(RECORDINGS_DIR) if RECORDINGS_DIR else None
 
         # Per-session character manager (enables multiple users with different character sets)
@@ -99,12 +111,16 @@ class UnmuteHandler(AsyncStreamHandler):
         self.stt_last_message_time: float = 0
         self.stt_end_of_flush_time: float | None = None
         self.stt_flush_timer = Stopwatch()
+        # LLM output generated during the STT flush, see _start_speculative_response()
+        self.speculative_llm: SpeculativeStream | None = None
 
         self.tts_voice: str | None = None  # Stored separately because TTS is restarted
         self.tts_output_stopwatch = Stopwatch()
 
         self.chatbot = Chatbot()
-        self.openai_client = get_openai_client()
+        self.llm_balancer = llm_balancer  # Shared by all sessions
+        # Results of the character tools marked as cacheable in their TOOLS
+        self.tool_result_cache = ToolResultCache()
 
         self.turn_transition_lock = asyncio.Lock()
 
@@ -143,6 +159,7 @@ class UnmuteHandler(AsyncStreamHandler):
 
     def get_gradio_update(self):
         self.debug_dict["conversation_state"] = self.chatbot.conversation_state()
+        self.debug_dict["emit_wakeups"] = self.output_channel.n_wakeups
         self.debug_dict["connection"]["stt"] = self.stt.state() if self.stt else "none"
         self.debug_dict["connection"]["tts"] = self.tts.state() if self.tts else "none"
         self.debug_dict["tts_voice"] = self.tts.voice if self.tts else "none"
@@ -187,7 +204,7 @@ class UnmuteHandler(AsyncStreamHandler):
         await self.quest_manager.add(quest)
 
     async def _generate_response_task(self):
-        generating_message_i = len(self.chatbot.chat_history)
+        generating_message_i = self.chatbot.n_messages
 
         await self.output_queue.put(
             ora.ResponseCreated(
@@ -203,37 +220,11 @@ class UnmuteHandler(AsyncStreamHandler):
 
         quest = await self.start_up_tts(generating_message_i)
 
-        # T014-T017: Get tools and tool context from character's prompt generator
-        tools = None
-        tool_validators = {}
-        prompt_generator = self.chatbot.get_prompt_generator()
-        character_name = "Unknown"
-
-        if prompt_generator and hasattr(prompt_generator, 'get_tools'):
-            tools = prompt_generator.get_tools()
-            if tools:
-                logger.info(f"Using {len(tools)} tools for LLM: {[t['function']['name'] for t in tools]}")
-
-        # Get tool validators and character name from character metadata
-        if hasattr(self, 'current_character') and self.current_character:
-            if hasattr(self.current_character, '_tool_validators'):
-                tool_validators = self.current_character._tool_validators  # type: ignore
-            character_name = getattr(self.current_character, 'name', 'Unknown')
-
-        llm = VLLMStream(
-            # if generating_message_i is 2, then we have a system prompt + an empty
-            # assistant message signalling that we are generating a response.
-            self.openai_client,
-            temperature=FIRST_MESSAGE_TEMPERATURE
-            if generating_message_i == 2
-            else FURTHER_MESSAGES_TEMPERATURE,
-            tools=tools,  # Pass tools to LLM
-            prompt_generator=prompt_generator,  # For tool execution
-            tool_validators=tool_validators,  # For parameter validation
-            character_name=character_name,  # For metrics
-        )
-
         messages = self.chatbot.preprocessed_messages()
+        stream = await self._take_speculative_llm(messages)
+        if stream is None:
+            llm = self._make_llm(generating_message_i)
+            stream = llm.chat_completion(messages)
 
         self.tts_output_stopwatch = Stopwatch(autostart=False)
         tts = None
@@ -246,10 +237,9 @@ class UnmuteHandler(AsyncStreamHandler):
         )
         mt.VLLM_SENT_WORDS.inc(num_words_sent)
         mt.VLLM_REQUEST_LENGTH.observe(num_words_sent)
-        mt.VLLM_ACTIVE_SESSIONS.inc()
 
         try:
-            async for delta in rechunk_to_words(llm.chat_completion(messages)):
+            async for delta in rechunk_to_words(stream):
                 await self.output_queue.put(
                     ora.UnmuteResponseTextDeltaReady(delta=delta)
                 )
@@ -260,7 +250,6 @@ class UnmuteHandler(AsyncStreamHandler):
                 if time_to_first_token is None:
                     time_to_first_token = llm_stopwatch.time()
                     self.debug_dict["timing"]["to_first_token"] = time_to_first_token
-                    mt.VLLM_TTFT.observe(time_to_first_token)
                     logger.info("Sending first word to TTS: %s", delta)
 
                 self.tts_output_stopwatch.start_if_not_started()
@@ -270,7 +259,7 @@ class UnmuteHandler(AsyncStreamHandler):
                     error_from_tts = True
                     raise
 
-                if len(self.chatbot.chat_history) > generating_message_i:
+                if self.chatbot.n_messages > generating_message_i:
                     break  # We've been interrupted
 
                 assert isinstance(delta, str)  # make Pyright happy
@@ -293,10 +282,121 @@ class UnmuteHandler(AsyncStreamHandler):
             raise
         finally:
             logger.info("End of VLLM, after %d words.", len(response_words))
-            mt.VLLM_ACTIVE_SESSIONS.dec()
             mt.VLLM_REPLY_LENGTH.observe(len(response_words))
             mt.VLLM_GEN_DURATION.observe(llm_stopwatch.time())
 
+    def _make_llm(self, generating_message_i: int) -> VLLMStream:
+        # T014-T017: Get tools and tool context from character's prompt generator
+        tools = None
+        tool_validators = {}
+        prompt_generator = self.chatbot.get_prompt_generator()
+        character_name = "Unknown"
+        llm_model = None
+
+        if prompt_generator and hasattr(prompt_generator, 'get_tools'):
+            tools = prompt_generator.get_tools()
+            if tools:
+                logger.info(f"Using {len(tools)} tools for LLM: {[t['function']['name'] for t in tools]}")
+
+        # Get tool validators and character name from character metadata
+        if hasattr(self, 'current_character') and self.current_character:
+            if hasattr(self.current_character, '_tool_validators'):
+                tool_validators = self.current_character._tool_validators  # type: ignore
+            character_name = getattr(self.current_character, 'name', 'Unknown')
+            llm_model = getattr(self.current_character, '_llm_model', None)
+
+        return VLLMStream(
+            # if generating_message_i is 2, then we have a system prompt + an empty
+            # assistant message signalling that we are generating a response.
+            self.llm_balancer,
+            temperature=FIRST_MESSAGE_TEMPERATURE
+            if generating_message_i == 2
+            else FURTHER_MESSAGES_TEMPERATURE,
+            tools=tools,  # Pass tools to LLM
+            prompt_generator=prompt_generator,  # For tool execution
+            tool_validators=tool_validators,  # For parameter validation
+            character_name=character_name,  # For metrics
+            tool_result_cache=self.tool_result_cache,
+            model=llm_model,  # The character's LLM_MODEL, if any
+        )
+
+    async def _start_speculative_response(self):
+        """Start the slow parts of the response while the STT is being flushed.
+
+        The flush takes `stt.delay_sec` and almost always ends with a response, so we
+        connect to the TTS right away and, if enabled, run the LLM on the transcript
+        we have so far. `_generate_response_task()` picks these up.
+        """
+        if SPECULATIVE_RESPONSE not in ["tts", "llm"]:
+            return
+
+        async def _init() -> TextToSpeech | None:
+            try:
+                # A single attempt, without warning the client: if it fails, the
+                # response retries anyway.
+                return await self._connect_tts(trials=1)
+            except Exception as e:
+                # Not fatal, the response will try again.
+                logger.warning(f"Could not connect to the TTS speculatively: {e!r}")
+                return None
+
+        async def _run(tts: TextToSpeech | None):
+            pass
+
+        async def _close(tts: TextToSpeech | None):
+            if tts is not None:
+                await tts.close_unused()
+
+        await self.quest_manager.add(Quest("tts_speculative", _init, _run, _close))
+
+        if SPECULATIVE_RESPONSE != "llm":
+            return
+
+        # The index the assistant message will have once the response starts.
+        llm = self._make_llm(generating_message_i=self.chatbot.n_messages + 1)
+        if llm.tools:
+            # Tools can have side effects, so don't call them for a transcript that
+            # might still change.
+            return
+
+        self.speculative_llm = SpeculativeStream(
+            self.chatbot.preprocessed_history(), llm.chat_completion
+        )
+        await self.quest_manager.add(
+            Quest.from_run_step("llm_speculative", self.speculative_llm.run)
+        )
+
+    async def _take_speculative_llm(
+        self, messages: list[dict[str, Any]]
+    ) -> AsyncIterator[str] | None:
+        """Reuse the speculative LLM output if it was generated for `messages`."""
+        speculative_llm, self.speculative_llm = self.speculative_llm, None
+        if speculative_llm is None:
+            return None
+
+        if speculative_llm.matches(messages):
+            mt.VLLM_SPECULATIONS.labels(outcome="confirmed").inc()
+            return speculative_llm.stream()
+
+        logger.info("Transcript changed during the flush, restarting the LLM.")
+        mt.VLLM_SPECULATIONS.labels(outcome="restarted").inc()
+        await self.quest_manager.remove("llm_speculative")
+        return None
+
+    async def _take_speculative_tts(self) -> TextToSpeech | None:
+        quest = self.quest_manager.quests.get("tts_speculative")
+        if quest is None:
+            return None
+
+        # Shielded so that if we're cancelled, the quest still owns the connection.
+        tts = await asyncio.shield(quest.get())
+        if self.quest_manager.quests.get("tts_speculative") is not quest:
+            return None  # Replaced in the meantime, which closed the connection.
+
+        # Hand the connection over, the speculative quest must not close it anymore.
+        await self.quest_manager.remove("tts_speculative", close=False)
+        return tts
+
     def audio_received_sec(self) -> float:
         """How much audio has been received in seconds. Used instead of time.time().
 
@@ -332,6 +432,15 @@ class UnmuteHandler(AsyncStreamHandler):
             # Periodically update this not to trigger the "long silence" accidentally.
             self.waiting_for_user_start_time = self.audio_received_sec()
 
+        if (
+            self.output_queue.empty()
+            and self.last_additional_output_update < self.audio_received_sec() - 1
+        ):
+            # If we have nothing to emit, at least update the debug dict.
+            # Don't update too often for performance reasons
+            self.last_additional_output_update = self.audio_received_sec()
+            await self.output_queue.put(self.get_gradio_update())
+
         if TTS_DEBUGGING_TEXT is not None:
             assert self.audio_input_override is None, (
                 "Can't use both TTS_DEBUGGING_TEXT and audio input override."
@@ -347,7 +456,7 @@ class UnmuteHandler(AsyncStreamHandler):
             return
 
         if (
-            len(self.chatbot.chat_history) == 1
+            self.chatbot.n_messages == 1
             # Wait until the instructions are updated. A bit hacky
             and self.chatbot.get_prompt_generator() is not None
         ):
@@ -370,6 +479,7 @@ class UnmuteHandler(AsyncStreamHandler):
 
                 self.stt_end_of_flush_time = stt.current_time + stt.delay_sec
                 self.stt_flush_timer = Stopwatch()
+                await self._start_speculative_response()
                 num_frames = (
                     int(math.ceil(stt.delay_sec / FRAME_TIME_SEC)) + 1
                 )  # some safety margin.
@@ -420,18 +530,9 @@ class UnmuteHandler(AsyncStreamHandler):
     async def emit(  # pyright: ignore[reportIncompatibleMethodOverride]
         self,
     ) -> HandlerOutput | None:
-        output_queue_item = await wait_for_item(self.output_queue)
-
-        if output_queue_item is not None:
-            return output_queue_item
-        else:
-            if self.last_additional_output_update < self.audio_received_sec() - 1:
-                # If we have nothing to emit, at least update the debug dict.
-                # Don't update too often for performance reasons
-                self.last_additional_output_update = self.audio_received_sec()
-                return self.get_gradio_update()
-            else:
-                return None
+        # The debug updates are queued by receive(), see also main_websocket.py which
+        # reads from self.output_channel instead of polling this.
+        return await wait_for_item(self.output_queue)
 
     def copy(self):
         return UnmuteHandler()
@@ -442,10 +543,11 @@ class UnmuteHandler(AsyncStreamHandler):
     async def start_up(self):
         await self.start_up_stt()
 
-        # Load default characters for this session
+        # Use the shared default characters, they are only loaded by the first session
         default_characters_dir = Path(__file__).parents[1] / "characters"
         try:
-            result = await self.character_manager.load_characters(default_characters_dir)
+            registry = await get_character_registry(default_characters_dir)
+            result = self.character_manager.use_registry(registry)
             self._characters_loaded = True
             logger.info(
                 f"Session {self.character_manager.session_id}: Loaded {result.loaded_count} characters "
@@ -512,35 +614,48 @@ class UnmuteHandler(AsyncStreamHandler):
         except websockets.ConnectionClosed:
             logger.info("STT connection closed while receiving messages.")
 
+    async def _connect_tts(self, trials: int = 5) -> TextToSpeech:
+        tts = await tts_pool.checkout(self.tts_voice)
+        if tts is not None:
+            tts.bind_session(recorder=self.recorder, get_time=self.audio_received_sec)
+            return tts
+
+        factory = partial(
+            TextToSpeech,
+            recorder=self.recorder,
+            get_time=self.audio_received_sec,
+            voice=self.tts_voice,
+        )
+        sleep_time = 0.05
+        sleep_growth = 1.5
+        max_sleep = 1.0
+        for trial in range(trials):
+            try:
+                tts = await find_instance("tts", factory)
+            except Exception as exc:
+                if isinstance(exc, MissingServiceAtCapacity):
+                    # Our own pre-warmed connections might be taking the slots.
+                    await tts_pool.release_idle()
+                if trial == trials - 1:
+                    raise
+                logger.warning("Will sleep for %.4f sec", sleep_time)
+                await asyncio.sleep(sleep_time)
+                sleep_time = min(max_sleep, sleep_time * sleep_growth)
+                error = make_ora_error(
+                    type="warning",
+                    message="Looking for the resources, expect some latency.",
+                )
+                await self.output_queue.put(error)
+            else:
+                return tts
+        raise AssertionError("Too many unexpected packets.")
+
     async def start_up_tts(self, generating_message_i: int) -> Quest[TextToSpeech]:
         async def _init() -> TextToSpeech:
-            factory = partial(
-                TextToSpeech,
-                recorder=self.recorder,
-                get_time=self.audio_received_sec,
-                voice=self.tts_voice,
-            )
-            sleep_time = 0.05
-            sleep_growth = 1.5
-            max_sleep = 1.0
-            trials = 5
-            for trial in range(trials):
-                try:
-                    tts = await find_instance("tts", factory)
-                except Exception:
-                    if trial == trials - 1:
-                        raise
-                    logger.warning("Will sleep for %.4f sec", sleep_time)
-                    await asyncio.sleep(sleep_time)
-                    sleep_time = min(max_sleep, sleep_time * sleep_growth)
-                    error = make_ora_error(
-                        type="warning",
-                        message="Looking for the resources, expect some latency.",
-                    )
-                    await self.output_queue.put(error)
-                else:
-                    return tts
-            raise AssertionError("Too many unexpected packets.")
+            tts = await self._take_speculative_tts()
+            if tts is None:
+                tts = await self._connect_tts()
+            return tts
 
         async def _run(tts: TextToSpeech):
             await self._tts_loop(tts, generating_message_i)
@@ -574,7 +689,7 @@ class UnmuteHandler(AsyncStreamHandler):
                         ),
                     }
 
-                if len(self.chatbot.chat_history) > generating_message_i:
+                if self.chatbot.n_messages > generating_message_i:
                     break
 
                 if isinstance(message, TTSAudioMessage):
@@ -582,10 +697,9 @@ class UnmuteHandler(AsyncStreamHandler):
                     if t is not None:
                         self.debug_dict["timing"]["tts_audio"] = t
 
-                    audio = np.array(message.pcm, dtype=np.float32)
                     assert self.output_sample_rate == SAMPLE_RATE
 
-                    await output_queue.put((SAMPLE_RATE, audio))
+                    await output_queue.put((SAMPLE_RATE, message.pcm))
 
                     if audio_started is None:
                         audio_started = self.audio_received_sec()
@@ -638,7 +752,7 @@ class UnmuteHandler(AsyncStreamHandler):
             # Clear any audio queued up by FastRTC's emit().
             # Not sure under what circumstatnces this is None.
             self._clear_queue()
-        self.output_queue = asyncio.Queue()  # Clear our own queue too
+        self.output_queue = self.output_channel.new_queue()  # Clear our own queue too
 
         # Push some silence to flush the Opus state.
         # Not sure that this is actually needed.
@@ -650,6 +764,7 @@ class UnmuteHandler(AsyncStreamHandler):
 
         await self.quest_manager.remove("tts")
         await self.quest_manager.remove("llm")
+        await self.quest_manager.remove("llm_speculative")
 
     async def check_for_bot_goodbye(self):
         last_assistant_message = next(
@@ -685,9 +800,13 @@ class UnmuteHandler(AsyncStreamHandler):
     async def update_session(self, session: ora.SessionConfig):
         if session.voice:
             self.tts_voice = session.voice
+            tts_pool.prewarm(session.voice)
 
             # Look up the character from this session's character manager
             character = self.character_manager.get_character(session.voice)
+            if character is not None:
+                # Imports the character's module if it was only indexed
+                character = await ensure_character_loaded(character)
 
             if character and hasattr(character, '_prompt_generator'):
                 # Store character for tool access
@@ -698,6 +817,10 @@ class UnmuteHandler(AsyncStreamHandler):
                 logger.info(f"Character instructions: {getattr(character, '_instructions', 'NOT FOUND')}")
                 prompt_generator = character._prompt_generator(character._instructions)  # type: ignore
                 self.chatbot.set_prompt_generator(prompt_generator)
+                self.chatbot.context_window.max_tokens = (
+                    getattr(character, "_llm_max_context_tokens", None)
+                    or LLM_MAX_CONTEXT_TOKENS
+                )
                 logger.info(f"System prompt updated: {self.chatbot.get_system_prompt()[:200]}...")
 
         if not session.allow_recording and self.recorder:
@@ -39,3 +39,30 @@ def ws_to_http(url_string: str):
         return "https://" + url_string[6:]
     else:
         return url_string
+
+
+# The subprotocol that clients of /v1/realtime send to be compatible with OpenAI.
+REALTIME_SUBPROTOCOL = "realtime"
+# If the client also offers this subprotocol, audio is sent as binary frames instead of
+# base64 inside JSON events, both for input_audio_buffer.append and response.audio.delta.
+# Other events are still JSON text frames.
+BINARY_AUDIO_SUBPROTOCOL = "unmute-binary-audio"
+# Binary frames start with one byte telling what they contain, followed by the payload.
+BINARY_FRAME_OPUS_AUDIO = 0x01
+
+
+def encode_binary_audio(opus_bytes: bytes) -> bytes:
+    """Wrap Opus bytes into a binary frame of the binary audio subprotocol."""
+    return bytes([BINARY_FRAME_OPUS_AUDIO]) + opus_bytes
+
+
+def decode_binary_audio(frame: bytes) -> bytes:
+    """Get the Opus bytes out of a binary frame of the binary audio subprotocol.
+
+    Raises:
+        ValueError: If the frame is not an audio frame.
+    """
+    if not frame or frame[0] != BINARY_FRAME_OPUS_AUDIO:
+        kind = frame[0] if frame else None
+        raise ValueError(f"Unknown binary frame kind: {kind}")
+    return frame[1:]